@@ -1,10 +1,30 @@
 import os
+import sys
 import csv
+import argparse
 from typing import Dict, List, Tuple
 
+# The instrumentation layer shared by all folders lives in Scripts/
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+import instrumentation  # noqa: E402
+
+# The assumed JMH configuration and its time estimate are defined once, by the results analysis
+RESULTS_ANALYSIS_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'results analysis')
+)
+if RESULTS_ANALYSIS_DIR not in sys.path:
+    sys.path.append(RESULTS_ANALYSIS_DIR)
+from analyze_results import estimate_measurement_seconds  # noqa: E402
+
 # Type aliases for better readability
 Ju2JmhBenchmark = Tuple[str, float, float, float]  # Name, Throughput, Runtime, Score
 BenchmarkData = Dict[str, List[Ju2JmhBenchmark]]
+Clusters = Dict[str, List[List[List[Ju2JmhBenchmark]]]]  # JMH benchmark -> clusters, each wrapped in a list
+
+# Cluster formation strategies: the original greedy one, and bin packing heuristics
+PACKING_STRATEGIES = ['highest-overlap', 'first-fit-decreasing', 'best-fit-decreasing']
 
 # Function to group ju2jmh benchmarks
 def clusters_all_possible(benchmark_data: BenchmarkData, threshold: float) -> Dict[str, List[List[Ju2JmhBenchmark]]]:
@@ -66,6 +86,12 @@ def clusters_highest_overlap(benchmark_data: BenchmarkData, threshold: float) ->
     """
     Groups ju2jmh benchmarks for each JMH benchmark based on a runtime threshold.
 
+    In repeated passes over the JMH benchmarks, each JMH benchmark takes its unused ju2jmh
+    benchmarks by descending similarity score, adding those that fit under the threshold.
+    At the first one that does not fit, a group of at least two benchmarks is finalized
+    and its benchmarks are marked as used. Passes stop once every benchmark is used or a
+    pass forms no group.
+
     Args:
         benchmark_data: Dictionary mapping JMH benchmarks to their ju2jmh benchmarks (name, throughput, runtime, score).
         threshold: The maximum cumulative runtime for a group.
@@ -73,90 +99,215 @@ def clusters_highest_overlap(benchmark_data: BenchmarkData, threshold: float) ->
     Returns:
         A dictionary mapping JMH benchmarks to their groups of ju2jmh benchmarks.
     """
-
-    all_ju2jmh_benchmarks = set()  # To track which benchmarks have already been grouped
+    clusterer = HighestOverlapClusterer(threshold)
     for jmh_benchmark, ju2jmh_list in benchmark_data.items():
-        # Filter out benchmarks with runtime exceeding the threshold or already grouped
-        valid_ju2jmh_list = [
-            benchmark for benchmark in ju2jmh_list
-            if benchmark[2] <= threshold
-        ]
+        clusterer.add_jmh_benchmark(jmh_benchmark, ju2jmh_list)
+    return clusterer.finish()
 
-        while valid_ju2jmh_list:
-            # Get the ju2jmh benchmark with the highest similarity score
-            ju2jmh_benchmark = valid_ju2jmh_list.pop(0)
-            if(ju2jmh_benchmark[0] not in all_ju2jmh_benchmarks):
-                all_ju2jmh_benchmarks.add(ju2jmh_benchmark[0])
+class HighestOverlapClusterer:
+    """
+    Indexed engine of clusters_highest_overlap.
 
+    The candidates of each JMH benchmark are sorted by score once. Since the scores never
+    change, this sorted list acts as a max-heap from which used benchmarks are deleted
+    lazily: a cursor skips the used prefix, and used benchmarks further down are skipped
+    while scanning. An inverted index from ju2jmh benchmarks to the JMH benchmarks listing
+    them marks which JMH benchmarks can form a different group after a group is finalized;
+    the others would repeat their previous (empty) result and are skipped.
+
+    JMH benchmarks are added in order and the first pass runs as they are added, so
+    clustering can start before all overlap rows are known.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.grouped_data: Dict[str, List[List[List[Ju2JmhBenchmark]]]] = {}
+        self.candidates: Dict[str, List[Ju2JmhBenchmark]] = {}
+        self.cursors: Dict[str, int] = {}
+        self.jmh_by_ju2jmh: Dict[str, List[str]] = {}
+        self.changed: Dict[str, bool] = {}
+        self.all_ju2jmh_benchmarks = set()  # Benchmarks that fit under the threshold on their own
+        self.used_benchmarks = set()  # To track which benchmarks have already been grouped
+
+    def add_jmh_benchmark(self, jmh_benchmark: str, ju2jmh_list: List[Ju2JmhBenchmark]) -> None:
+        """
+        Adds the candidates of a JMH benchmark and runs its step of the first pass.
+        """
+        # Sort ju2jmh benchmarks by similarity score in descending order (stable for equal scores)
+        self.candidates[jmh_benchmark] = sorted(ju2jmh_list, key=lambda x: x[3], reverse=True)
+        self.cursors[jmh_benchmark] = 0
+        self.grouped_data[jmh_benchmark] = []
+        for benchmark in ju2jmh_list:
+            self.jmh_by_ju2jmh.setdefault(benchmark[0], []).append(jmh_benchmark)
+            if benchmark[2] <= self.threshold:
+                self.all_ju2jmh_benchmarks.add(benchmark[0])
+        self.changed[jmh_benchmark] = True
+        self._form_group(jmh_benchmark)
+
+    def finish(self) -> Dict[str, List[List[List[Ju2JmhBenchmark]]]]:
+        """
+        Runs the remaining passes and returns the groups of every JMH benchmark.
+        """
+        if not self.all_ju2jmh_benchmarks:
+            return {}
+        progress = True
+        pass_number = 1  # The first pass ran as the JMH benchmarks were added
+        while progress and len(self.used_benchmarks) < len(self.all_ju2jmh_benchmarks):
+            progress = False
+            pass_number += 1
+            with instrumentation.span("cluster pass", f"pass {pass_number}"):
+                for jmh_benchmark in self.grouped_data:
+                    if self.changed[jmh_benchmark] and self._form_group(jmh_benchmark):
+                        progress = True
+        instrumentation.count("cluster passes", pass_number)
+        return self.grouped_data
+
+    def _form_group(self, jmh_benchmark: str) -> bool:
+        """
+        Tries to form the next group of a JMH benchmark from its unused candidates.
+
+        Returns:
+            Whether a group was formed.
+        """
+        self.changed[jmh_benchmark] = False
+        candidates = self.candidates[jmh_benchmark]
+        used_benchmarks = self.used_benchmarks
+
+        # Advance past the used prefix once and for all
+        start = self.cursors[jmh_benchmark]
+        while start < len(candidates) and candidates[start][0] in used_benchmarks:
+            start += 1
+        self.cursors[jmh_benchmark] = start
+
+        current_group = []
+        current_benchmarks = set()
+        current_runtime = 0.0
+        for ju2jmh_benchmark in candidates[start:]:
+            if ju2jmh_benchmark[0] in used_benchmarks:
+                continue
+            runtime = ju2jmh_benchmark[2]
+            if current_runtime + runtime <= self.threshold:
+                current_group.append(ju2jmh_benchmark)
+                current_runtime += runtime
+                current_benchmarks.add(ju2jmh_benchmark[0])
+            elif len(current_benchmarks) > 1:
+                # Finalize the current group once the next benchmark does not fit
+                self.grouped_data[jmh_benchmark].append([current_group])
+                used_benchmarks.update(current_benchmarks)
+                for bench in current_benchmarks:
+                    for other_jmh_benchmark in self.jmh_by_ju2jmh[bench]:
+                        self.changed[other_jmh_benchmark] = True
+                return True
+        return False
+
+# Function to drop ju2jmh benchmarks below a coverage overlap floor
+def filter_by_score(benchmark_data: BenchmarkData, min_score: float) -> BenchmarkData:
+    """
+    Keeps only the ju2jmh benchmarks whose overlap score with a JMH benchmark is at least min_score.
+    """
+    return {
+        jmh_benchmark: [benchmark for benchmark in ju2jmh_list if benchmark[3] >= min_score]
+        for jmh_benchmark, ju2jmh_list in benchmark_data.items()
+    }
+
+# Function to group ju2jmh benchmarks with a bin packing heuristic
+def clusters_bin_packed(benchmark_data: BenchmarkData, threshold: float, strategy: str) -> Clusters:
+    """
+    Groups ju2jmh benchmarks into as few clusters as possible under the runtime threshold.
+
+    Each ju2jmh benchmark is first assigned to the JMH benchmark it overlaps most with
+    (the first one on ties), so every cluster still shares coverage with one JMH benchmark.
+    The benchmarks of each JMH benchmark are then packed by decreasing runtime, either into
+    the first cluster they fit in (first-fit-decreasing) or into the fullest cluster they
+    fit in (best-fit-decreasing). Clusters of a single benchmark are dropped, as in
+    clusters_highest_overlap, since that benchmark is run individually anyway.
+
+    Args:
+        benchmark_data: Dictionary mapping JMH benchmarks to their ju2jmh benchmarks (name, throughput, runtime, score).
+        threshold: The maximum cumulative runtime for a group.
+        strategy: 'first-fit-decreasing' or 'best-fit-decreasing'.
+
+    Returns:
+        A dictionary mapping JMH benchmarks to their groups of ju2jmh benchmarks, in the
+        same shape as clusters_highest_overlap.
+    """
+    # Assign every ju2jmh benchmark to its highest-overlap JMH benchmark
+    best_match: Dict[str, Tuple[str, Ju2JmhBenchmark]] = {}
+    for jmh_benchmark, ju2jmh_list in benchmark_data.items():
+        for benchmark in ju2jmh_list:
+            if benchmark[2] > threshold:
+                continue
+            current = best_match.get(benchmark[0])
+            if current is None or benchmark[3] > current[1][3]:
+                best_match[benchmark[0]] = (jmh_benchmark, benchmark)
+
+    assigned: Dict[str, List[Ju2JmhBenchmark]] = {jmh_benchmark: [] for jmh_benchmark in benchmark_data}
+    for jmh_benchmark, benchmark in best_match.values():
+        assigned[jmh_benchmark].append(benchmark)
+
+    grouped_data: Clusters = {}
+    for jmh_benchmark, ju2jmh_list in assigned.items():
+        bins: List[List[Ju2JmhBenchmark]] = []
+        bin_runtimes: List[float] = []
+        for benchmark in sorted(ju2jmh_list, key=lambda x: x[2], reverse=True):
+            runtime = benchmark[2]
+            fitting = [i for i, bin_runtime in enumerate(bin_runtimes) if bin_runtime + runtime <= threshold]
+            if not fitting:
+                bins.append([benchmark])
+                bin_runtimes.append(runtime)
+                continue
+            if strategy == 'best-fit-decreasing':
+                target = max(fitting, key=lambda i: bin_runtimes[i])
+            else:
+                target = fitting[0]
+            bins[target].append(benchmark)
+            bin_runtimes[target] += runtime
+
+        grouped_data[jmh_benchmark] = [
+            [sorted(group, key=lambda x: x[3], reverse=True)] for group in bins if len(group) > 1
+        ]
 
-    
-    grouped_data = {}
-    used_benchmarks = set()  # To track which benchmarks have already been grouped
-    current_len=0
-    current_len_minus_one=0
-    counter_current_len=0
-    while (len(used_benchmarks) < len(all_ju2jmh_benchmarks)):
-        if((len(all_ju2jmh_benchmarks) - len(used_benchmarks)) == current_len):
-            counter_current_len +=1
-        else:
-            current_len = len(all_ju2jmh_benchmarks) - len(used_benchmarks)
-            counter_current_len =0
-        if(counter_current_len >= 500):
-            break
-
-        current_len =len(all_ju2jmh_benchmarks) - len(used_benchmarks)
-
-        for jmh_benchmark, ju2jmh_list in benchmark_data.items():
-            # Filter out benchmarks with runtime exceeding the threshold or already grouped
-            valid_ju2jmh_list = [
-                benchmark for benchmark in ju2jmh_list
-                if benchmark[0] not in used_benchmarks
-            ]
-            if jmh_benchmark not in grouped_data:
-                grouped_data[jmh_benchmark] = []
-
-            # Sort ju2jmh benchmarks by similarity score in descending order
-            valid_ju2jmh_list.sort(key=lambda x: x[3], reverse=True)
-            
-            groups = []
-            current_group = []
-            current_benchmarks = set()
-            current_runtime = 0.0
-            myFlag=True
-            while valid_ju2jmh_list and myFlag:
-                # Get the ju2jmh benchmark with the highest similarity score
-                ju2jmh_benchmark = valid_ju2jmh_list.pop(0)
-                runtime = ju2jmh_benchmark[2]
-                if current_runtime + runtime <= threshold:
-                    current_group.append(ju2jmh_benchmark)
-                    current_runtime += runtime
-                    current_benchmarks.add(ju2jmh_benchmark[0])
-                    # used_benchmarks.add(ju2jmh_benchmark[0])  # Mark as used
-                else:
-                    # Finalize the current group and start a new one
-                    # print(len(current_benchmarks))
-                    if len(current_benchmarks) > 1:
-                        # print(current_group)
-                        groups.append(current_group)
-                        for bench in current_benchmarks:
-                            used_benchmarks.add(bench)  # Mark as used    
-                        myFlag=False
-                    # current_group = [ju2jmh_benchmark]
-                    # current_runtime = runtime
-                    # used_benchmarks.add(ju2jmh_benchmark[0])  # Mark as used
-
-            # # Add the last group if it's not empty
-            # if current_group:
-            #     groups.append(current_group)
-
-            if groups:
-                grouped_data[jmh_benchmark].append(groups)
-    # print(grouped_data)
     return grouped_data
 
+# Function to form clusters with the selected strategy
+def form_clusters(benchmark_data: BenchmarkData, threshold: float, strategy: str, min_score: float = 0.0) -> Clusters:
+    """
+    Forms non-duplicated clusters with one of the PACKING_STRATEGIES, ignoring ju2jmh
+    benchmarks whose overlap score is below min_score.
+    """
+    benchmark_data = filter_by_score(benchmark_data, min_score)
+    if strategy == 'highest-overlap':
+        return clusters_highest_overlap(benchmark_data, threshold)
+    if strategy in PACKING_STRATEGIES:
+        return clusters_bin_packed(benchmark_data, threshold, strategy)
+    raise ValueError(f"Unknown packing strategy: {strategy}")
+
+# Function to compare the cluster formation strategies
+def compare_packing_strategies(benchmark_data: BenchmarkData, threshold: float, min_score: float = 0.0) -> None:
+    """
+    Prints, for every packing strategy, the number of clusters, how many ju2jmh benchmarks
+    they contain, and the estimated CI time of the suite (clusters plus the remaining
+    individual benchmarks) compared to running every ju2jmh benchmark individually.
+    """
+    all_benchmarks = {benchmark[0] for ju2jmh_list in benchmark_data.values() for benchmark in ju2jmh_list}
+    individual_seconds = estimate_measurement_seconds(len(all_benchmarks))
+    print(f"Individual execution: {len(all_benchmarks)} benchmarks, estimated CI time {individual_seconds / 3600:.1f} h")
+
+    for strategy in PACKING_STRATEGIES:
+        clusters = form_clusters(benchmark_data, threshold, strategy, min_score)
+        cluster_count = sum(len(groups) for groups in clusters.values())
+        clustered = {
+            ju2jmh[0] for groups in clusters.values() for group in groups for g in group for ju2jmh in g
+        }
+        suite_seconds = estimate_measurement_seconds(cluster_count + len(all_benchmarks - clustered))
+        saving = (1 - suite_seconds / individual_seconds) * 100 if individual_seconds else 0
+        print(f"{strategy:<22} clusters: {cluster_count:6d}  clustered benchmarks: {len(clustered):6d}  "
+              f"estimated CI time: {suite_seconds / 3600:8.1f} h  ({saving:.1f}% saved)")
+
 # Function to parse the benchmark data from the input file
 def parse_benchmark_data_from_file(file_path: str) -> BenchmarkData:
     benchmark_data: BenchmarkData = {}
+    dropped = 0
 
     with open(file_path, 'r', encoding='utf-8') as file:
         current_jmh_benchmark = None
@@ -178,8 +329,14 @@ def parse_benchmark_data_from_file(file_path: str) -> BenchmarkData:
                         benchmark_data[current_jmh_benchmark].append((name, throughput, runtime, score))
                     except ValueError:
                         # If conversion fails (e.g., due to non-numeric value), skip this line
+                        dropped += 1
                         continue
+                else:
+                    dropped += 1
 
+    if dropped:
+        instrumentation.count("rows skipped", dropped)
+        print(f"Warning: Skipped {dropped} lines of {file_path} that could not be parsed.")
     return benchmark_data
 
 
@@ -253,12 +410,32 @@ if __name__ == "__main__":
     # All ju2jmh benchmarks that are clustered
     clustered_ju2jmh_benchmarks = 'results/clustered_ju2jmh_benchmarks.txt'  
 
-    # Parse the benchmark data from the input file
-    benchmark_data = parse_benchmark_data_from_file(input_file_path)
+    parser = argparse.ArgumentParser(description="Group ju2jmh benchmarks into clusters.")
+    parser.add_argument("--strategy", choices=PACKING_STRATEGIES, default="highest-overlap",
+                        help="how non-duplicated clusters are formed (default: highest-overlap)")
+    parser.add_argument("--min-score", type=float, default=0.0,
+                        help="minimum coverage overlap (percent) of a ju2jmh benchmark with its JMH benchmark")
+    parser.add_argument("--artifact", default=None,
+                        help="overlap artifact to load instead of the text report (see overlap_artifact.py)")
+    parser.add_argument("--compare-strategies", action="store_true",
+                        help="print the number of clusters and estimated CI time of every strategy")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure_from_args("clsuters_in_a_text.py", args)
+
+    # Parse the benchmark data from the input file, or load it from an overlap artifact
+    if args.artifact:
+        from overlap_artifact import load_overlap_artifact
+        benchmark_data = load_overlap_artifact(args.artifact)
+    else:
+        benchmark_data = parse_benchmark_data_from_file(input_file_path)
+
+    if args.compare_strategies:
+        compare_packing_strategies(benchmark_data, runtime_threshold, args.min_score)
 
     # Generate groups
     clusters_all_possible_data = clusters_all_possible(benchmark_data, runtime_threshold)
-    clusters_highest_overlap_data = clusters_highest_overlap(benchmark_data, runtime_threshold)
+    clusters_highest_overlap_data = form_clusters(benchmark_data, runtime_threshold, args.strategy, args.min_score)
 
     # Save the grouped benchmark names to a file (names only)
     save_cluster_all_possible_to_file(clusters_all_possible_data, clusters_all_possible_file)
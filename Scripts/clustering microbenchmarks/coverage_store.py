@@ -0,0 +1,169 @@
+import os
+import sys
+import mmap
+import time
+import struct
+import argparse
+from array import array
+from typing import Dict, List, Optional
+
+from jmh_ju2jmh_overlap_measurement import (
+    ClassKey,
+    CoverageIndex,
+    IndexedCoverage,
+    get_peak_memory_mb,
+    list_benchmark_folders,
+    load_coverage_index,
+)
+
+# Layout of the consolidated coverage store. All integers are little-endian uint32.
+# - header: magic b'JCST', version, number of benchmarks, classes, class entries and lines
+# - benchmark offsets: for each benchmark, the index of its first class entry (plus an end offset)
+# - entry classes: the class id of each class entry
+# - entry offsets: for each class entry, the index of its first line (plus an end offset)
+# - lines: the sorted covered lines of all class entries, concatenated
+# - strings: the benchmark names, then the package and class name of each class id,
+#   each as a uint32 byte length followed by UTF-8 bytes
+STORE_MAGIC = b'JCST'
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct('<4sIIIII')
+STRING_LENGTH = struct.Struct('<I')
+
+def main() -> None:
+    """
+    Consolidates the per-benchmark coverage reports of a coverage output directory into a
+    single store file, to be memory-mapped by the overlap and clustering scripts.
+    """
+    parser = argparse.ArgumentParser(description="Build a consolidated coverage store from per-benchmark reports.")
+    parser.add_argument("folder_path", help="directory containing one coverage report folder per benchmark")
+    parser.add_argument("store_path", help="output coverage store file, e.g. coverage.store")
+    args = parser.parse_args()
+
+    build_coverage_store(args.folder_path, args.store_path)
+
+def build_coverage_store(folder_path: str, store_path: str) -> None:
+    """
+    Writes the coverage of every benchmark folder into one store file: a class
+    dictionary, per-benchmark offsets and a flat array of covered lines.
+
+    Args:
+        folder_path: Path to the folder containing coverage reports.
+        store_path: Path of the store file to write.
+    """
+    benchmark_folders = list_benchmark_folders(folder_path)
+    coverage_index = load_coverage_index(folder_path, benchmark_folders)
+    write_coverage_store(coverage_index, store_path)
+    print(f"Wrote coverage store of {len(coverage_index)} benchmarks to {store_path} "
+          f"({os.path.getsize(store_path) / (1024 * 1024):.1f} MB)")
+
+def write_coverage_store(coverage_index: CoverageIndex, store_path: str) -> None:
+    """
+    Writes a coverage index to a store file, keeping the order of its benchmarks.
+
+    Args:
+        coverage_index: Indexed coverage of all benchmarks.
+        store_path: Path of the store file to write.
+    """
+    class_ids: Dict[ClassKey, int] = {}
+    benchmark_offsets = array('I', [0])
+    entry_classes = array('I')
+    entry_offsets = array('I', [0])
+    lines = array('I')
+
+    for indexed_coverage in coverage_index.values():
+        for class_key, class_lines in indexed_coverage.items():
+            entry_classes.append(class_ids.setdefault(class_key, len(class_ids)))
+            lines.extend(sorted(class_lines))
+            entry_offsets.append(len(lines))
+        benchmark_offsets.append(len(entry_classes))
+
+    strings = bytearray()
+    for name in list(coverage_index) + [name for class_key in class_ids for name in class_key]:
+        encoded = name.encode('utf-8')
+        strings += STRING_LENGTH.pack(len(encoded)) + encoded
+
+    arrays = (benchmark_offsets, entry_classes, entry_offsets, lines)
+    if sys.byteorder != 'little':
+        for values in arrays:
+            values.byteswap()
+    with open(store_path, 'wb') as store_file:
+        store_file.write(STORE_HEADER.pack(
+            STORE_MAGIC, STORE_VERSION, len(coverage_index), len(class_ids), len(entry_classes), len(lines)
+        ))
+        for values in arrays:
+            store_file.write(values.tobytes())
+        store_file.write(strings)
+
+def load_coverage_store(store_path: str, benchmark_folders: Optional[List[str]] = None) -> CoverageIndex:
+    """
+    Loads a coverage index from a store file with a single memory mapping. The line sets
+    are built directly from the mapped line array.
+
+    Args:
+        store_path: Path of the store file.
+        benchmark_folders: Names of the benchmarks to load (default: all, in store order).
+
+    Returns:
+        A dictionary mapping benchmark folder names to their indexed coverage.
+    """
+    start_time = time.perf_counter()
+    coverage_index: CoverageIndex = {}
+
+    with open(store_path, 'rb') as store_file, \
+            mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, version, benchmark_count, class_count, entry_count, line_count = STORE_HEADER.unpack_from(mapped)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError(f"{store_path} is not a coverage store of version {STORE_VERSION}")
+
+        with memoryview(mapped) as buffer:
+            offset = STORE_HEADER.size
+            sections = []
+            for length in (benchmark_count + 1, entry_count, entry_count + 1, line_count):
+                section = buffer[offset:offset + 4 * length]
+                if sys.byteorder == 'little':
+                    sections.append(section.cast('I'))
+                else:
+                    values = array('I', section.tobytes())
+                    values.byteswap()
+                    sections.append(values)
+                offset += 4 * length
+            benchmark_offsets, entry_classes, entry_offsets, lines = sections
+
+            strings = []
+            for _ in range(benchmark_count + 2 * class_count):
+                (length,) = STRING_LENGTH.unpack_from(mapped, offset)
+                offset += STRING_LENGTH.size
+                strings.append(sys.intern(bytes(buffer[offset:offset + length]).decode('utf-8')))
+                offset += length
+            benchmark_names = strings[:benchmark_count]
+            class_keys = [
+                (strings[benchmark_count + 2 * i], strings[benchmark_count + 2 * i + 1]) for i in range(class_count)
+            ]
+
+            benchmark_positions = {name: position for position, name in enumerate(benchmark_names)}
+            for benchmark_folder in benchmark_names if benchmark_folders is None else benchmark_folders:
+                position = benchmark_positions.get(benchmark_folder)
+                if position is None:
+                    print(f"Warning: Benchmark {benchmark_folder} not found in coverage store {store_path}.")
+                    coverage_index[benchmark_folder] = {}
+                    continue
+                indexed_coverage: IndexedCoverage = {}
+                for entry in range(benchmark_offsets[position], benchmark_offsets[position + 1]):
+                    indexed_coverage[class_keys[entry_classes[entry]]] = frozenset(
+                        lines[entry_offsets[entry]:entry_offsets[entry + 1]]
+                    )
+                coverage_index[benchmark_folder] = indexed_coverage
+
+            for section in sections:
+                if isinstance(section, memoryview):
+                    section.release()
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Loaded {len(coverage_index)} benchmarks from coverage store {store_path} ({class_count} distinct classes) "
+        f"in {elapsed:.2f}s, peak resident memory: {get_peak_memory_mb():.1f} MB"
+    )
+    return coverage_index
+
+if __name__ == "__main__":
+    main()
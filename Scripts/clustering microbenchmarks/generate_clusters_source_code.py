@@ -1,73 +1,40 @@
 import os
+import re
 import glob
+import json
+import time
+import argparse
+import functools
+import multiprocessing
 
-# JMH_BENCHMARKS_DIR = "/Users/mj/workspace/RxJava/src/jmh/java/"  
-JMH_BENCHMARKS_DIR = "/Users/mj/workspace/eclipse-collections/jmh-tests/src/main/java/"
-
-def read_benchmarks_from_file(file_path):
-    """
-    Reads benchmarks and their associated methods from a file.
-    Example: "BenchmarkName: method1, method2, method3"
-    """
-    benchmarks = {}
-    with open(file_path, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if line:
-                benchmark_name, methods = line.split(':')
-                method_list = methods.split(',')
-                benchmarks[benchmark_name.strip()] = [method.strip() for method in method_list]
-    return benchmarks
-
-def find_java_file_for_class(class_name):
-    """ Constructs the expected Java file path from class_name instead of searching. """
-    java_file_path = os.path.join(
-        JMH_BENCHMARKS_DIR, 
-        class_name.replace('.', '/').split('/_')[0] + ".java"
-    )
-    return java_file_path if os.path.exists(java_file_path) else None
-
-
-def contains_run_benchmark(java_file, method_name):
-    """ Checks if the Java file contains 'this.runBenchmark(this.payloads.<method_name>);' in the method. """
-    if not java_file:
-        return False
-    with open(java_file, 'r', encoding='utf-8') as file:
-        content = file.read()
-        return f"this.runBenchmark(this.payloads.{method_name});" in content
-
-def generate_merged_benchmark_class(benchmark_name, methods):
-    """ Generates a Java class for a merged benchmark. """
-
-#     # class_template = """package io.reactivex.rxjava3.core.clusters;
-#     class_template = """package org.eclipse.collections.impl.clusters;
+# Template of a cluster class whose setup only instantiates the benchmark classes
+CLASS_TEMPLATE = """package {package};
 
 
+public class {benchmark_name} {{
 
-# public class {benchmark_name} {{
+   @org.openjdk.jmh.annotations.State(org.openjdk.jmh.annotations.Scope.Thread)
+    public static class _Benchmark {{
 
-#    @org.openjdk.jmh.annotations.State(org.openjdk.jmh.annotations.Scope.Thread)
-#     public static class _Benchmark {{
+       {fields}
+        
+        @org.openjdk.jmh.annotations.Setup(org.openjdk.jmh.annotations.Level.Trial)
+        public void makePayloads() {{
+            {instantiations}
+        }}
 
-#        {fields}
+        @org.openjdk.jmh.annotations.Benchmark
+        public void benchmark_{benchmark_name}() throws java.lang.Throwable {{
+            {evaluate_calls}
+        }}
 
-#         @org.openjdk.jmh.annotations.Setup(org.openjdk.jmh.annotations.Level.Trial)
-#         public void makePayloads() {{
-#             {instantiations}
-#             {make_payload_calls}
-#         }}
-        
-#         @org.openjdk.jmh.annotations.Benchmark
-#         public void benchmark_{benchmark_name}() throws java.lang.Throwable {{
-#             {evaluate_calls}
-#         }}
+   }}
 
-#    }}
+}}"""
 
-# }}"""
+# Template of a cluster class whose setup also calls makePayloads() on every benchmark class
+MAKE_PAYLOADS_CLASS_TEMPLATE = """package {package};
 
-    # class_template = """package io.reactivex.rxjava3.core.clusters;
-    class_template = """package zipkin2.clusters;
 
 
 public class {benchmark_name} {{
@@ -76,12 +43,13 @@ public class {benchmark_name} {{
     public static class _Benchmark {{
 
        {fields}
-        
+
         @org.openjdk.jmh.annotations.Setup(org.openjdk.jmh.annotations.Level.Trial)
         public void makePayloads() {{
             {instantiations}
+            {make_payload_calls}
         }}
-
+        
         @org.openjdk.jmh.annotations.Benchmark
         public void benchmark_{benchmark_name}() throws java.lang.Throwable {{
             {evaluate_calls}
@@ -91,6 +59,155 @@ public class {benchmark_name} {{
 
 }}"""
 
+# Payload-call styles: how the setup of a cluster prepares the payloads of its benchmark classes
+PAYLOAD_STYLE_TEMPLATES = {
+    'instantiate': CLASS_TEMPLATE,
+    'makePayloads': MAKE_PAYLOADS_CLASS_TEMPLATE,
+}
+
+# Project profiles: package of the generated clusters, root of the ju2jmh benchmark sources and payload-call style.
+# More profiles, or a custom template file per profile ("template_file"), can be given with --profiles-file.
+PROJECT_PROFILES = {
+    'zipkin': {
+        'package': 'zipkin2.clusters',
+        'source_dir': '/path_to_zipkin/benchmarks/src/main/java/',
+        'payload_style': 'instantiate',
+    },
+    'rxjava': {
+        'package': 'io.reactivex.rxjava3.core.clusters',
+        'source_dir': '/Users/mj/workspace/RxJava/src/jmh/java/',
+        'payload_style': 'makePayloads',
+    },
+    'eclipse-collections': {
+        'package': 'org.eclipse.collections.impl.clusters',
+        'source_dir': '/Users/mj/workspace/eclipse-collections/jmh-tests/src/main/java/',
+        'payload_style': 'makePayloads',
+    },
+}
+DEFAULT_PROFILE = 'zipkin'
+
+# Payload methods a benchmark class evaluates through runBenchmark
+RUN_BENCHMARK_PATTERN = re.compile(r"this\.runBenchmark\(this\.payloads\.([\w$]+)\);")
+
+# Source index of every source root, built once by get_source_index
+_source_indexes = {}
+
+def read_benchmarks_from_file(file_path):
+    """
+    Reads benchmarks and their associated methods from a file.
+    Example: "BenchmarkName: method1, method2, method3"
+    """
+    benchmarks = {}
+    with open(file_path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                benchmark_name, methods = line.split(':')
+                method_list = methods.split(',')
+                benchmarks[benchmark_name.strip()] = [method.strip() for method in method_list]
+    return benchmarks
+
+def build_source_index(source_dir):
+    """
+    Scans every Java file under source_dir once and records, for each class, the payload
+    methods it runs with 'this.runBenchmark(this.payloads.<method_name>);'.
+
+    Returns:
+        dict: Mapping of class names (e.g. "org.example.FooTest") to the set of payload methods.
+    """
+    source_index = {}
+    for root, _, files in os.walk(source_dir):
+        for file_name in files:
+            if not file_name.endswith(".java"):
+                continue
+            java_file = os.path.join(root, file_name)
+            class_name = os.path.relpath(java_file, source_dir)[:-len(".java")].replace(os.sep, '.')
+            # The pattern is ASCII, so undecodable bytes of a non-UTF-8 source file cannot affect it
+            with open(java_file, 'r', encoding='utf-8', errors='replace') as file:
+                source_index[class_name] = frozenset(RUN_BENCHMARK_PATTERN.findall(file.read()))
+    return source_index
+
+def get_source_index(source_dir):
+    """ Returns the source index of source_dir, building it on first use. """
+    if source_dir not in _source_indexes:
+        start_time = time.perf_counter()
+        _source_indexes[source_dir] = build_source_index(source_dir)
+        print(f"Indexed {len(_source_indexes[source_dir])} Java files of {source_dir} in {time.perf_counter() - start_time:.2f}s")
+    return _source_indexes[source_dir]
+
+def check_source_dir(profile_name, profile):
+    """
+    Checks that the source root of a profile exists and contains Java files. Without
+    them, every runBenchmark payload would silently be generated as a direct evaluate() call.
+
+    Raises:
+        ValueError: If the source root is missing or has no Java files.
+    """
+    source_dir = profile['source_dir']
+    if not os.path.isdir(source_dir):
+        raise ValueError(f"Source directory of profile {profile_name} not found: {source_dir}")
+    if not get_source_index(source_dir):
+        raise ValueError(f"No Java files in the source directory of profile {profile_name}: {source_dir}")
+
+def uses_run_benchmark(class_name, method_name, source_dir):
+    """
+    Checks whether the Java file of class_name under source_dir (the source root of the
+    selected profile) contains 'this.runBenchmark(this.payloads.<method_name>);',
+    answered from the source index of source_dir instead of reading the Java file again.
+    """
+    outer_class_name = class_name.replace('.', '/').split('/_')[0].replace('/', '.')
+    return method_name in get_source_index(source_dir).get(outer_class_name, ())
+
+def write_java_file(output_file, java_class_code):
+    """
+    Writes a generated class unless the file already has the same content, so that
+    incremental builds do not recompile unchanged clusters.
+
+    Returns:
+        bool: Whether the file was written.
+    """
+    if os.path.exists(output_file):
+        with open(output_file, 'r') as java_file:
+            if java_file.read() == java_class_code:
+                return False
+    with open(output_file, 'w') as java_file:
+        java_file.write(java_class_code)
+    return True
+
+def load_profiles(profiles_file=None):
+    """
+    Returns the project profiles, updated with those of a JSON profiles file, e.g.
+    {"guava": {"package": "com.google.common.clusters", "source_dir": "...", "payload_style": "makePayloads"}}.
+    A profile may also name a "template_file" that replaces the template of its payload style.
+    """
+    profiles = {name: dict(profile) for name, profile in PROJECT_PROFILES.items()}
+    if profiles_file:
+        with open(profiles_file, 'r', encoding='utf-8') as file:
+            for name, profile in json.load(file).items():
+                profiles.setdefault(name, {}).update(profile)
+    for name, profile in profiles.items():
+        missing = {'package', 'source_dir', 'payload_style'} - set(profile)
+        if missing:
+            raise ValueError(f"Profile {name} is missing {', '.join(sorted(missing))}")
+        if profile['payload_style'] not in PAYLOAD_STYLE_TEMPLATES:
+            raise ValueError(f"Profile {name} has an unknown payload style: {profile['payload_style']}")
+    return profiles
+
+def get_class_template(profile):
+    """ Returns the class template of a profile, with its package filled in. """
+    if profile.get('template_file'):
+        with open(profile['template_file'], 'r', encoding='utf-8') as file:
+            template = file.read()
+    else:
+        template = PAYLOAD_STYLE_TEMPLATES[profile['payload_style']]
+    # Fill in the package only, the other fields are formatted per cluster
+    return template.replace("{package}", profile['package'])
+
+def generate_merged_benchmark_class(benchmark_name, methods, profile=None):
+    """ Generates a Java class for a merged benchmark, for the given project profile (default: DEFAULT_PROFILE). """
+    profile = profile or PROJECT_PROFILES[DEFAULT_PROFILE]
+    class_template = get_class_template(profile)
+    source_dir = profile['source_dir']
 
     fields = []
     instantiations = []
@@ -116,11 +233,8 @@ public class {benchmark_name} {{
 
         make_payload_calls.append(f"this.{field_name}.makePayloads();")
 
-        # Find the Java file for this benchmark class
-        java_file = find_java_file_for_class(class_name)
-
         # Check if the benchmark method uses `this.runBenchmark(this.payloads.<method_name>);`
-        if contains_run_benchmark(java_file, method_name.replace("benchmark_", "")):
+        if uses_run_benchmark(class_name, method_name.replace("benchmark_", ""), source_dir):
             # evaluate_calls.append(f"this.{field_name}.createImplementation();")
             # evaluate_calls.append(f"this.{field_name}.runBenchmark(this.{field_name}.implementation()::{method_name.replace('benchmark_', '')},this.{field_name}.description(\"{method_name.replace('benchmark_', '')}\"));")
             evaluate_calls.append(f"this.{field_name}.runBenchmark(this.{field_name}.payloads.{method_name.replace('benchmark_', '')});")
@@ -137,21 +251,92 @@ public class {benchmark_name} {{
 
     return java_class
 
-def main():
-    input_file = 'clusters_ready_to_generate_file.txt'
+def generate_cluster(cluster, profile=None):
+    """ Generates the Java class of one (benchmark_name, methods) cluster. """
+    benchmark_name, methods = cluster
+    return benchmark_name, generate_merged_benchmark_class(benchmark_name, methods, profile)
+
+def generate_project_clusters(profile_name, profile, input_file, output_dir, workers=1):
+    """
+    Generates the Java classes of all clusters of a cluster file for one project profile.
+
+    Args:
+        profile_name (str): Name of the profile, for the messages.
+        profile (dict): The project profile.
+        input_file (str): Cluster file written by clsuters_in_a_text.py.
+        output_dir (str): Directory of the generated classes.
+        workers (int): Number of processes generating clusters in parallel.
+    """
     benchmarks = read_benchmarks_from_file(input_file)
-    
-    output_dir = 'clusters'
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    for benchmark_name, methods in benchmarks.items():
-        java_class_code = generate_merged_benchmark_class(benchmark_name, methods)
-        
-        output_file = os.path.join(output_dir, f"{benchmark_name}.java")
-        with open(output_file, 'w') as java_file:
-            java_file.write(java_class_code)
-        print(f"Generated: {output_file}")
+    # Build the source index before forking, so that the workers inherit it
+    check_source_dir(profile_name, profile)
+    generate = functools.partial(generate_cluster, profile=profile)
+    written = 0
+    if workers > 1:
+        pool = multiprocessing.get_context("fork").Pool(workers)
+        generated = pool.imap(generate, benchmarks.items(), chunksize=64)
+    else:
+        pool = None
+        generated = map(generate, benchmarks.items())
+
+    try:
+        for benchmark_name, java_class_code in generated:
+            output_file = os.path.join(output_dir, f"{benchmark_name}.java")
+            if write_java_file(output_file, java_class_code):
+                written += 1
+                print(f"Generated: {output_file}")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    print(f"{profile_name}: generated {written} clusters, {len(benchmarks) - written} unchanged")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the Java source code of the benchmark clusters.")
+    parser.add_argument("--profile", nargs='+', default=[DEFAULT_PROFILE],
+                        help=f"project profiles to generate (default: {DEFAULT_PROFILE}; built in: {', '.join(PROJECT_PROFILES)})")
+    parser.add_argument("--profiles-file", default=None, help="JSON file with additional or overridden project profiles")
+    parser.add_argument("--input", default='clusters_ready_to_generate_file.txt',
+                        help="cluster file; with several profiles it must contain {profile}, e.g. {profile}/clusters.txt")
+    parser.add_argument("--output-dir", default='clusters',
+                        help="output directory; with several profiles it must contain {profile}, e.g. {profile}/clusters")
+    parser.add_argument("--source-dir", default=None,
+                        help="root of the ju2jmh benchmark sources, overriding the profile (may contain {profile})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes generating clusters in parallel (default: 1)")
+    args = parser.parse_args()
+
+    try:
+        profiles = load_profiles(args.profiles_file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    for profile_name in args.profile:
+        if profile_name not in profiles:
+            parser.error(f"Unknown profile {profile_name}, choose from {', '.join(profiles)}")
+    if len(args.profile) > 1 and not ("{profile}" in args.input and "{profile}" in args.output_dir):
+        parser.error("--input and --output-dir must contain {profile} when generating several profiles")
+
+    for profile_name in args.profile:
+        if args.source_dir:
+            profiles[profile_name]['source_dir'] = args.source_dir.replace("{profile}", profile_name)
+        try:
+            check_source_dir(profile_name, profiles[profile_name])
+        except ValueError as e:
+            parser.error(f"{e} (set it in the profile or with --source-dir)")
+
+    for profile_name in args.profile:
+        profile = profiles[profile_name]
+        generate_project_clusters(
+            profile_name,
+            profile,
+            args.input.replace("{profile}", profile_name),
+            args.output_dir.replace("{profile}", profile_name),
+            args.workers,
+        )
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,47 @@
 import os
 import csv
-from typing import Dict, List
+import sys
+import mmap
+import time
+import heapq
+import argparse
+import functools
+import multiprocessing
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+# The instrumentation layer shared by all folders lives in Scripts/
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+import instrumentation  # noqa: E402
+
+# The binary coverage format is defined by the converter that writes it
+COVERAGE_SCRIPTS_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code coverage - jacoco')
+)
+if COVERAGE_SCRIPTS_DIR not in sys.path:
+    sys.path.append(COVERAGE_SCRIPTS_DIR)
+from jacoco_xml_to_csv_only_covered_lines import iter_coverage_binary  # noqa: E402
 
 # Type aliases for better readability
 CoverageData = Dict[str, Dict[str, List[int]]]
 ThroughputData = Dict[str, float]  # Maps JU2JMH benchmark names to their throughput values
+ClassKey = Tuple[str, str]  # (package name, class name), shared between all benchmarks
+IndexedCoverage = Dict[ClassKey, FrozenSet[int]]  # Covered lines of one benchmark, per class
+CoverageIndex = Dict[str, IndexedCoverage]  # Maps benchmark folder names to their indexed coverage
+SparseRow = List[Tuple[ClassKey, int]]  # Non-zero class blocks of a matrix row, each a bitset of covered lines
+ClassColumns = Dict[ClassKey, Tuple[List[int], List[int]]]  # Per class, the covering columns and their line bitsets
+OverlapMatrix = List[List[float]]  # Overlap percentages, one row per JMH benchmark and one column per JU2JMH benchmark
+PrunedOverlapRow = List[Tuple[int, float]]  # Kept (JU2JMH column, overlap percentage) pairs of a row, highest overlap first
+
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:  # Python < 3.10
+    def popcount(bits: int) -> int:
+        return bin(bits).count("1")
+
+# Encoded coverage matrix inherited by forked worker processes, see compute_overlap_matrix
+_shared_matrix: Tuple[List[SparseRow], ClassColumns, List[int]] = ([], {}, [])
 
 def main() -> None:
     """
@@ -21,11 +58,31 @@ def main() -> None:
     # Output file path. This file will include all JMH benchmarks, and for each JMH benchmark, all ju2jmh benchmarks that have some overlapping coverage.
     output_file_path = "jmh_ju2jmh_overlap.txt"
     
+    parser = argparse.ArgumentParser(description="Measure the coverage overlap between JMH and JU2JMH benchmarks.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes sharing the JMH benchmarks (default: 1, serial)")
+    parser.add_argument("--store", default=None,
+                        help="coverage store built by coverage_store.py, used instead of the per-benchmark reports")
+    parser.add_argument("--cache", default=None,
+                        help="overlap cache file; only benchmarks whose coverage changed are recomputed")
+    parser.add_argument("--artifact", default=None,
+                        help="write a binary overlap artifact instead of the text report (see overlap_artifact.py)")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="keep only the K JU2JMH benchmarks with the highest overlap per JMH benchmark")
+    parser.add_argument("--min-overlap", type=float, default=None,
+                        help="keep only the JU2JMH benchmarks with at least this overlap percentage")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure_from_args("jmh_ju2jmh_overlap_measurement.py", args)
 
     # Load throughput data
     throughput_data = load_throughput_data(throughput_file)
     # Generate the report and save it to a file
-    generate_summary_report(folder_path, throughput_data, output_file_path)
+    generate_summary_report(
+        folder_path, throughput_data, output_file_path,
+        workers=args.workers, store_path=args.store, cache_path=args.cache, artifact_path=args.artifact,
+        top_k=args.top_k, min_overlap=args.min_overlap,
+    )
 
 def load_throughput_data(file_path: str) -> ThroughputData:
     """
@@ -50,6 +107,7 @@ def load_throughput_data(file_path: str) -> ThroughputData:
                 try:
                     throughput_data[benchmark_name] = float(throughput)
                 except ValueError:
+                    instrumentation.count("invalid throughput values")
                     print(f"Warning: Invalid throughput value for {benchmark_name}: {throughput}")
     except FileNotFoundError:
         print(f"Error: Throughput file {file_path} not found.")
@@ -57,7 +115,17 @@ def load_throughput_data(file_path: str) -> ThroughputData:
         print(f"Error reading throughput data: {e}")
     return throughput_data
 
-def generate_summary_report(folder_path: str, throughput_data: ThroughputData, output_file_path: str) -> None:
+def generate_summary_report(
+    folder_path: str,
+    throughput_data: ThroughputData,
+    output_file_path: str,
+    workers: int = 1,
+    store_path: Optional[str] = None,
+    cache_path: Optional[str] = None,
+    artifact_path: Optional[str] = None,
+    top_k: Optional[int] = None,
+    min_overlap: Optional[float] = None,
+) -> None:
     """
     Saves a summary report of JMH benchmarks and their associated JU2JMH benchmarks
     with coverage >= 10%, sorted by overlap percentage, including throughput.
@@ -66,11 +134,22 @@ def generate_summary_report(folder_path: str, throughput_data: ThroughputData, o
         folder_path: Path to the folder containing coverage reports.
         throughput_data: A dictionary of throughput values for JU2JMH benchmarks.
         output_file_path: Path to the output file where the report will be saved.
+        workers: Number of processes computing the overlap matrix.
+        store_path: Optional coverage store to load instead of the reports in folder_path.
+        cache_path: Optional overlap cache, to recompute only the benchmarks whose coverage changed.
+        artifact_path: Optional overlap artifact to write instead of the text report.
+        top_k: Optional number of JU2JMH benchmarks kept per JMH benchmark, highest overlap first.
+        min_overlap: Optional minimum overlap percentage of a kept JU2JMH benchmark.
+            With top_k or min_overlap, pairs without common lines are left out of the report.
     """
-    # Get all benchmark folders
-    benchmark_folders = [
-        f for f in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, f))
-    ]
+    if store_path:
+        # Import here, coverage_store builds on this module
+        from coverage_store import load_coverage_store
+        coverage_index = load_coverage_store(store_path)
+        benchmark_folders = list(coverage_index)
+    else:
+        # Get all benchmark folders
+        benchmark_folders = list_benchmark_folders(folder_path)
 
     # Separate JMH and JU2JMH benchmarks
     jmh_benchmarks = [
@@ -80,51 +159,413 @@ def generate_summary_report(folder_path: str, throughput_data: ThroughputData, o
         f for f in benchmark_folders if "_Benchmark.benchmark_" in f
     ]
 
+    if not store_path:
+        # Parse every coverage report once, then reuse it for all pairwise comparisons
+        coverage_index = load_coverage_index(folder_path, jmh_benchmarks + ju2jmh_benchmarks)
+    if top_k is not None or min_overlap is not None:
+        if cache_path:
+            print("Warning: The overlap cache holds full rows and is not used with --top-k or --min-overlap.")
+        pruned_rows = compute_pruned_overlap_matrix(
+            coverage_index, jmh_benchmarks, ju2jmh_benchmarks, workers, top_k, min_overlap or 0.0
+        )
+    else:
+        if cache_path:
+            # Import here, overlap_cache builds on this module
+            from overlap_cache import compute_overlap_matrix_cached
+            overlap_matrix = compute_overlap_matrix_cached(
+                coverage_index, jmh_benchmarks, ju2jmh_benchmarks, cache_path, workers
+            )
+        else:
+            overlap_matrix = compute_overlap_matrix(coverage_index, jmh_benchmarks, ju2jmh_benchmarks, workers)
+        # Sort matches by overlap percentage in descending order
+        pruned_rows = [
+            sorted(enumerate(overlap_row), key=lambda x: x[1], reverse=True) for overlap_row in overlap_matrix
+        ]
+
+    if artifact_path:
+        # Import here, overlap_artifact builds on this module
+        from overlap_artifact import write_overlap_artifact
+        write_overlap_artifact(artifact_path, jmh_benchmarks, ju2jmh_benchmarks, pruned_rows, throughput_data)
+        return
+
     # Open the output file for writing
     with open(output_file_path, 'w', encoding='utf-8') as output_file:
-        # Compare each JMH benchmark with all JU2JMH benchmarks
-        for jmh_folder in jmh_benchmarks:
-            jmh_path = os.path.join(folder_path, jmh_folder)
-            jmh_coverage = get_coverage_data(jmh_path)
-
-            matched_ju2jmh = []
-
-            for ju2jmh_folder in ju2jmh_benchmarks:
-                ju2jmh_path = os.path.join(folder_path, ju2jmh_folder)
-                ju2jmh_coverage = get_coverage_data(ju2jmh_path)
-
-                # Calculate overlap
-                intersection = calculate_intersection_coverage(jmh_coverage, ju2jmh_coverage)
-                total_lines_ju2jmh = sum(
-                    len(lines)
-                    for classes in ju2jmh_coverage.values()
-                    for lines in classes.values()
-                )
-                total_common_lines = sum(
-                    len(lines)
-                    for classes in intersection.values()
-                    for lines in classes.values()
-                )
-                overlap_percentage = (
-                    (total_common_lines / total_lines_ju2jmh) * 100
-                    if total_lines_ju2jmh
-                    else 0
-                )
-
-                # Filter for coverage >= 10%
-                if overlap_percentage >= 0:
-                    matched_ju2jmh.append((ju2jmh_folder, overlap_percentage))
-
-            # Sort matches by overlap percentage in descending order
-            matched_ju2jmh.sort(key=lambda x: x[1], reverse=True)
-
+        for jmh_folder, matched_ju2jmh in zip(jmh_benchmarks, pruned_rows):
             if matched_ju2jmh:
                 output_file.write(f"> JMH Benchmark: {jmh_folder}\n")
-                for ju2jmh_folder, overlap in matched_ju2jmh:
+                for column, overlap in matched_ju2jmh:
+                    ju2jmh_folder = ju2jmh_benchmarks[column]
                     throughput = throughput_data.get(ju2jmh_folder, "N/A")
                     output_file.write(f" >> JU2JMH Benchmark: {ju2jmh_folder}, Overlap: {overlap:.2f}%, Throughput: {throughput}\n")
                 output_file.write("\n")
 
+def list_benchmark_folders(folder_path: str) -> List[str]:
+    """
+    Lists the benchmark folders of a coverage output directory, in directory order.
+
+    Args:
+        folder_path: Path to the folder containing coverage reports.
+
+    Returns:
+        The names of all sub-folders.
+    """
+    return [
+        f for f in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, f))
+    ]
+
+def load_coverage_index(folder_path: str, benchmark_folders: List[str]) -> CoverageIndex:
+    """
+    Parses the coverage report of every benchmark exactly once into an in-memory index.
+    Class keys are interned so that all benchmarks covering the same class share a
+    single key, and covered lines are stored as frozen sets for fast intersection.
+    A binary "report.cov" is memory-mapped when present, otherwise "report.csv" is parsed.
+
+    Args:
+        folder_path: Path to the folder containing coverage reports.
+        benchmark_folders: Names of the benchmark folders to load.
+
+    Returns:
+        A dictionary mapping benchmark folder names to their indexed coverage.
+    """
+    start_time = time.perf_counter()
+    class_keys: Dict[ClassKey, ClassKey] = {}
+    coverage_index: CoverageIndex = {}
+
+    progress = instrumentation.progress("coverage load", len(benchmark_folders))
+    for benchmark_folder in benchmark_folders:
+        with instrumentation.span("coverage load", benchmark_folder):
+            coverage_index[benchmark_folder] = _load_indexed_coverage(
+                os.path.join(folder_path, benchmark_folder), class_keys
+            )
+        progress.advance()
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Loaded {len(coverage_index)} coverage reports ({len(class_keys)} distinct classes) "
+        f"in {elapsed:.2f}s, peak resident memory: {get_peak_memory_mb():.1f} MB"
+    )
+    return coverage_index
+
+def _load_indexed_coverage(directory: str, class_keys: Dict[ClassKey, ClassKey]) -> IndexedCoverage:
+    """
+    Loads the coverage of one benchmark folder, from report.cov if present, otherwise from report.csv.
+    """
+    binary_file_path = os.path.join(directory, "report.cov")
+    if os.path.exists(binary_file_path):
+        return get_binary_coverage_data(binary_file_path, class_keys)
+
+    indexed_coverage: IndexedCoverage = {}
+    for package_name, classes in get_coverage_data(directory).items():
+        for class_name, lines in classes.items():
+            class_key = (package_name, class_name)
+            class_key = class_keys.setdefault(class_key, class_key)
+            indexed_coverage[class_key] = frozenset(lines)
+    return indexed_coverage
+
+def get_binary_coverage_data(file_path: str, class_keys: Dict[ClassKey, ClassKey]) -> IndexedCoverage:
+    """
+    Loads a binary coverage file by memory mapping it: the sorted line array of each
+    class is turned into a frozen set directly from the mapped buffer.
+
+    Args:
+        file_path: Path to the "report.cov" file.
+        class_keys: Interned class keys, shared between all benchmarks (updated in place).
+
+    Returns:
+        The indexed coverage of the benchmark (empty if the file is invalid).
+    """
+    indexed_coverage: IndexedCoverage = {}
+    try:
+        with open(file_path, 'rb') as binary_file, \
+                mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for package_name, class_name, lines in iter_coverage_binary(mapped, file_path, frozenset):
+                class_key = (sys.intern(package_name), sys.intern(class_name))
+                class_key = class_keys.setdefault(class_key, class_key)
+                indexed_coverage[class_key] = lines
+    except Exception as e:
+        print(f"Error reading binary coverage data from {file_path}: {e}")
+        return {}
+    return indexed_coverage
+
+def encode_line_bitset(lines: FrozenSet[int]) -> int:
+    """
+    Encodes a set of covered line numbers as a bitset with bit n set for line n.
+    """
+    bits = 0
+    for line in lines:
+        bits |= 1 << line
+    return bits
+
+def encode_coverage_matrix(
+    coverage_index: CoverageIndex, jmh_benchmarks: List[str], ju2jmh_benchmarks: List[str]
+) -> Tuple[List[SparseRow], ClassColumns, List[int]]:
+    """
+    Encodes the coverage of all benchmarks as sparse boolean matrices over (package,
+    class, line) entries. Each matrix is stored block-sparse: only the classes a
+    benchmark covers are present, and the lines of each class are packed in a bitset.
+
+    Args:
+        coverage_index: Indexed coverage of all benchmarks.
+        jmh_benchmarks: Names of the JMH benchmark folders.
+        ju2jmh_benchmarks: Names of the JU2JMH benchmark folders.
+
+    Returns:
+        A tuple of (JMH rows, JU2JMH class columns, JU2JMH totals): the class blocks of
+        each JMH benchmark, the JU2JMH columns and line bitsets of each class, and the
+        number of covered lines of each JU2JMH benchmark (the column sums).
+    """
+    class_columns: ClassColumns = {}
+    ju2jmh_totals: List[int] = []
+
+    for column, ju2jmh_folder in enumerate(ju2jmh_benchmarks):
+        total_lines = 0
+        for class_key, lines in coverage_index[ju2jmh_folder].items():
+            columns, bitsets = class_columns.setdefault(class_key, ([], []))
+            columns.append(column)
+            bitsets.append(encode_line_bitset(lines))
+            total_lines += len(lines)
+        ju2jmh_totals.append(total_lines)
+
+    # Classes that no JU2JMH benchmark covers cannot contribute to any overlap
+    jmh_rows = [
+        [
+            (class_key, encode_line_bitset(lines))
+            for class_key, lines in coverage_index[jmh_folder].items()
+            if class_key in class_columns
+        ]
+        for jmh_folder in jmh_benchmarks
+    ]
+
+    return jmh_rows, class_columns, ju2jmh_totals
+
+def compute_overlap_matrix(
+    coverage_index: CoverageIndex, jmh_benchmarks: List[str], ju2jmh_benchmarks: List[str], workers: int = 1
+) -> OverlapMatrix:
+    """
+    Computes the overlap percentage of every (JMH, JU2JMH) pair at once, as the sparse
+    product of the JMH coverage matrix with the JU2JMH coverage matrix divided by the
+    column sums of the JU2JMH matrix (their total covered lines).
+
+    With several workers, the JMH rows are split into contiguous shards computed by a
+    pool of forked processes. The encoded matrix is inherited read-only through fork
+    instead of being pickled per task, and the shards are merged back in row order,
+    so the result is identical to the serial computation.
+
+    Args:
+        coverage_index: Indexed coverage of all benchmarks.
+        jmh_benchmarks: Names of the JMH benchmark folders (matrix rows).
+        ju2jmh_benchmarks: Names of the JU2JMH benchmark folders (matrix columns).
+        workers: Number of processes sharing the JMH rows.
+
+    Returns:
+        The overlap percentages, one row per JMH benchmark.
+    """
+    start_time = time.perf_counter()
+    workers = available_workers(workers)
+    overlap_matrix = list(iter_overlap_rows(coverage_index, jmh_benchmarks, ju2jmh_benchmarks, workers))
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Computed {len(overlap_matrix)} x {len(ju2jmh_benchmarks)} overlap matrix in {elapsed:.2f}s with {workers} worker(s)")
+    return overlap_matrix
+
+def available_workers(workers: int) -> int:
+    """
+    Returns the number of worker processes that can be used, falling back to a serial
+    computation where processes cannot be forked.
+    """
+    if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        print("Warning: the fork start method is not available, computing the overlap matrix serially.")
+        return 1
+    return workers
+
+def iter_overlap_rows(
+    coverage_index: CoverageIndex, jmh_benchmarks: List[str], ju2jmh_benchmarks: List[str], workers: int = 1
+) -> Iterator[List[float]]:
+    """
+    Yields the overlap rows of compute_overlap_matrix one JMH benchmark at a time, in
+    order, as soon as each row (or its shard, with several workers) is computed.
+    """
+    instrumentation.count("pairs compared", len(jmh_benchmarks) * len(ju2jmh_benchmarks))
+    yield from _iter_encoded_rows(coverage_index, jmh_benchmarks, ju2jmh_benchmarks, workers, compute_overlap_row)
+
+def compute_pruned_overlap_matrix(
+    coverage_index: CoverageIndex,
+    jmh_benchmarks: List[str],
+    ju2jmh_benchmarks: List[str],
+    workers: int = 1,
+    top_k: Optional[int] = None,
+    min_overlap: float = 0.0,
+) -> List[PrunedOverlapRow]:
+    """
+    Computes only the overlaps worth keeping: for each JMH benchmark, the JU2JMH
+    benchmarks sharing at least one covered line, with at least min_overlap percent
+    overlap, and at most the top_k highest. Candidates are found through the inverted
+    index from classes to the JU2JMH benchmarks covering them, so pairs without a common
+    class are never compared, and the cutoffs are applied while each row is computed.
+
+    Args:
+        coverage_index: Indexed coverage of all benchmarks.
+        jmh_benchmarks: Names of the JMH benchmark folders (matrix rows).
+        ju2jmh_benchmarks: Names of the JU2JMH benchmark folders (matrix columns).
+        workers: Number of processes sharing the JMH rows.
+        top_k: Maximum number of JU2JMH benchmarks kept per JMH benchmark (default: no limit).
+        min_overlap: Minimum overlap percentage of a kept JU2JMH benchmark.
+
+    Returns:
+        The kept (column, overlap percentage) entries of each JMH benchmark, highest overlap first.
+    """
+    start_time = time.perf_counter()
+    workers = available_workers(workers)
+    row_function = functools.partial(compute_pruned_overlap_row, top_k=top_k, min_overlap=min_overlap)
+    pruned_rows: List[PrunedOverlapRow] = []
+    comparisons = 0
+    for pruned_row, row_comparisons in _iter_encoded_rows(
+        coverage_index, jmh_benchmarks, ju2jmh_benchmarks, workers, row_function
+    ):
+        pruned_rows.append(pruned_row)
+        comparisons += row_comparisons
+    instrumentation.count("pairs compared", comparisons)
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Compared {comparisons} of {len(jmh_benchmarks) * len(ju2jmh_benchmarks)} JMH x JU2JMH pairs sharing a class "
+        f"and kept {sum(map(len, pruned_rows))} overlaps in {elapsed:.2f}s with {workers} worker(s)"
+    )
+    return pruned_rows
+
+def _iter_encoded_rows(
+    coverage_index: CoverageIndex,
+    jmh_benchmarks: List[str],
+    ju2jmh_benchmarks: List[str],
+    workers: int,
+    row_function: Callable,
+) -> Iterator:
+    """
+    Encodes the coverage matrix and yields row_function(jmh_row, class_columns, ju2jmh_totals)
+    for every JMH benchmark in order, computed in shards by forked workers if workers > 1.
+    Each row is traced as a "pair compare" span; with workers, the first row of a shard
+    includes the wait for the shard.
+    """
+    rows = _iter_encoded_shards(coverage_index, jmh_benchmarks, ju2jmh_benchmarks, workers, row_function)
+    progress = instrumentation.progress("pair compare", len(jmh_benchmarks))
+    try:
+        for jmh_benchmark in jmh_benchmarks:
+            with instrumentation.span("pair compare", jmh_benchmark):
+                row = next(rows)
+            progress.advance()
+            yield row
+    finally:
+        # Release the shared matrix and the worker pool
+        rows.close()
+
+def _iter_encoded_shards(
+    coverage_index: CoverageIndex,
+    jmh_benchmarks: List[str],
+    ju2jmh_benchmarks: List[str],
+    workers: int,
+    row_function: Callable,
+) -> Iterator:
+    global _shared_matrix
+
+    _shared_matrix = encode_coverage_matrix(coverage_index, jmh_benchmarks, ju2jmh_benchmarks)
+    jmh_rows = _shared_matrix[0]
+
+    try:
+        if workers > 1 and len(jmh_rows) > 1:
+            # A few shards per worker balance uneven rows without much merge overhead
+            shard_size = max(1, -(-len(jmh_rows) // (workers * 4)))
+            shards = [
+                (row_function, start, min(start + shard_size, len(jmh_rows)))
+                for start in range(0, len(jmh_rows), shard_size)
+            ]
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                for shard_rows in pool.imap(_compute_overlap_shard, shards):
+                    yield from shard_rows
+        else:
+            _, class_columns, ju2jmh_totals = _shared_matrix
+            for jmh_row in jmh_rows:
+                yield row_function(jmh_row, class_columns, ju2jmh_totals)
+    finally:
+        _shared_matrix = ([], {}, [])
+
+def _compute_overlap_shard(shard: Tuple[Callable, int, int]) -> List:
+    """
+    Applies the row function to the JMH benchmarks in [start, stop) of the shared matrix.
+    """
+    jmh_rows, class_columns, ju2jmh_totals = _shared_matrix
+    row_function, start, stop = shard
+    return [row_function(jmh_row, class_columns, ju2jmh_totals) for jmh_row in jmh_rows[start:stop]]
+
+def compute_overlap_row(jmh_row: SparseRow, class_columns: ClassColumns, ju2jmh_totals: List[int]) -> List[float]:
+    """
+    Computes the overlap percentages of one JMH benchmark with all JU2JMH benchmarks.
+    For every class the JMH benchmark covers, the common lines with each JU2JMH
+    benchmark covering that class are counted with a bitset AND and a population count.
+
+    Args:
+        jmh_row: Class blocks of the JMH benchmark.
+        class_columns: JU2JMH columns and line bitsets of each class.
+        ju2jmh_totals: Number of covered lines of each JU2JMH benchmark.
+
+    Returns:
+        The overlap percentage with each JU2JMH benchmark.
+    """
+    common_lines = [0] * len(ju2jmh_totals)
+    for class_key, jmh_bits in jmh_row:
+        columns, bitsets = class_columns[class_key]
+        for column, count in zip(columns, map(popcount, map(jmh_bits.__and__, bitsets))):
+            if count:
+                common_lines[column] += count
+    return [
+        (common / total_lines_ju2jmh) * 100 if total_lines_ju2jmh else 0
+        for common, total_lines_ju2jmh in zip(common_lines, ju2jmh_totals)
+    ]
+
+def compute_pruned_overlap_row(
+    jmh_row: SparseRow,
+    class_columns: ClassColumns,
+    ju2jmh_totals: List[int],
+    top_k: Optional[int] = None,
+    min_overlap: float = 0.0,
+) -> Tuple[PrunedOverlapRow, int]:
+    """
+    Computes the overlaps of one JMH benchmark with the JU2JMH benchmarks covering at
+    least one of its classes, keeping those with common lines, at least min_overlap
+    percent overlap, and at most the top_k highest.
+
+    Returns:
+        The kept (column, overlap percentage) entries, highest overlap first, and the
+        number of JU2JMH benchmarks compared.
+    """
+    common_lines: Dict[int, int] = {}
+    for class_key, jmh_bits in jmh_row:
+        columns, bitsets = class_columns[class_key]
+        for column, count in zip(columns, map(popcount, map(jmh_bits.__and__, bitsets))):
+            common_lines[column] = common_lines.get(column, 0) + count
+
+    # Columns in index order, so that equal overlaps keep the order of the full report
+    kept: PrunedOverlapRow = []
+    for column in sorted(common_lines):
+        total_lines_ju2jmh = ju2jmh_totals[column]
+        overlap = (common_lines[column] / total_lines_ju2jmh) * 100 if total_lines_ju2jmh else 0
+        if overlap > 0 and overlap >= min_overlap:
+            kept.append((column, overlap))
+    if top_k is not None:
+        return heapq.nlargest(top_k, kept, key=lambda x: x[1]), len(common_lines)
+    return sorted(kept, key=lambda x: x[1], reverse=True), len(common_lines)
+
+def get_peak_memory_mb() -> float:
+    """
+    Returns the peak resident memory of the current process in megabytes.
+    """
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return 0.0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
 def get_coverage_data(directory: str) -> CoverageData:
     """
     Reads and parses coverage data from a CSV file in the given directory.
@@ -159,8 +600,10 @@ def get_coverage_data(directory: str) -> CoverageData:
                 coverage_data.setdefault(package_name, {}).setdefault(class_name, []).extend(lines_covered)
 
     except FileNotFoundError:
+        instrumentation.count("coverage reports missing")
         print(f"Warning: Coverage report not found in {directory}.")
     except Exception as e:
+        instrumentation.count("coverage reports unreadable")
         print(f"Error reading coverage data from {directory}: {e}")
 
     return coverage_data
@@ -0,0 +1,255 @@
+import os
+import re
+import time
+import argparse
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from jmh_ju2jmh_overlap_measurement import (
+    ClassKey,
+    CoverageIndex,
+    list_benchmark_folders,
+    load_coverage_index,
+    load_throughput_data,
+)
+from coverage_store import load_coverage_store
+
+# Type aliases for better readability
+CoverageTokens = Dict[str, FrozenSet[int]]  # Maps ju2jmh benchmarks to their covered (class, line) tokens
+Signature = Tuple[int, ...]  # MinHash signature, one minimum per bin
+SimilarPair = Tuple[float, str, str]  # Jaccard similarity and the two benchmarks
+
+# Hash of a token: (HASH_MULTIPLIER * token + HASH_INCREMENT) mod the Mersenne prime 2^61 - 1
+HASH_PRIME = (1 << 61) - 1
+HASH_MULTIPLIER = 0x5DEECE66D1F3B
+HASH_INCREMENT = 0xB
+LINE_BITS = 32  # A token is (class id << LINE_BITS) | line
+
+# Cluster name in a "Cluster_N:benchmark,benchmark," cluster file
+CLUSTER_NUMBER_PATTERN = re.compile(r'^Cluster_(\d+):')
+
+def main() -> None:
+    """
+    Groups ju2jmh benchmarks into clusters by the similarity of their own coverage,
+    without a JMH benchmark as anchor, and saves them in the format read by
+    generate_clusters_source_code.py.
+    """
+    parser = argparse.ArgumentParser(description="Cluster ju2jmh benchmarks by pairwise coverage similarity.")
+    parser.add_argument("folder_path", help="directory containing one coverage report folder per benchmark")
+    parser.add_argument("throughput_file", help="CSV file with the throughput of every ju2jmh benchmark")
+    parser.add_argument("--store", default=None,
+                        help="coverage store built by coverage_store.py, used instead of the per-benchmark reports")
+    parser.add_argument("--output", default="results/similarity_clusters_ready_to_generate.txt",
+                        help="output cluster file (default: results/similarity_clusters_ready_to_generate.txt)")
+    parser.add_argument("--exclude", default=None,
+                        help="file of already clustered ju2jmh benchmarks, e.g. results/clustered_ju2jmh_benchmarks.txt")
+    parser.add_argument("--threshold", type=float, default=0.000005,
+                        help="maximum cumulative runtime of a cluster in seconds (default: 0.000005)")
+    parser.add_argument("--min-similarity", type=float, default=0.5,
+                        help="minimum Jaccard similarity of two benchmarks to be clustered (default: 0.5)")
+    parser.add_argument("--anchored-clusters", default="results/clusters_ready_to_generate_file.txt",
+                        help="cluster file of clsuters_in_a_text.py; the clusters are numbered after its highest "
+                             "Cluster_N, so both sets can be generated into the same package "
+                             "(default: results/clusters_ready_to_generate_file.txt)")
+    parser.add_argument("--first-cluster", type=int, default=None,
+                        help="number of the first cluster, instead of continuing after --anchored-clusters")
+    parser.add_argument("--bands", type=int, default=32, help="number of LSH bands (default: 32)")
+    parser.add_argument("--rows", type=int, default=4, help="number of signature bins per LSH band (default: 4)")
+    args = parser.parse_args()
+    if args.first_cluster is not None and args.first_cluster < 1:
+        parser.error("--first-cluster must be at least 1")
+    first_cluster = args.first_cluster or next_cluster_number(args.anchored_clusters)
+
+    if args.store:
+        coverage_index = load_coverage_store(args.store)
+    else:
+        benchmark_folders = [f for f in list_benchmark_folders(args.folder_path) if "_Benchmark.benchmark_" in f]
+        coverage_index = load_coverage_index(args.folder_path, benchmark_folders)
+
+    excluded: Set[str] = set()
+    if args.exclude:
+        with open(args.exclude, encoding='utf-8') as exclude_file:
+            excluded = {line.strip() for line in exclude_file if line.strip()}
+
+    runtimes = {
+        name: 1 / throughput
+        for name, throughput in load_throughput_data(args.throughput_file).items() if throughput > 0
+    }
+    benchmarks = [
+        name for name in coverage_index
+        if "_Benchmark.benchmark_" in name and name not in excluded and runtimes.get(name, args.threshold + 1) <= args.threshold
+    ]
+
+    tokens = tokenize_coverage(coverage_index, benchmarks)
+    pairs = find_similar_pairs(tokens, args.bands, args.rows, args.min_similarity)
+    clusters = merge_similar_benchmarks(pairs, runtimes, args.threshold)
+    save_clusters(clusters, args.output, first_cluster)
+    print(f"Saved {len(clusters)} clusters (Cluster_{first_cluster} onwards) of "
+          f"{sum(len(c) for c in clusters)} ju2jmh benchmarks to {args.output}")
+
+def tokenize_coverage(coverage_index: CoverageIndex, benchmarks: List[str]) -> CoverageTokens:
+    """
+    Turns the coverage of each benchmark into a set of integer tokens, one per covered
+    line, so that Jaccard similarity is measured over (class, line) pairs.
+
+    Args:
+        coverage_index: Indexed coverage of all benchmarks.
+        benchmarks: Names of the benchmarks to tokenize.
+
+    Returns:
+        A dictionary mapping benchmark names to their covered tokens.
+    """
+    class_ids: Dict[ClassKey, int] = {}
+    tokens: CoverageTokens = {}
+    for name in benchmarks:
+        benchmark_tokens: Set[int] = set()
+        for class_key, lines in coverage_index[name].items():
+            class_bits = class_ids.setdefault(class_key, len(class_ids)) << LINE_BITS
+            benchmark_tokens.update(class_bits | line for line in lines)
+        tokens[name] = frozenset(benchmark_tokens)
+    return tokens
+
+def minhash_signature(benchmark_tokens: FrozenSet[int], num_bins: int) -> Optional[Signature]:
+    """
+    Computes a one-permutation MinHash signature: every token is hashed once and the
+    minimum is kept per bin. Empty bins borrow the value of the next non-empty bin
+    (rotation densification), offset so that borrowed values do not collide with real ones.
+
+    Args:
+        benchmark_tokens: Covered tokens of a benchmark.
+        num_bins: Length of the signature.
+
+    Returns:
+        The signature, or None for a benchmark without coverage.
+    """
+    if not benchmark_tokens:
+        return None
+    bin_size = HASH_PRIME // num_bins + 1
+    minimums: List[Optional[int]] = [None] * num_bins
+    for token in benchmark_tokens:
+        hashed = (HASH_MULTIPLIER * token + HASH_INCREMENT) % HASH_PRIME
+        position, value = divmod(hashed, bin_size)
+        current = minimums[position]
+        if current is None or value < current:
+            minimums[position] = value
+
+    signature = list(minimums)
+    for position in range(num_bins):
+        distance = 1
+        while signature[position] is None:
+            borrowed = minimums[(position + distance) % num_bins]
+            if borrowed is not None:
+                signature[position] = borrowed + distance * bin_size
+            distance += 1
+    return tuple(signature)
+
+def find_similar_pairs(tokens: CoverageTokens, bands: int, rows: int, min_similarity: float) -> List[SimilarPair]:
+    """
+    Finds the pairs of benchmarks whose Jaccard similarity is at least min_similarity.
+    Candidates are the pairs sharing a band of their MinHash signatures (LSH), so that
+    only a small fraction of all pairs is compared exactly.
+
+    Args:
+        tokens: Covered tokens of every benchmark.
+        bands: Number of LSH bands.
+        rows: Number of signature bins per band.
+        min_similarity: Minimum exact Jaccard similarity of a returned pair.
+
+    Returns:
+        The similar pairs, most similar first.
+    """
+    start_time = time.perf_counter()
+    buckets: Dict[Tuple[int, Signature], List[str]] = defaultdict(list)
+    for name, benchmark_tokens in tokens.items():
+        signature = minhash_signature(benchmark_tokens, bands * rows)
+        if signature is None:
+            continue
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(name)
+
+    candidates: Set[Tuple[str, str]] = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                candidates.add((first, second))
+
+    pairs: List[SimilarPair] = []
+    for first, second in candidates:
+        intersection = len(tokens[first] & tokens[second])
+        similarity = intersection / (len(tokens[first]) + len(tokens[second]) - intersection)
+        if similarity >= min_similarity:
+            pairs.append((similarity, first, second))
+    pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+
+    all_pairs = len(tokens) * (len(tokens) - 1) // 2
+    print(
+        f"Compared {len(candidates)} LSH candidate pairs out of {all_pairs}, found {len(pairs)} pairs "
+        f"with similarity >= {min_similarity} in {time.perf_counter() - start_time:.2f}s"
+    )
+    return pairs
+
+def merge_similar_benchmarks(pairs: List[SimilarPair], runtimes: Dict[str, float], threshold: float) -> List[List[str]]:
+    """
+    Merges benchmarks into clusters, most similar pairs first, as long as the cumulative
+    runtime of the merged cluster stays within the threshold.
+
+    Args:
+        pairs: Similar pairs of benchmarks, most similar first.
+        runtimes: Runtime of every benchmark in seconds.
+        threshold: The maximum cumulative runtime for a cluster.
+
+    Returns:
+        The clusters of at least two benchmarks, in order of formation.
+    """
+    cluster_of: Dict[str, int] = {}
+    clusters: List[List[str]] = []
+    cluster_runtimes: List[float] = []
+
+    for _, first, second in pairs:
+        for name in (first, second):
+            if name not in cluster_of:
+                cluster_of[name] = len(clusters)
+                clusters.append([name])
+                cluster_runtimes.append(runtimes[name])
+        first_cluster, second_cluster = cluster_of[first], cluster_of[second]
+        if first_cluster == second_cluster:
+            continue
+        if cluster_runtimes[first_cluster] + cluster_runtimes[second_cluster] > threshold:
+            continue
+        # Merge the smaller cluster into the larger one
+        if len(clusters[first_cluster]) < len(clusters[second_cluster]):
+            first_cluster, second_cluster = second_cluster, first_cluster
+        for name in clusters[second_cluster]:
+            cluster_of[name] = first_cluster
+        clusters[first_cluster].extend(clusters[second_cluster])
+        cluster_runtimes[first_cluster] += cluster_runtimes[second_cluster]
+        clusters[second_cluster] = []
+
+    return [cluster for cluster in clusters if len(cluster) > 1]
+
+def next_cluster_number(cluster_file_path: str) -> int:
+    """
+    Returns the number following the highest Cluster_N of a cluster file, or 1 if the
+    file does not exist, so that new clusters never reuse the name of an existing one.
+    """
+    if not os.path.isfile(cluster_file_path):
+        return 1
+    highest = 0
+    with open(cluster_file_path, encoding='utf-8') as file:
+        for line in file:
+            match = CLUSTER_NUMBER_PATTERN.match(line.strip())
+            if match:
+                highest = max(highest, int(match.group(1)))
+    return highest + 1
+
+def save_clusters(clusters: List[List[str]], output_file_path: str, first_cluster: int = 1) -> None:
+    """
+    Saves the clusters in the "Cluster_N:benchmark,benchmark," format of
+    clsuters_in_a_text.save_cluster_ready_to_generate_file, numbered from first_cluster.
+    """
+    with open(output_file_path, 'w', encoding='utf-8') as file:
+        for i, cluster in enumerate(clusters, first_cluster):
+            file.write(f"Cluster_{i}:" + "".join(name + "," for name in cluster) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import sys
+import math
+import mmap
+import time
+import struct
+import argparse
+from array import array
+from typing import List
+
+from clsuters_in_a_text import BenchmarkData
+from jmh_ju2jmh_overlap_measurement import PrunedOverlapRow, ThroughputData
+
+# Layout of the overlap artifact, written by the overlap measurement and loaded by the clustering.
+# All integers are little-endian uint32 and all scores are little-endian float64.
+# - header: magic b'JOVL', version, number of JMH benchmarks, JU2JMH benchmarks and entries
+# - row offsets: for each JMH benchmark, the index of its first entry (plus an end offset)
+# - columns: the JU2JMH benchmark of each entry, entries of a row sorted by overlap, highest first
+# - overlaps: the overlap percentage of each entry
+# - throughputs: the throughput of each JU2JMH benchmark, NaN when unknown
+# - strings: the JMH then the JU2JMH benchmark names, each as a uint32 byte length followed by UTF-8 bytes
+ARTIFACT_MAGIC = b'JOVL'
+ARTIFACT_VERSION = 1
+ARTIFACT_HEADER = struct.Struct('<4sIIII')
+STRING_LENGTH = struct.Struct('<I')
+
+def main() -> None:
+    """
+    Exports an overlap artifact to the jmh_ju2jmh_overlap.txt text format.
+    """
+    parser = argparse.ArgumentParser(description="Export an overlap artifact to the text overlap report.")
+    parser.add_argument("artifact_path", help="overlap artifact written by jmh_ju2jmh_overlap_measurement.py --artifact")
+    parser.add_argument("output_file_path", help="output text report, e.g. jmh_ju2jmh_overlap.txt")
+    args = parser.parse_args()
+
+    export_overlap_text(args.artifact_path, args.output_file_path)
+
+def write_overlap_artifact(
+    artifact_path: str,
+    jmh_benchmarks: List[str],
+    ju2jmh_benchmarks: List[str],
+    overlap_rows: List[PrunedOverlapRow],
+    throughput_data: ThroughputData,
+) -> None:
+    """
+    Writes overlap rows with the JU2JMH throughputs to an artifact file. Entries are
+    stored in the order of the text report, so that it can be exported unchanged.
+
+    Args:
+        artifact_path: Path of the artifact file to write.
+        jmh_benchmarks: Names of the JMH benchmarks (matrix rows).
+        ju2jmh_benchmarks: Names of the JU2JMH benchmarks (matrix columns).
+        overlap_rows: The (column, overlap percentage) entries of each JMH benchmark, highest overlap first.
+        throughput_data: A dictionary of throughput values for JU2JMH benchmarks.
+    """
+    row_offsets = array('I', [0])
+    columns = array('I')
+    overlaps = array('d')
+    for overlap_row in overlap_rows:
+        columns.extend(column for column, _ in overlap_row)
+        overlaps.extend(overlap for _, overlap in overlap_row)
+        row_offsets.append(len(columns))
+    throughputs = array('d', (throughput_data.get(name, math.nan) for name in ju2jmh_benchmarks))
+
+    strings = bytearray()
+    for name in jmh_benchmarks + ju2jmh_benchmarks:
+        encoded = name.encode('utf-8')
+        strings += STRING_LENGTH.pack(len(encoded)) + encoded
+
+    arrays = (row_offsets, columns, overlaps, throughputs)
+    if sys.byteorder != 'little':
+        for values in arrays:
+            values.byteswap()
+    with open(artifact_path, 'wb') as artifact_file:
+        artifact_file.write(ARTIFACT_HEADER.pack(
+            ARTIFACT_MAGIC, ARTIFACT_VERSION, len(jmh_benchmarks), len(ju2jmh_benchmarks), len(columns)
+        ))
+        for values in arrays:
+            artifact_file.write(values.tobytes())
+        artifact_file.write(strings)
+
+def read_overlap_artifact(artifact_path: str):
+    """
+    Reads the sections of an artifact file.
+
+    Returns:
+        A tuple of the JMH names, JU2JMH names, row offsets, columns, overlaps and throughputs.
+    """
+    with open(artifact_path, 'rb') as artifact_file, \
+            mmap.mmap(artifact_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, version, jmh_count, ju2jmh_count, entry_count = ARTIFACT_HEADER.unpack_from(mapped)
+        if magic != ARTIFACT_MAGIC or version != ARTIFACT_VERSION:
+            raise ValueError(f"{artifact_path} is not an overlap artifact of version {ARTIFACT_VERSION}")
+
+        offset = ARTIFACT_HEADER.size
+        sections = []
+        for typecode, length in (('I', jmh_count + 1), ('I', entry_count), ('d', entry_count), ('d', ju2jmh_count)):
+            values = array(typecode)
+            values.frombytes(mapped[offset:offset + values.itemsize * length])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            sections.append(values)
+            offset += values.itemsize * length
+
+        names = []
+        for _ in range(jmh_count + ju2jmh_count):
+            (length,) = STRING_LENGTH.unpack_from(mapped, offset)
+            offset += STRING_LENGTH.size
+            names.append(sys.intern(mapped[offset:offset + length].decode('utf-8')))
+            offset += length
+
+    return (names[:jmh_count], names[jmh_count:], *sections)
+
+def load_overlap_artifact(artifact_path: str) -> BenchmarkData:
+    """
+    Loads an overlap artifact into the benchmark data used by the clustering, as
+    parse_benchmark_data_from_file does for the text report. Overlaps are rounded to the
+    two decimals of the text report, so that both give the same clusters.
+    JU2JMH benchmarks without throughput are left out, and counted in a warning.
+
+    Args:
+        artifact_path: Path of the artifact file.
+
+    Returns:
+        A dictionary mapping JMH benchmarks to their ju2jmh benchmarks (name, throughput, runtime, score).
+    """
+    start_time = time.perf_counter()
+    jmh_benchmarks, ju2jmh_benchmarks, row_offsets, columns, overlaps, throughputs = read_overlap_artifact(artifact_path)
+
+    benchmark_data: BenchmarkData = {}
+    dropped = 0
+    for row, jmh_benchmark in enumerate(jmh_benchmarks):
+        start, end = row_offsets[row], row_offsets[row + 1]
+        if start == end:
+            continue
+        ju2jmh_list = benchmark_data[jmh_benchmark] = []
+        for column, overlap in zip(columns[start:end], overlaps[start:end]):
+            throughput = throughputs[column]
+            if math.isnan(throughput) or throughput == 0:
+                dropped += 1
+                continue
+            ju2jmh_list.append((ju2jmh_benchmarks[column], throughput, 1 / throughput, round(overlap, 2)))
+
+    if dropped:
+        print(f"Warning: Skipped {dropped} overlap entries of JU2JMH benchmarks without a valid throughput.")
+    print(f"Loaded overlap artifact {artifact_path} ({len(columns)} entries) in {time.perf_counter() - start_time:.2f}s")
+    return benchmark_data
+
+def export_overlap_text(artifact_path: str, output_file_path: str) -> None:
+    """
+    Writes an overlap artifact as the text report of generate_summary_report.
+
+    Args:
+        artifact_path: Path of the artifact file.
+        output_file_path: Path to the output file where the report will be saved.
+    """
+    jmh_benchmarks, ju2jmh_benchmarks, row_offsets, columns, overlaps, throughputs = read_overlap_artifact(artifact_path)
+
+    with open(output_file_path, 'w', encoding='utf-8') as output_file:
+        for row, jmh_folder in enumerate(jmh_benchmarks):
+            start, end = row_offsets[row], row_offsets[row + 1]
+            if start == end:
+                continue
+            output_file.write(f"> JMH Benchmark: {jmh_folder}\n")
+            for column, overlap in zip(columns[start:end], overlaps[start:end]):
+                throughput = "N/A" if math.isnan(throughputs[column]) else throughputs[column]
+                output_file.write(
+                    f" >> JU2JMH Benchmark: {ju2jmh_benchmarks[column]}, Overlap: {overlap:.2f}%, Throughput: {throughput}\n"
+                )
+            output_file.write("\n")
+
+if __name__ == "__main__":
+    main()
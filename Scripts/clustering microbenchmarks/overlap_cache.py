@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+from typing import Dict, List
+
+from jmh_ju2jmh_overlap_measurement import (
+    CoverageIndex,
+    IndexedCoverage,
+    OverlapMatrix,
+    compute_overlap_matrix,
+)
+
+CACHE_VERSION = 1
+
+def coverage_hash(coverage: IndexedCoverage) -> str:
+    """
+    Computes a content hash of a benchmark's coverage, independent of the format it was
+    loaded from and of the order of its classes.
+
+    Args:
+        coverage: Indexed coverage of the benchmark.
+
+    Returns:
+        The SHA-1 hex digest of the covered (package, class, lines) entries.
+    """
+    digest = hashlib.sha1()
+    for (package_name, class_name), lines in sorted(coverage.items()):
+        digest.update(f"{package_name}\0{class_name}\0{','.join(map(str, sorted(lines)))}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_overlap_cache(cache_path: str) -> Dict:
+    """
+    Loads an overlap cache file, or returns an empty cache if it is missing or outdated.
+    """
+    empty_cache = {"version": CACHE_VERSION, "hashes": {}, "ju2jmh": [], "rows": {}}
+    if not os.path.exists(cache_path):
+        return empty_cache
+    try:
+        with open(cache_path, encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable overlap cache {cache_path}: {e}")
+        return empty_cache
+    if cache.get("version") != CACHE_VERSION:
+        return empty_cache
+    return cache
+
+def compute_overlap_matrix_cached(
+    coverage_index: CoverageIndex,
+    jmh_benchmarks: List[str],
+    ju2jmh_benchmarks: List[str],
+    cache_path: str,
+    workers: int = 1,
+) -> OverlapMatrix:
+    """
+    Computes the overlap matrix like compute_overlap_matrix, reusing a persistent cache
+    keyed by the content hash of every benchmark's coverage. Only the rows of new or
+    changed JMH benchmarks, and the columns of new or changed JU2JMH benchmarks, are
+    recomputed. Entries of deleted benchmarks are dropped from the cache.
+
+    Args:
+        coverage_index: Indexed coverage of all benchmarks.
+        jmh_benchmarks: Names of the JMH benchmark folders (matrix rows).
+        ju2jmh_benchmarks: Names of the JU2JMH benchmark folders (matrix columns).
+        cache_path: Path of the overlap cache file, created if missing.
+        workers: Number of processes computing the recomputed parts.
+
+    Returns:
+        The overlap percentages, one row per JMH benchmark.
+    """
+    cache = load_overlap_cache(cache_path)
+    hashes = {name: coverage_hash(coverage_index[name]) for name in jmh_benchmarks + ju2jmh_benchmarks}
+    cached_hashes = cache["hashes"]
+
+    def unchanged(name: str) -> bool:
+        return cached_hashes.get(name) == hashes[name]
+
+    cached_columns = {name: column for column, name in enumerate(cache["ju2jmh"])}
+    cached_rows = cache["rows"]
+    stale_jmh = [name for name in jmh_benchmarks if not (unchanged(name) and name in cached_rows)]
+    fresh_jmh = [name for name in jmh_benchmarks if unchanged(name) and name in cached_rows]
+    stale_ju2jmh = [name for name in ju2jmh_benchmarks if not (unchanged(name) and name in cached_columns)]
+
+    # Whole rows for new or changed JMH benchmarks, and only the changed columns of the other rows
+    stale_rows: Dict[str, List[float]] = {}
+    if stale_jmh:
+        stale_rows = dict(zip(stale_jmh, compute_overlap_matrix(coverage_index, stale_jmh, ju2jmh_benchmarks, workers)))
+    stale_columns: Dict[str, List[float]] = {name: [] for name in fresh_jmh}
+    if fresh_jmh and stale_ju2jmh:
+        stale_columns = dict(zip(fresh_jmh, compute_overlap_matrix(coverage_index, fresh_jmh, stale_ju2jmh, workers)))
+
+    overlap_matrix: OverlapMatrix = []
+    for jmh_folder in jmh_benchmarks:
+        if jmh_folder in stale_rows:
+            overlap_matrix.append(stale_rows[jmh_folder])
+            continue
+        cached_row = cached_rows[jmh_folder]
+        recomputed = dict(zip(stale_ju2jmh, stale_columns[jmh_folder]))
+        overlap_matrix.append([
+            recomputed[name] if name in recomputed else cached_row[cached_columns[name]]
+            for name in ju2jmh_benchmarks
+        ])
+
+    print(
+        f"Overlap cache: recomputed {len(stale_jmh)} of {len(jmh_benchmarks)} JMH rows and "
+        f"{len(stale_ju2jmh)} of {len(ju2jmh_benchmarks)} JU2JMH columns"
+    )
+
+    with open(cache_path, 'w', encoding='utf-8') as cache_file:
+        json.dump({
+            "version": CACHE_VERSION,
+            "hashes": hashes,
+            "ju2jmh": ju2jmh_benchmarks,
+            "rows": dict(zip(jmh_benchmarks, overlap_matrix)),
+        }, cache_file)
+    return overlap_matrix
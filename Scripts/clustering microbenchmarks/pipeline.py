@@ -0,0 +1,245 @@
+import os
+import time
+import argparse
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from clsuters_in_a_text import (
+    BenchmarkData,
+    Clusters,
+    HighestOverlapClusterer,
+    Ju2JmhBenchmark,
+    clusters_all_possible,
+    save_cluster_all_possible_to_file,
+    save_cluster_highest_overlap_to_file,
+    save_cluster_ready_to_generate_file,
+    save_clustered_ju2jmh_benchmarks_file,
+)
+from jmh_ju2jmh_overlap_measurement import (
+    CoverageIndex,
+    PrunedOverlapRow,
+    ThroughputData,
+    available_workers,
+    iter_overlap_rows,
+    list_benchmark_folders,
+    load_coverage_index,
+    load_throughput_data,
+)
+from coverage_store import load_coverage_store
+from generate_clusters_source_code import (
+    DEFAULT_PROFILE,
+    check_source_dir,
+    generate_merged_benchmark_class,
+    load_profiles,
+    write_java_file,
+)
+
+# Type aliases for better readability
+OverlapRow = Tuple[str, List[float]]  # JMH benchmark and its overlap with every JU2JMH benchmark
+BenchmarkRecord = Tuple[str, List[Ju2JmhBenchmark]]  # JMH benchmark and its ju2jmh benchmarks, as clustered
+
+def main() -> None:
+    """
+    Runs the whole workflow from the coverage reports to the cluster list in one
+    process. The stages are generators passing records in memory, so clustering starts
+    on each JMH benchmark as soon as its overlaps are computed. Intermediate files are
+    only written when requested.
+    """
+    parser = argparse.ArgumentParser(description="Compute overlaps and clusters from coverage reports in one run.")
+    parser.add_argument("folder_path", help="directory containing one coverage report folder per benchmark")
+    parser.add_argument("throughput_file", help="CSV file with the throughput of every ju2jmh benchmark")
+    parser.add_argument("--store", default=None,
+                        help="coverage store built by coverage_store.py, used instead of the per-benchmark reports")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes computing the overlaps")
+    parser.add_argument("--threshold", type=float, default=0.000005,
+                        help="maximum cumulative runtime of a cluster in seconds (default: 0.000005)")
+    parser.add_argument("--min-score", type=float, default=0.0,
+                        help="minimum coverage overlap (percent) of a ju2jmh benchmark with its JMH benchmark")
+    parser.add_argument("--overlap-report", default=None, help="also write the text overlap report to this file")
+    parser.add_argument("--artifact", default=None, help="also write the binary overlap artifact to this file")
+    parser.add_argument("--results-dir", default=None,
+                        help="also write the four result files of clsuters_in_a_text.py to this directory")
+    parser.add_argument("--clusters", default=None,
+                        help="write the cluster list to this file instead of printing it")
+    parser.add_argument("--source-dir", default=None,
+                        help="generate the Java source code of every cluster in this directory")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE,
+                        help=f"project profile of the generated source code (default: {DEFAULT_PROFILE}, "
+                             f"see generate_clusters_source_code.py)")
+    parser.add_argument("--profiles-file", default=None, help="JSON file with additional or overridden project profiles")
+    parser.add_argument("--benchmark-sources", default=None,
+                        help="root of the ju2jmh benchmark sources, overriding the profile")
+    args = parser.parse_args()
+
+    # Check the profile before the overlaps and clusters are computed
+    try:
+        profiles = load_profiles(args.profiles_file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.profile not in profiles:
+        parser.error(f"Unknown profile {args.profile}, choose from {', '.join(profiles)}")
+    profile = profiles[args.profile]
+    if args.benchmark_sources:
+        profile['source_dir'] = args.benchmark_sources
+    if args.source_dir:
+        try:
+            check_source_dir(args.profile, profile)
+        except ValueError as e:
+            parser.error(f"{e} (set it in the profile or with --benchmark-sources)")
+
+    start_time = time.perf_counter()
+    if args.store:
+        coverage_index = load_coverage_store(args.store)
+        benchmark_folders = list(coverage_index)
+    else:
+        benchmark_folders = list_benchmark_folders(args.folder_path)
+        coverage_index = None
+    jmh_benchmarks = [f for f in benchmark_folders if "_Benchmark.benchmark_" not in f]
+    ju2jmh_benchmarks = [f for f in benchmark_folders if "_Benchmark.benchmark_" in f]
+    if coverage_index is None:
+        coverage_index = load_coverage_index(args.folder_path, jmh_benchmarks + ju2jmh_benchmarks)
+    throughput_data = load_throughput_data(args.throughput_file)
+
+    rows = iter_overlaps(coverage_index, jmh_benchmarks, ju2jmh_benchmarks, available_workers(args.workers))
+    if args.overlap_report:
+        rows = write_overlap_report(rows, ju2jmh_benchmarks, throughput_data, args.overlap_report)
+    if args.artifact:
+        rows = write_overlap_artifact(rows, ju2jmh_benchmarks, throughput_data, args.artifact)
+    records = iter_benchmark_records(rows, ju2jmh_benchmarks, throughput_data, args.min_score)
+
+    benchmark_data: Optional[BenchmarkData] = {} if args.results_dir else None
+    clusters = cluster_records(records, args.threshold, benchmark_data)
+
+    if args.results_dir:
+        os.makedirs(args.results_dir, exist_ok=True)
+        save_cluster_all_possible_to_file(
+            clusters_all_possible(benchmark_data, args.threshold),
+            os.path.join(args.results_dir, 'clusters_all_possible.txt'),
+        )
+        save_cluster_highest_overlap_to_file(clusters, os.path.join(args.results_dir, 'clusters_highest_overlap.txt'))
+        save_cluster_ready_to_generate_file(clusters, os.path.join(args.results_dir, 'clusters_ready_to_generate_file.txt'))
+        save_clustered_ju2jmh_benchmarks_file(clusters, os.path.join(args.results_dir, 'clustered_ju2jmh_benchmarks.txt'))
+    if args.clusters:
+        save_cluster_ready_to_generate_file(clusters, args.clusters)
+    elif not args.source_dir:
+        for cluster_name, methods in iter_cluster_list(clusters):
+            print(f"{cluster_name}:" + "".join(method + "," for method in methods))
+    if args.source_dir:
+        generate_cluster_sources(clusters, args.source_dir, profile)
+
+    print(f"Formed {sum(len(groups) for groups in clusters.values())} clusters in {time.perf_counter() - start_time:.2f}s")
+
+def iter_overlaps(
+    coverage_index: CoverageIndex, jmh_benchmarks: List[str], ju2jmh_benchmarks: List[str], workers: int
+) -> Iterator[OverlapRow]:
+    """
+    Yields each JMH benchmark with its overlap row as soon as the row is computed.
+    """
+    yield from zip(jmh_benchmarks, iter_overlap_rows(coverage_index, jmh_benchmarks, ju2jmh_benchmarks, workers))
+
+def write_overlap_report(
+    rows: Iterable[OverlapRow], ju2jmh_benchmarks: List[str], throughput_data: ThroughputData, output_file_path: str
+) -> Iterator[OverlapRow]:
+    """
+    Passes the overlap rows through, writing them in the text report format of
+    generate_summary_report along the way.
+    """
+    with open(output_file_path, 'w', encoding='utf-8') as output_file:
+        for jmh_folder, overlap_row in rows:
+            matched_ju2jmh = sorted(zip(ju2jmh_benchmarks, overlap_row), key=lambda x: x[1], reverse=True)
+            if matched_ju2jmh:
+                output_file.write(f"> JMH Benchmark: {jmh_folder}\n")
+                for ju2jmh_folder, overlap in matched_ju2jmh:
+                    throughput = throughput_data.get(ju2jmh_folder, "N/A")
+                    output_file.write(f" >> JU2JMH Benchmark: {ju2jmh_folder}, Overlap: {overlap:.2f}%, Throughput: {throughput}\n")
+                output_file.write("\n")
+            yield jmh_folder, overlap_row
+
+def write_overlap_artifact(
+    rows: Iterable[OverlapRow], ju2jmh_benchmarks: List[str], throughput_data: ThroughputData, artifact_path: str
+) -> Iterator[OverlapRow]:
+    """
+    Passes the overlap rows through and writes them to an overlap artifact once the
+    last row has been seen.
+    """
+    # Import here, overlap_artifact builds on the clustering module
+    from overlap_artifact import write_overlap_artifact as write_artifact
+    jmh_benchmarks: List[str] = []
+    overlap_rows: List[PrunedOverlapRow] = []
+    for jmh_folder, overlap_row in rows:
+        jmh_benchmarks.append(jmh_folder)
+        overlap_rows.append(sorted(enumerate(overlap_row), key=lambda x: x[1], reverse=True))
+        yield jmh_folder, overlap_row
+    write_artifact(artifact_path, jmh_benchmarks, ju2jmh_benchmarks, overlap_rows, throughput_data)
+
+def iter_benchmark_records(
+    rows: Iterable[OverlapRow], ju2jmh_benchmarks: List[str], throughput_data: ThroughputData, min_score: float = 0.0
+) -> Iterator[BenchmarkRecord]:
+    """
+    Turns overlap rows into the ju2jmh benchmarks (name, throughput, runtime, score) of
+    each JMH benchmark, as parse_benchmark_data_from_file reads them from the text
+    report: sorted by overlap, with scores rounded to two decimals, and without the
+    benchmarks that have no throughput.
+    """
+    skipped = 0
+    for jmh_folder, overlap_row in rows:
+        if not ju2jmh_benchmarks:
+            continue
+        ju2jmh_list: List[Ju2JmhBenchmark] = []
+        for ju2jmh_folder, overlap in sorted(zip(ju2jmh_benchmarks, overlap_row), key=lambda x: x[1], reverse=True):
+            throughput = throughput_data.get(ju2jmh_folder)
+            if not throughput:
+                skipped += 1
+                continue
+            score = round(overlap, 2)
+            if score >= min_score:
+                ju2jmh_list.append((ju2jmh_folder, throughput, 1 / throughput, score))
+        yield jmh_folder, ju2jmh_list
+    if skipped:
+        print(f"Warning: Skipped {skipped} overlap entries of JU2JMH benchmarks without a valid throughput.")
+
+def cluster_records(
+    records: Iterable[BenchmarkRecord], threshold: float, benchmark_data: Optional[BenchmarkData] = None
+) -> Clusters:
+    """
+    Feeds every record to the highest-overlap clustering as it arrives, and returns the
+    clusters once all records are consumed.
+
+    Args:
+        records: The ju2jmh benchmarks of each JMH benchmark.
+        threshold: The maximum cumulative runtime for a group.
+        benchmark_data: Optional dictionary collecting the records, for the outputs that need all of them.
+
+    Returns:
+        The clusters, as returned by clusters_highest_overlap.
+    """
+    clusterer = HighestOverlapClusterer(threshold)
+    for jmh_benchmark, ju2jmh_list in records:
+        if benchmark_data is not None:
+            benchmark_data[jmh_benchmark] = ju2jmh_list
+        clusterer.add_jmh_benchmark(jmh_benchmark, ju2jmh_list)
+    return clusterer.finish()
+
+def iter_cluster_list(clusters: Clusters) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Yields the name and the ju2jmh benchmarks of every cluster, numbered as in the
+    cluster file of save_cluster_ready_to_generate_file.
+    """
+    cluster_number = 0
+    for groups in clusters.values():
+        for group in groups:
+            cluster_number += 1
+            yield f"Cluster_{cluster_number}", [ju2jmh[0] for g in group for ju2jmh in g]
+
+def generate_cluster_sources(clusters: Clusters, output_dir: str, profile: dict) -> None:
+    """
+    Generates the Java class of every cluster, as generate_clusters_source_code.py does
+    from the cluster file, for the given project profile.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for cluster_name, methods in iter_cluster_list(clusters):
+        output_file = os.path.join(output_dir, f"{cluster_name}.java")
+        if write_java_file(output_file, generate_merged_benchmark_class(cluster_name, methods, profile)):
+            print(f"Generated: {output_file}")
+
+if __name__ == "__main__":
+    main()
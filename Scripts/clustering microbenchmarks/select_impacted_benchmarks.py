@@ -0,0 +1,265 @@
+import re
+import sys
+import bisect
+import argparse
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from jmh_ju2jmh_overlap_measurement import (
+    ClassKey,
+    CoverageIndex,
+    list_benchmark_folders,
+    load_coverage_index,
+)
+from coverage_store import load_coverage_store
+
+# Type aliases for better readability
+LineRange = Tuple[int, int]  # First and last changed line, inclusive
+FileChanges = Dict[str, List[LineRange]]  # Maps changed file paths to their changed line ranges
+ClassLineIndex = Tuple[List[int], List[List[int]]]  # Sorted covered lines of a class and the benchmarks covering each
+
+HUNK_HEADER_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+CHANGE_PATTERN = re.compile(r'^(.+):(\d+)(?:-(\d+))?$')
+
+def main() -> None:
+    """
+    Selects the clusters and individual benchmarks whose coverage intersects a change,
+    from a unified diff or a list of changed line ranges, and prints them as a JMH
+    regular expression.
+    """
+    parser = argparse.ArgumentParser(description="Select the benchmarks whose covered lines intersect a change.")
+    parser.add_argument("folder_path", help="directory containing one coverage report folder per benchmark")
+    parser.add_argument("--store", default=None,
+                        help="coverage store built by coverage_store.py, used instead of the per-benchmark reports")
+    parser.add_argument("--diff", default=None, help="unified diff of the change, e.g. from 'git diff -U0' ('-' for stdin)")
+    parser.add_argument("--changes", default=None, help="file with one '<path>:<first>-<last>' changed line range per line")
+    parser.add_argument("--clusters", default=None,
+                        help="clusters_ready_to_generate_file.txt: select clusters instead of their member benchmarks")
+    parser.add_argument("--output", default=None, help="file with the selected clusters and benchmarks, one per line")
+    parser.add_argument("--regex-file", default=None, help="write the JMH regular expression to this file")
+    args = parser.parse_args()
+    if not args.diff and not args.changes:
+        parser.error("one of --diff or --changes is required")
+
+    changes: FileChanges = {}
+    if args.diff:
+        with (sys.stdin if args.diff == '-' else open(args.diff, encoding='utf-8')) as diff_file:
+            merge_changes(changes, parse_unified_diff(diff_file))
+    if args.changes:
+        with open(args.changes, encoding='utf-8') as changes_file:
+            merge_changes(changes, parse_change_list(changes_file))
+
+    if args.store:
+        coverage_index = load_coverage_store(args.store)
+    else:
+        coverage_index = load_coverage_index(args.folder_path, list_benchmark_folders(args.folder_path))
+
+    impacted = select_impacted_benchmarks(coverage_index, changes)
+    clusters: List[str] = []
+    if args.clusters:
+        clusters, impacted = group_by_cluster(impacted, load_cluster_members(args.clusters))
+    print(f"{len(clusters)} clusters and {len(impacted)} individual benchmarks cover the changed lines")
+
+    regex = jmh_regex(clusters, impacted)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.writelines(f"{name}\n" for name in clusters + impacted)
+    if args.regex_file:
+        # An empty file means that nothing has to run: an empty JMH regex would select every benchmark
+        with open(args.regex_file, 'w', encoding='utf-8') as regex_file:
+            regex_file.write(f"{regex}\n" if regex else "")
+    else:
+        print(regex)
+
+def parse_unified_diff(lines: Iterable[str]) -> FileChanges:
+    """
+    Reads the changed lines of every file of a unified diff. Lines are numbered as in
+    the original file, the version the coverage was measured on: removed lines are
+    changed, and an added line changes the original lines around it.
+
+    Args:
+        lines: The lines of the diff.
+
+    Returns:
+        The changed line ranges of every file of the original version.
+    """
+    changes: FileChanges = {}
+    path: Optional[str] = None
+    old_line = old_remaining = new_remaining = 0
+    previous_kind = ' '
+    for line in lines:
+        if old_remaining > 0 or new_remaining > 0:
+            # Hunk body, counted so that content lines starting with "---" are not taken for headers
+            if line.startswith('\\'):
+                continue
+            kind = line[:1] or ' '
+            if kind == ' ':
+                old_line += 1
+                old_remaining -= 1
+                new_remaining -= 1
+            elif kind == '-':
+                changes.setdefault(path, []).append((old_line, old_line))
+                old_line += 1
+                old_remaining -= 1
+            elif kind == '+':
+                if previous_kind != '-' and previous_kind != '+':
+                    # Lines replacing removed lines are already counted, others change the code around them
+                    changes.setdefault(path, []).append((max(1, old_line - 1), old_line))
+                new_remaining -= 1
+            previous_kind = kind
+            continue
+        if line.startswith('--- '):
+            path = line[4:].split('\t')[0].strip()
+            path = path[2:] if path.startswith('a/') else path
+            continue
+        match = HUNK_HEADER_PATTERN.match(line)
+        if match:
+            old_line = int(match.group(1))
+            old_remaining = int(match.group(2) or 1)
+            new_remaining = int(match.group(4) or 1)
+            previous_kind = ' '
+            if old_remaining == 0:
+                # Pure insertion after old_line
+                old_line += 1
+    changes.pop('/dev/null', None)  # Added files, no coverage exists for them
+    return {path: merge_ranges(ranges) for path, ranges in changes.items()}
+
+def parse_change_list(lines: Iterable[str]) -> FileChanges:
+    """
+    Reads '<path>:<first>-<last>' (or '<path>:<line>') changed line ranges.
+    """
+    changes: FileChanges = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = CHANGE_PATTERN.match(line)
+        if not match:
+            print(f"Warning: Skipping invalid change {line}")
+            continue
+        first = int(match.group(2))
+        changes.setdefault(match.group(1), []).append((first, int(match.group(3) or first)))
+    return {path: merge_ranges(ranges) for path, ranges in changes.items()}
+
+def merge_ranges(ranges: List[LineRange]) -> List[LineRange]:
+    """
+    Sorts line ranges and merges those that overlap or touch.
+    """
+    merged: List[LineRange] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+def merge_changes(changes: FileChanges, more_changes: FileChanges) -> None:
+    for path, ranges in more_changes.items():
+        changes[path] = merge_ranges(changes.get(path, []) + ranges)
+
+def build_line_index(coverage_index: CoverageIndex) -> Tuple[List[str], Dict[ClassKey, ClassLineIndex]]:
+    """
+    Inverts the coverage index: for every class, its covered lines in ascending order
+    and the benchmarks covering each line, so that the benchmarks covering a line range
+    are found with two binary searches.
+
+    Returns:
+        The benchmark names, and the line index of every class referring to them by position.
+    """
+    benchmarks = list(coverage_index)
+    covering: Dict[ClassKey, Dict[int, List[int]]] = {}
+    for position, benchmark in enumerate(benchmarks):
+        for class_key, lines in coverage_index[benchmark].items():
+            class_lines = covering.setdefault(class_key, {})
+            for line in lines:
+                class_lines.setdefault(line, []).append(position)
+    line_index: Dict[ClassKey, ClassLineIndex] = {}
+    for class_key, class_lines in covering.items():
+        sorted_lines = sorted(class_lines)
+        line_index[class_key] = (sorted_lines, [class_lines[line] for line in sorted_lines])
+    return benchmarks, line_index
+
+def source_path_classes(class_keys: Iterable[ClassKey]) -> Dict[str, ClassKey]:
+    """
+    Maps the source path of every covered class (package directories and file name,
+    e.g. "zipkin2/internal/Proto3Codec.java") to its class key.
+    """
+    return {f"{package_name.replace('.', '/')}/{class_name}": (package_name, class_name)
+            for package_name, class_name in class_keys}
+
+def resolve_class(path: str, classes: Dict[str, ClassKey]) -> Optional[ClassKey]:
+    """
+    Finds the class of a changed file by the longest path suffix that is a covered
+    source path, e.g. "zipkin/src/main/java/zipkin2/Span.java" is "zipkin2/Span.java".
+    """
+    parts = path.replace('\\', '/').split('/')
+    for start in range(len(parts)):
+        class_key = classes.get('/'.join(parts[start:]))
+        if class_key is not None:
+            return class_key
+    return None
+
+def select_impacted_benchmarks(coverage_index: CoverageIndex, changes: FileChanges) -> List[str]:
+    """
+    Selects the benchmarks covering at least one changed line.
+
+    Args:
+        coverage_index: Indexed coverage of every benchmark.
+        changes: The changed line ranges of every changed file.
+
+    Returns:
+        The impacted benchmarks, sorted by name.
+    """
+    benchmarks, line_index = build_line_index(coverage_index)
+    classes = source_path_classes(line_index)
+    impacted: Set[int] = set()
+    unresolved = 0
+    for path, ranges in changes.items():
+        class_key = resolve_class(path, classes)
+        if class_key is None:
+            unresolved += 1
+            continue
+        sorted_lines, covering = line_index[class_key]
+        for first, last in ranges:
+            for positions in covering[bisect.bisect_left(sorted_lines, first):bisect.bisect_right(sorted_lines, last)]:
+                impacted.update(positions)
+    if unresolved:
+        print(f"{unresolved} of {len(changes)} changed files are not covered by any benchmark")
+    return sorted(benchmarks[position] for position in impacted)
+
+def load_cluster_members(cluster_file: str) -> Dict[str, List[str]]:
+    """
+    Reads the ju2jmh benchmarks of every cluster from a "Cluster_N:benchmark,benchmark," file.
+    """
+    cluster_members: Dict[str, List[str]] = {}
+    with open(cluster_file, encoding='utf-8') as file:
+        for line in file:
+            if ':' in line:
+                cluster, members = line.split(':', 1)
+                cluster_members[cluster.strip()] = [m.strip() for m in members.split(',') if m.strip()]
+    return cluster_members
+
+def group_by_cluster(impacted: List[str], cluster_members: Dict[str, List[str]]) -> Tuple[List[str], List[str]]:
+    """
+    Replaces the impacted ju2jmh benchmarks that belong to a cluster by their cluster.
+
+    Returns:
+        The impacted clusters in cluster file order, and the impacted benchmarks outside any cluster.
+    """
+    cluster_of = {member: cluster for cluster, members in cluster_members.items() for member in members}
+    impacted_clusters = {cluster_of[b] for b in impacted if b in cluster_of}
+    clusters = [cluster for cluster in cluster_members if cluster in impacted_clusters]
+    return clusters, [b for b in impacted if b not in cluster_of]
+
+def jmh_regex(clusters: List[str], benchmarks: List[str]) -> str:
+    """
+    Builds a JMH benchmark regular expression matching exactly the given clusters
+    (in any package) and benchmarks, or an empty string if there are none.
+    """
+    alternatives = [re.escape(benchmark) for benchmark in benchmarks]
+    if clusters:
+        numbers = "|".join(cluster.replace("Cluster_", "") for cluster in clusters)
+        alternatives.append(rf".*\.Cluster_(?:{numbers})\._Benchmark\.benchmark_Cluster_\d+")
+    return f"^(?:{'|'.join(alternatives)})$" if alternatives else ""
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import java.io.IOException;
+import java.lang.reflect.Method;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+
+import org.openjdk.jmh.runner.Runner;
+import org.openjdk.jmh.runner.options.CommandLineOptions;
+
+/**
+ * Runs many JMH benchmarks in sequence inside a single JVM and writes an isolated
+ * JaCoCo execution data file for each of them.
+ *
+ * The JVM must be started with the JaCoCo agent (-javaagent:org.jacoco.agent.jar) and
+ * the JMH benchmark jar on the classpath. Before each benchmark the agent's execution
+ * data is reset, and after it the data is dumped to OUTPUT_DIR/<benchmark>/coverage.exec.
+ * Benchmarks must run in this JVM, so the JMH options should include "-f 0".
+ *
+ * Usage: java -javaagent:org.jacoco.agent.jar=output=none -cp benchmarks.jar \
+ *            CoverageLauncher.java <benchmark_list> <output_dir> [JMH options...]
+ */
+public class CoverageLauncher {
+
+    public static void main(String[] args) throws Exception {
+        if (args.length < 2) {
+            System.err.println("Usage: CoverageLauncher <benchmark_list> <output_dir> [JMH options...]");
+            System.exit(1);
+        }
+        Path outputDir = Paths.get(args[1]);
+        String[] jmhOptions = Arrays.copyOfRange(args, 2, args.length);
+
+        // The agent runtime is only reachable through the agent jar, so it is called reflectively
+        Object agent = Class.forName("org.jacoco.agent.rt.RT").getMethod("getAgent").invoke(null);
+        Method reset = agent.getClass().getMethod("reset");
+        Method getExecutionData = agent.getClass().getMethod("getExecutionData", boolean.class);
+
+        int failures = 0;
+        for (String benchmark : Files.readAllLines(Paths.get(args[0]))) {
+            benchmark = benchmark.trim();
+            // Skip empty lines or comments
+            if (benchmark.isEmpty() || benchmark.startsWith("#")) {
+                continue;
+            }
+            System.out.println("Processing benchmark: " + benchmark);
+
+            List<String> benchmarkArgs = new ArrayList<>(Arrays.asList(jmhOptions));
+            benchmarkArgs.add(benchmark + "$");
+
+            reset.invoke(agent);
+            try {
+                new Runner(new CommandLineOptions(benchmarkArgs.toArray(new String[0]))).run();
+            } catch (Exception e) {
+                System.err.println("Error: Benchmark " + benchmark + " failed: " + e);
+                failures++;
+                continue;
+            }
+            byte[] executionData = (byte[]) getExecutionData.invoke(agent, false);
+            writeExecutionData(outputDir.resolve(benchmark), executionData);
+        }
+
+        if (failures > 0) {
+            System.err.println("Error: " + failures + " benchmark(s) failed");
+            System.exit(1);
+        }
+    }
+
+    private static void writeExecutionData(Path benchmarkDir, byte[] executionData) throws IOException {
+        Files.createDirectories(benchmarkDir);
+        Files.write(benchmarkDir.resolve("coverage.exec"), executionData);
+    }
+}
@@ -0,0 +1,101 @@
+import argparse
+import filecmp
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+# Runs one converter in a fresh interpreter and reports its wall time and peak memory as JSON
+CHILD_SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+import jacoco_xml_to_csv_only_covered_lines as converter
+start = time.perf_counter()
+getattr(converter, sys.argv[2])(sys.argv[3], sys.argv[4])
+elapsed = time.perf_counter() - start
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "peak_mb": max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024}))
+"""
+
+IMPLEMENTATIONS = ["extract_data", "extract_data_streaming"]
+
+def generate_jacoco_report(xml_file, packages, sourcefiles, lines, seed=0):
+    """
+    Writes a synthetic JaCoCo XML report with the same structure as the reports
+    produced by `jacoco-cli report --xml`.
+
+    Args:
+        xml_file (str): Path of the report to write.
+        packages (int): Number of packages.
+        sourcefiles (int): Number of source files (and classes) per package.
+        lines (int): Number of lines per source file.
+        seed (int): Seed of the random coverage.
+    """
+    rng = random.Random(seed)
+    with open(xml_file, 'w', encoding='utf-8') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   '<!DOCTYPE report PUBLIC "-//JACOCO//DTD Report 1.1//EN" "report.dtd">'
+                   '<report name="benchmark"><sessioninfo id="synthetic" start="0" dump="1"/>\n')
+        for p in range(packages):
+            package_name = f"org/example/package{p}"
+            file.write(f'<package name="{package_name}">\n')
+            for s in range(sourcefiles):
+                file.write(f'<class name="{package_name}/Class{s}" sourcefilename="Class{s}.java">'
+                           f'<method name="run" desc="()V" line="1">'
+                           f'<counter type="INSTRUCTION" missed="1" covered="1"/></method>'
+                           f'<counter type="LINE" missed="1" covered="1"/></class>\n')
+            for s in range(sourcefiles):
+                file.write(f'<sourcefile name="Class{s}.java">\n')
+                # Most classes of a large report are not covered by a single benchmark
+                covered = rng.random() < 0.2
+                for n in range(1, lines + 1):
+                    ci = rng.randint(1, 9) if covered and rng.random() < 0.5 else 0
+                    file.write(f'<line nr="{n}" mi="{0 if ci else 3}" ci="{ci}" mb="0" cb="0"/>\n')
+                file.write('<counter type="LINE" missed="1" covered="1"/></sourcefile>\n')
+            file.write('<counter type="LINE" missed="1" covered="1"/></package>\n')
+        file.write('<counter type="LINE" missed="1" covered="1"/></report>\n')
+
+def run_converter(implementation, xml_file, csv_file):
+    """
+    Runs a converter implementation in a fresh Python process.
+
+    Returns:
+        A dictionary with the wall time in seconds and the peak resident memory in MB.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, script_dir, implementation, xml_file, csv_file],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(result.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory and wall time of the XML to CSV converters.")
+    parser.add_argument("--packages", type=int, default=200, help="number of packages in the synthetic report")
+    parser.add_argument("--sourcefiles", type=int, default=50, help="number of source files per package")
+    parser.add_argument("--lines", type=int, default=200, help="number of lines per source file")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of each implementation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        xml_file = os.path.join(work_dir, "report.xml")
+        generate_jacoco_report(xml_file, args.packages, args.sourcefiles, args.lines)
+        print(f"Synthetic report: {os.path.getsize(xml_file) / (1024 * 1024):.1f} MB")
+
+        csv_files = {}
+        for implementation in IMPLEMENTATIONS:
+            csv_files[implementation] = os.path.join(work_dir, f"{implementation}.csv")
+            runs = [run_converter(implementation, xml_file, csv_files[implementation]) for _ in range(args.repeat)]
+            best_seconds = min(run["seconds"] for run in runs)
+            peak_mb = max(run["peak_mb"] for run in runs)
+            print(f"{implementation:<24} wall time: {best_seconds:8.2f}s   peak memory: {peak_mb:8.1f} MB")
+
+        identical = filecmp.cmp(*csv_files.values(), shallow=False)
+        print(f"Identical CSV output: {identical}")
+        if not identical:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
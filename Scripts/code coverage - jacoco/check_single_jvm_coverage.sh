@@ -0,0 +1,102 @@
+#!/bin/bash
+
+# Checks that CoverageLauncher.java isolates the coverage of every benchmark. Two stand-in
+# benchmarks, covering different lines of the same class, run in one JVM. Their reports
+# must equal those of a fresh JVM per benchmark (the measure_coverage.sh baseline), and
+# must not share any covered line. A JMH stand-in (standin/org/openjdk/jmh) replaces the
+# JMH runner, so only Java 11+, JaCoCo and Python 3 are needed.
+
+# Path to JaCoCo agent JAR
+JACOCO_AGENT_JAR="/path_to_jacoco_agent_jar/org.jacoco.agent.jar"
+
+# Path to JaCoCo CLI JAR
+JACOCO_CLI_JAR="/path_to_jacoco_cli_jar/org.jacoco.cli.jar"
+
+# Python script to convert XML report to CSV
+PYTHON_SCRIPT="jacoco_xml_to_csv_only_covered_lines.py"
+
+# Java launcher under test, and the sources of the stand-in benchmarks and JMH runner
+LAUNCHER="CoverageLauncher.java"
+STANDIN_DIR="standin"
+
+BENCHMARKS=("standin.StandInBenchmarks.first" "standin.StandInBenchmarks.second")
+
+# Ensure the required files and directories exist
+for required_file in "$JACOCO_AGENT_JAR" "$JACOCO_CLI_JAR" "$PYTHON_SCRIPT" "$LAUNCHER"; do
+    if [[ ! -f "$required_file" ]]; then
+        echo "Error: Required file not found at $required_file"
+        exit 1
+    fi
+done
+
+work_dir=$(mktemp -d)
+trap 'rm -rf "$work_dir"' EXIT
+
+# Compile the stand-ins
+mkdir -p "$work_dir/classes"
+find "$STANDIN_DIR" -name '*.java' > "$work_dir/sources.txt"
+if ! javac -d "$work_dir/classes" @"$work_dir/sources.txt"; then
+    echo "Error: Could not compile the stand-in benchmarks"
+    exit 1
+fi
+
+# Runs the benchmarks of a list in one JVM: run_launcher <benchmark_list> <output_dir>
+run_launcher() {
+    java -javaagent:"$JACOCO_AGENT_JAR"=output=none -cp "$work_dir/classes" "$LAUNCHER" "$1" "$2" -f 0
+}
+
+# All benchmarks in one JVM, then the baseline of a fresh JVM per benchmark
+printf '%s\n' "${BENCHMARKS[@]}" > "$work_dir/benchmarks.txt"
+run_launcher "$work_dir/benchmarks.txt" "$work_dir/single" || exit 1
+for benchmark in "${BENCHMARKS[@]}"; do
+    echo "$benchmark" > "$work_dir/one.txt"
+    run_launcher "$work_dir/one.txt" "$work_dir/separate" || exit 1
+done
+
+# Reports of the stand-in benchmark classes only: the stand-in runner is covered by every run
+for mode in single separate; do
+    for benchmark in "${BENCHMARKS[@]}"; do
+        benchmark_dir="$work_dir/$mode/$benchmark"
+        if [[ ! -f "$benchmark_dir/coverage.exec" ]]; then
+            echo "Error: Coverage file not generated for $benchmark ($mode)"
+            exit 1
+        fi
+        java -jar "$JACOCO_CLI_JAR" report "$benchmark_dir/coverage.exec" \
+             --classfiles "$work_dir/classes/standin" \
+             --xml "$benchmark_dir/report.xml" > /dev/null || exit 1
+        python3 "$PYTHON_SCRIPT" "$benchmark_dir/report.xml" "$benchmark_dir/report.csv" || exit 1
+    done
+done
+
+# Covered "<class>:<line>" entries of a report, one per line
+covered_lines() {
+    tail -n +2 "$1" | while IFS=, read -r package_name class_name lines; do
+        # The CSV rows end with "\r\n"
+        tr ';' '\n' <<< "${lines%$'\r'}" | sed "s|^|$package_name/$class_name:|"
+    done | sort
+}
+
+status=0
+for benchmark in "${BENCHMARKS[@]}"; do
+    if [[ -z $(covered_lines "$work_dir/separate/$benchmark/report.csv") ]]; then
+        echo "Error: $benchmark covers no line in a fresh JVM, the stand-in did not run"
+        status=1
+    fi
+    if ! cmp -s "$work_dir/single/$benchmark/report.csv" "$work_dir/separate/$benchmark/report.csv"; then
+        echo "Error: Coverage of $benchmark in a shared JVM differs from a fresh JVM:"
+        diff "$work_dir/separate/$benchmark/report.csv" "$work_dir/single/$benchmark/report.csv"
+        status=1
+    fi
+done
+shared=$(comm -12 <(covered_lines "$work_dir/single/${BENCHMARKS[0]}/report.csv") \
+                  <(covered_lines "$work_dir/single/${BENCHMARKS[1]}/report.csv"))
+if [[ -n "$shared" ]]; then
+    echo "Error: Execution data leaked between the benchmarks of one JVM, shared lines:"
+    echo "$shared"
+    status=1
+fi
+
+if [[ $status -eq 0 ]]; then
+    echo "OK: the coverage of every benchmark is isolated in a shared JVM"
+fi
+exit $status
@@ -1,7 +1,28 @@
 import xml.etree.ElementTree as ET
+import argparse
 import csv
-import sys
+import os
 import re
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# Scripts/ holds the instrumentation layer shared by the scripts of all folders. It is
+# appended, so that it cannot shadow other modules.
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+import instrumentation  # noqa: E402
+
+# Binary coverage format, see write_coverage_binary
+COVERAGE_MAGIC = b'JCOV'
+COVERAGE_VERSION = 1
+COVERAGE_HEADER = struct.Struct('<4sIII')  # magic, version, number of classes, number of lines
+COVERAGE_CLASS_ENTRY = struct.Struct('<IHH')  # number of lines, package name length, class name length
+
+# File name of the converted report of each benchmark, per output format
+REPORT_FILE_NAMES = {'csv': 'report.csv', 'binary': 'report.cov'}
 
 def extract_namespace(element):
     """
@@ -60,10 +81,327 @@ def extract_data(xml_file, csv_file):
                 if covered_lines:
                     writer.writerow([package_name, class_name, ';'.join(covered_lines)])
 
+def extract_data_streaming(xml_file, csv_file):
+    """
+    Streaming variant of extract_data that produces an identical CSV file.
+
+    The report is parsed incrementally: each sourcefile's covered lines are written as
+    soon as its element is closed, and finished elements are then detached from the
+    tree, so memory usage stays flat regardless of the report size.
+
+    Args:
+        xml_file (str): Path to the input JaCoCo XML coverage report.
+        csv_file (str): Path to the output CSV file.
+    """
+    with open(csv_file, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Package Name', 'Class Name', 'Covered Lines'])
+        for package_name, class_name, covered_lines in iter_covered_sourcefiles(xml_file):
+            writer.writerow([package_name, class_name, ';'.join(covered_lines)])
+
+def iter_covered_sourcefiles(xml_file):
+    """
+    Incrementally parses a JaCoCo XML coverage report and yields the source files that
+    have covered lines (ci != "0"), in document order.
+
+    Args:
+        xml_file (str): Path to the input JaCoCo XML coverage report.
+
+    Yields:
+        tuple: (package name, source file name, list of covered line numbers as strings).
+    """
+    package_tag = sourcefile_tag = line_tag = None
+    # Currently open elements, from the root down to the innermost one
+    open_elements = []
+    for event, element in ET.iterparse(xml_file, events=('start', 'end')):
+        if event == 'start':
+            if not open_elements:
+                # Handle namespace if present, based on the root element
+                namespace = extract_namespace(element)
+                prefix = '{' + namespace + '}' if namespace else ''
+                package_tag = prefix + 'package'
+                sourcefile_tag = prefix + 'sourcefile'
+                line_tag = prefix + 'line'
+            open_elements.append(element)
+            continue
+
+        open_elements.pop()
+        if not open_elements:
+            break
+        parent = open_elements[-1]
+        if parent.tag == sourcefile_tag:
+            # Lines are read when their sourcefile closes
+            continue
+
+        if element.tag == sourcefile_tag and parent.tag == package_tag and len(open_elements) > 1:
+            covered_lines = []
+            for line in element.findall(line_tag):
+                if line.get('ci') != "0":
+                    line_number = line.get('nr')
+                    if line_number:
+                        covered_lines.append(line_number)
+            if covered_lines:
+                yield parent.get('name'), element.get('name'), covered_lines
+
+        # Everything before this element in its parent has been processed as well
+        del parent[:]
+
+def extract_data_binary(xml_file, cov_file):
+    """
+    Extracts the covered lines of a JaCoCo XML coverage report into the compact binary
+    coverage format, which the overlap measurement loads by memory mapping.
+
+    Args:
+        xml_file (str): Path to the input JaCoCo XML coverage report.
+        cov_file (str): Path to the output binary coverage file.
+    """
+    write_coverage_binary(
+        ((package_name, class_name, [int(line) for line in covered_lines])
+         for package_name, class_name, covered_lines in iter_covered_sourcefiles(xml_file)),
+        cov_file,
+    )
+
+def write_coverage_binary(rows, cov_file):
+    """
+    Writes covered lines in the binary coverage format. All integers are little-endian:
+    - header: magic b'JCOV', version, number of classes, total number of lines (4 x uint32)
+    - lines: the sorted covered lines of every class, concatenated (uint32 each)
+    - class table: per class, its number of lines (uint32), the UTF-8 lengths of its
+      package and class names (2 x uint16), followed by both names
+
+    Args:
+        rows (iterable): (package name, class name, covered line numbers) tuples.
+        cov_file (str): Path to the output binary coverage file.
+    """
+    lines = array('I')
+    class_table = bytearray()
+    class_count = 0
+    for package_name, class_name, covered_lines in rows:
+        package_bytes = package_name.encode('utf-8')
+        class_bytes = class_name.encode('utf-8')
+        covered_lines = sorted(set(covered_lines))
+        lines.extend(covered_lines)
+        class_table += COVERAGE_CLASS_ENTRY.pack(len(covered_lines), len(package_bytes), len(class_bytes))
+        class_table += package_bytes + class_bytes
+        class_count += 1
+
+    if sys.byteorder != 'little':
+        lines.byteswap()
+    with open(cov_file, 'wb') as file:
+        file.write(COVERAGE_HEADER.pack(COVERAGE_MAGIC, COVERAGE_VERSION, class_count, len(lines)))
+        file.write(lines.tobytes())
+        file.write(class_table)
+
+def read_coverage_binary(cov_file):
+    """
+    Reads a binary coverage file.
+
+    Args:
+        cov_file (str): Path to the binary coverage file.
+
+    Returns:
+        list: (package name, class name, sorted covered line numbers) tuples.
+    """
+    with open(cov_file, 'rb') as file:
+        data = file.read()
+    return list(iter_coverage_binary(data, cov_file, lambda lines: lines.tolist()))
+
+def iter_coverage_binary(data, name, convert_lines):
+    """
+    Parses binary coverage data, checking that the class and line counts of the header
+    account for the whole data. This is the only reader of the format, also used by the
+    overlap measurement on memory-mapped files.
+
+    Args:
+        data: The binary coverage data, any buffer (bytes, mmap).
+        name (str): Name of the data, for error messages.
+        convert_lines (callable): Converts the covered lines of a class, a view into the
+            data that is only valid during the call, e.g. to a list or a frozenset.
+
+    Yields:
+        tuple: (package name, class name, converted covered lines) of every class.
+
+    Raises:
+        ValueError: If the data is not binary coverage data or is truncated.
+    """
+    if len(data) < COVERAGE_HEADER.size:
+        raise ValueError(f"{name} is truncated")
+    magic, version, class_count, line_count = COVERAGE_HEADER.unpack_from(data)
+    if magic != COVERAGE_MAGIC or version != COVERAGE_VERSION:
+        raise ValueError(f"{name} is not a binary coverage file of version {COVERAGE_VERSION}")
+    lines_end = COVERAGE_HEADER.size + 4 * line_count
+    if lines_end > len(data):
+        raise ValueError(f"{name} is truncated")
+
+    with memoryview(data) as buffer:
+        if sys.byteorder == 'little':
+            lines = buffer[COVERAGE_HEADER.size:lines_end].cast('I')
+        else:
+            lines = array('I', buffer[COVERAGE_HEADER.size:lines_end].tobytes())
+            lines.byteswap()
+        try:
+            offset = lines_end
+            line_start = 0
+            for _ in range(class_count):
+                if offset + COVERAGE_CLASS_ENTRY.size > len(data):
+                    raise ValueError(f"{name} is truncated")
+                lines_in_class, package_length, class_length = COVERAGE_CLASS_ENTRY.unpack_from(data, offset)
+                offset += COVERAGE_CLASS_ENTRY.size
+                if offset + package_length + class_length > len(data) or line_start + lines_in_class > line_count:
+                    raise ValueError(f"{name} is truncated or corrupt")
+                package_name = bytes(buffer[offset:offset + package_length]).decode('utf-8')
+                offset += package_length
+                class_name = bytes(buffer[offset:offset + class_length]).decode('utf-8')
+                offset += class_length
+                yield package_name, class_name, convert_lines(lines[line_start:line_start + lines_in_class])
+                line_start += lines_in_class
+            if offset != len(data) or line_start != line_count:
+                raise ValueError(f"{name} is truncated or corrupt")
+        finally:
+            # A memory-mapped file cannot be closed while views into it exist
+            if isinstance(lines, memoryview):
+                lines.release()
+
+def export_binary_to_csv(cov_file, csv_file):
+    """
+    Exports a binary coverage file to the CSV format, for human inspection.
+
+    Args:
+        cov_file (str): Path to the binary coverage file.
+        csv_file (str): Path to the output CSV file.
+    """
+    with open(csv_file, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Package Name', 'Class Name', 'Covered Lines'])
+        for package_name, class_name, covered_lines in read_coverage_binary(cov_file):
+            writer.writerow([package_name, class_name, ';'.join(map(str, covered_lines))])
+
+def find_reports(output_dir, output_format='csv'):
+    """
+    Finds every JaCoCo XML report below the coverage output directory.
+
+    Args:
+        output_dir (str): Output directory of measure_coverage.sh, with one folder per benchmark.
+        output_format (str): Output format of the conversion, 'csv' or 'binary'.
+
+    Returns:
+        list: Sorted (report.xml, converted report) path pairs, one per benchmark folder.
+    """
+    reports = []
+    for directory, _, file_names in os.walk(output_dir):
+        if 'report.xml' in file_names:
+            reports.append((
+                os.path.join(directory, 'report.xml'),
+                os.path.join(directory, REPORT_FILE_NAMES[output_format]),
+            ))
+    return sorted(reports)
+
+def convert_report(xml_file, output_file, delete_xml=False, output_format='csv'):
+    """
+    Converts one report with the streaming converter. The report is written to a
+    temporary file that replaces the output file once complete, so an interrupted
+    conversion never leaves a partial report that looks up to date.
+
+    Returns:
+        str: The error message if the conversion failed, otherwise None.
+    """
+    temporary_file = f"{output_file}.tmp"
+    try:
+        with instrumentation.span("xml convert", xml_file):
+            if output_format == 'binary':
+                extract_data_binary(xml_file, temporary_file)
+            else:
+                extract_data_streaming(xml_file, temporary_file)
+        os.replace(temporary_file, output_file)
+    except Exception as e:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+        return f"{type(e).__name__}: {e}"
+    if delete_xml:
+        os.remove(xml_file)
+    return None
+
+def convert_directory(output_dir, workers=None, delete_xml=False, output_format='csv'):
+    """
+    Converts every report.xml below output_dir to a report.csv (or report.cov) next to
+    it, using a pool of worker processes. Reports whose converted file is already newer
+    than the XML are skipped.
+
+    Args:
+        output_dir (str): Output directory of measure_coverage.sh, with one folder per benchmark.
+        workers (int): Number of worker processes (default: number of CPUs).
+        delete_xml (bool): Whether to remove each XML report after a successful conversion.
+        output_format (str): Output format, 'csv' or 'binary'.
+
+    Returns:
+        dict: Lists of converted and skipped XML reports, and a mapping of failed
+        XML reports to their error message.
+    """
+    summary = {'converted': [], 'skipped': [], 'failed': {}}
+    pending = []
+    for xml_file, output_file in find_reports(output_dir, output_format):
+        if os.path.exists(output_file) and os.path.getmtime(output_file) > os.path.getmtime(xml_file):
+            summary['skipped'].append(xml_file)
+        else:
+            pending.append((xml_file, output_file))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                convert_report,
+                [xml_file for xml_file, _ in pending],
+                [output_file for _, output_file in pending],
+                [delete_xml] * len(pending),
+                [output_format] * len(pending),
+            )
+            for (xml_file, _), error in zip(pending, results):
+                if error is None:
+                    summary['converted'].append(xml_file)
+                else:
+                    instrumentation.count("reports failed")
+                    summary['failed'][xml_file] = error
+    return summary
+
+def print_summary(summary):
+    """
+    Prints the outcome of a batch conversion, listing every failed report.
+    """
+    print(f"Converted: {len(summary['converted'])}, "
+          f"skipped (up to date): {len(summary['skipped'])}, "
+          f"failed: {len(summary['failed'])}")
+    for xml_file, error in summary['failed'].items():
+        print(f"  Failed: {xml_file}: {error}")
+
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python script.py <input_jacoco_xml_report> <output_extracted_data.csv>")
-        sys.exit(1)
-    input_xml = sys.argv[1]
-    output_csv = sys.argv[2]
-    extract_data(input_xml, output_csv)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract the covered lines of a JaCoCo XML report into a CSV file.")
+    parser.add_argument("input_xml", nargs="?",
+                        help="input JaCoCo XML coverage report (or a binary .cov file to export as CSV)")
+    parser.add_argument("output_csv", nargs="?", help="output file with the covered lines")
+    parser.add_argument("--streaming", action="store_true",
+                        help="parse the report incrementally to keep memory usage flat")
+    parser.add_argument("--format", choices=sorted(REPORT_FILE_NAMES), default="csv",
+                        help="output format (default: csv); binary output is always streamed")
+    parser.add_argument("--batch", metavar="OUTPUT_DIR",
+                        help="convert every report.xml below OUTPUT_DIR in parallel (always streaming)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes in batch mode (default: number of CPUs)")
+    parser.add_argument("--delete-xml", action="store_true",
+                        help="in batch mode, remove each report.xml after a successful conversion")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure_from_args("jacoco_xml_to_csv_only_covered_lines.py", args)
+    if args.batch:
+        summary = convert_directory(args.batch, args.workers, args.delete_xml, args.format)
+        print_summary(summary)
+        sys.exit(1 if summary['failed'] else 0)
+    if not args.input_xml or not args.output_csv:
+        parser.error("input_xml and output_csv are required unless --batch is given")
+    with instrumentation.span("xml convert", args.input_xml):
+        if args.input_xml.endswith('.cov'):
+            export_binary_to_csv(args.input_xml, args.output_csv)
+        elif args.format == 'binary':
+            extract_data_binary(args.input_xml, args.output_csv)
+        elif args.streaming:
+            extract_data_streaming(args.input_xml, args.output_csv)
+        else:
+            extract_data(args.input_xml, args.output_csv)
@@ -0,0 +1,248 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from jacoco_xml_to_csv_only_covered_lines import REPORT_FILE_NAMES, convert_report, read_coverage_binary
+
+# The instrumentation layer shared by all folders lives in Scripts/
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+import instrumentation  # noqa: E402
+
+# Path to the JAR file containing JMH benchmarks (see measure_coverage.sh for examples)
+JMH_JAR_FILE = "path_to_jmh.jar"
+
+# Path to the text file containing the list of JMH benchmarks
+BENCHMARK_LIST = "benchmark_list.txt"
+
+# Output directory for individual coverage reports
+OUTPUT_DIR = "output_directory"
+
+# Path to JaCoCo agent JAR
+JACOCO_AGENT_JAR = "/path_to_jacoco_agent_jar/org.jacoco.agent.jar"
+
+# Path to JaCoCo CLI JAR
+JACOCO_CLI_JAR = "/path_to_jacoco_cli_jar/org.jacoco.cli.jar"
+
+# Path to binary classes
+CLASS_FILES_MAIN = "/path_to_binary_classes/"
+
+# JMH configurations to capture coverage data (no warmup, 1 iteration, single shot mode)
+JMH_CONFIG = ["-f", "1", "-wi", "0", "-i", "1", "-r", "1", "-w", "1", "-bm", "ss", "-foe", "true"]
+
+# Header written by the XML to CSV converter, used to recognize complete reports
+CSV_HEADER = "Package Name,Class Name,Covered Lines"
+
+# Trace stage of every pipeline stage; conversions trace themselves in their worker processes
+TRACE_STAGES = {'jmh': "jmh run", 'report': "jacoco report"}
+
+def read_benchmark_list(file_path):
+    """
+    Reads the benchmarks to measure, skipping empty lines and comments.
+    """
+    with open(file_path, encoding='utf-8') as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith('#')]
+
+def has_valid_report(benchmark_dir, output_format='csv'):
+    """
+    Checks whether a benchmark already has a complete report.csv (or report.cov), so that
+    it can be skipped. The whole file is checked, so that a report truncated by an
+    interrupted run (before reports were written atomically) is measured again.
+    """
+    report_file = os.path.join(benchmark_dir, REPORT_FILE_NAMES[output_format])
+    try:
+        if output_format == 'binary':
+            read_coverage_binary(report_file)
+            return True
+        with open(report_file, encoding='utf-8', newline='') as file:
+            content = file.read()
+    except (OSError, UnicodeDecodeError, ValueError):
+        return False
+    if not content.endswith('\n'):
+        return False
+    rows = csv.reader(content.splitlines())
+    if ','.join(next(rows, [])) != CSV_HEADER:
+        return False
+    for row in rows:
+        if len(row) != 3 or not all(line.isdigit() for line in row[2].split(';')):
+            return False
+    return True
+
+def run_jmh(benchmark, benchmark_dir):
+    """
+    Runs one benchmark with the JaCoCo agent, writing its own coverage.exec. The JVM runs
+    in the benchmark directory and ignores the JMH lock, so several runs can overlap.
+
+    Returns:
+        str: The error message if the run failed, otherwise None.
+    """
+    destfile = os.path.join(benchmark_dir, 'coverage.exec')
+    command = [
+        'java', f'-javaagent:{os.path.abspath(JACOCO_AGENT_JAR)}=output=file,destfile={os.path.abspath(destfile)}',
+        '-Djmh.ignoreLock=true', '-jar', os.path.abspath(JMH_JAR_FILE), f'{benchmark}$', *JMH_CONFIG,
+    ]
+    with open(os.path.join(benchmark_dir, 'jmh.log'), 'w', encoding='utf-8') as log_file:
+        result = subprocess.run(command, cwd=benchmark_dir, stdout=log_file, stderr=subprocess.STDOUT)
+    if result.returncode != 0:
+        # The agent still dumps the coverage of a failed run, which must not be reported
+        if os.path.exists(destfile):
+            os.remove(destfile)
+        return f"JMH run of {benchmark} failed with exit code {result.returncode}, see jmh.log"
+    if not os.path.isfile(destfile):
+        return f"Coverage file not generated for {benchmark}"
+    return None
+
+def run_jacoco_report(benchmark_dir):
+    """
+    Generates the XML coverage report of one benchmark and removes its coverage.exec.
+
+    Returns:
+        str: The error message if the report could not be generated, otherwise None.
+    """
+    destfile = os.path.join(benchmark_dir, 'coverage.exec')
+    xml_file = os.path.join(benchmark_dir, 'report.xml')
+    result = subprocess.run(
+        ['java', '-jar', JACOCO_CLI_JAR, 'report', destfile, '--classfiles', CLASS_FILES_MAIN, '--xml', xml_file],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0 or not os.path.isfile(xml_file):
+        return f"jacoco-cli report failed: {result.stderr.strip()}"
+    os.remove(destfile)
+    return None
+
+def timed(stage_function, *args):
+    """
+    Runs a stage and returns its error message together with its start time and duration.
+    """
+    start = time.time()
+    error = stage_function(*args)
+    return error, start, time.time() - start
+
+def measure_coverage(benchmarks, output_dir, jmh_workers, report_workers, timing_log, output_format='csv'):
+    """
+    Measures the coverage of all benchmarks with a three-stage pipeline: JMH runs,
+    `jacoco-cli report` and XML to CSV conversion each have their own workers, so a
+    benchmark's report is generated and converted while the next JMH runs are in progress.
+
+    Args:
+        benchmarks (list): Names of the benchmarks to measure.
+        output_dir (str): Output directory, with one folder per benchmark.
+        jmh_workers (int): Number of JMH runs in parallel.
+        report_workers (int): Number of workers for each of the report and conversion stages.
+        timing_log (str): CSV file to which the timing of every stage is appended.
+        output_format (str): Format of the converted reports, 'csv' or 'binary'.
+
+    Returns:
+        dict: Mapping of failed benchmarks to their error message.
+    """
+    failures = {}
+    pending = set()
+    stage_of = {}
+
+    # Conversion workers are spawned, since forking while other threads run subprocesses can deadlock
+    with ThreadPoolExecutor(jmh_workers) as jmh_executor, \
+            ThreadPoolExecutor(report_workers) as report_executor, \
+            ProcessPoolExecutor(report_workers, mp_context=multiprocessing.get_context('spawn')) as convert_executor, \
+            open(timing_log, 'a', newline='', encoding='utf-8') as log_file:
+        log_writer = csv.writer(log_file)
+        if log_file.tell() == 0:
+            log_writer.writerow(['Benchmark', 'Stage', 'Start', 'Seconds', 'Status'])
+
+        for benchmark in benchmarks:
+            benchmark_dir = os.path.join(output_dir, benchmark)
+            if has_valid_report(benchmark_dir, output_format):
+                print(f"Skipping benchmark with existing report: {benchmark}")
+                continue
+            os.makedirs(benchmark_dir, exist_ok=True)
+            future = jmh_executor.submit(timed, run_jmh, benchmark, benchmark_dir)
+            stage_of[future] = (benchmark, 'jmh', time.time())
+            pending.add(future)
+
+        progress = instrumentation.progress("coverage measurement", len(pending))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                benchmark, stage, submitted = stage_of.pop(future)
+                benchmark_dir = os.path.join(output_dir, benchmark)
+                try:
+                    error, start, seconds = future.result()
+                except Exception as e:
+                    # A crashed worker (or a broken process pool) fails this benchmark only
+                    error, start, seconds = f"{type(e).__name__}: {e}", submitted, time.time() - submitted
+                log_writer.writerow([benchmark, stage, f"{start:.3f}", f"{seconds:.3f}", error or 'ok'])
+                log_file.flush()
+                if stage in TRACE_STAGES:
+                    instrumentation.record(TRACE_STAGES[stage], benchmark, start, seconds, error or 'ok')
+                if error or stage == 'convert':
+                    progress.advance()
+
+                if error:
+                    print(f"Error: {error}")
+                    failures[benchmark] = error
+                    continue
+                try:
+                    if stage == 'jmh':
+                        print(f"Measured benchmark: {benchmark} ({seconds:.1f}s)")
+                        next_future = report_executor.submit(timed, run_jacoco_report, benchmark_dir)
+                        stage_of[next_future] = (benchmark, 'report', time.time())
+                        pending.add(next_future)
+                    elif stage == 'report':
+                        next_future = convert_executor.submit(
+                            timed,
+                            convert_report,
+                            os.path.join(benchmark_dir, 'report.xml'),
+                            os.path.join(benchmark_dir, REPORT_FILE_NAMES[output_format]),
+                            True,
+                            output_format,
+                        )
+                        stage_of[next_future] = (benchmark, 'convert', time.time())
+                        pending.add(next_future)
+                except Exception as e:
+                    # Submitting to a broken process pool fails as well
+                    print(f"Error: {benchmark}: {type(e).__name__}: {e}")
+                    failures[benchmark] = f"{type(e).__name__}: {e}"
+                    progress.advance()
+
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the code coverage of each benchmark with JaCoCo.")
+    parser.add_argument("--benchmark-list", default=BENCHMARK_LIST, help="file with one benchmark per line")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="output directory for the coverage reports")
+    parser.add_argument("--workers", type=int, default=2, help="number of JMH runs in parallel (default: 2)")
+    parser.add_argument("--report-workers", type=int, default=2,
+                        help="number of workers for the report and the conversion stages (default: 2)")
+    parser.add_argument("--format", choices=sorted(REPORT_FILE_NAMES), default="csv",
+                        help="format of the converted reports (default: csv)")
+    parser.add_argument("--timing-log", default=None,
+                        help="CSV file for the per-stage timings (default: OUTPUT_DIR/timing_log.csv)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure_from_args("measure_coverage.py", args)
+
+    # Ensure the required files and directories exist
+    for required_file in (JMH_JAR_FILE, args.benchmark_list, JACOCO_AGENT_JAR, JACOCO_CLI_JAR):
+        if not os.path.isfile(required_file):
+            parser.error(f"Required file not found at {required_file}")
+    if not os.path.isdir(CLASS_FILES_MAIN):
+        parser.error(f"Binary classes directory not found at {CLASS_FILES_MAIN}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timing_log = args.timing_log or os.path.join(args.output_dir, 'timing_log.csv')
+    benchmarks = read_benchmark_list(args.benchmark_list)
+    failures = measure_coverage(
+        benchmarks, args.output_dir, args.workers, args.report_workers, timing_log, args.format
+    )
+
+    print(f"Processed {len(benchmarks)} benchmarks, {len(failures)} failed. Stage timings: {timing_log}")
+    for benchmark, error in failures.items():
+        print(f"  Failed: {benchmark}: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,47 @@ CLASS_FILES_MAIN=="/path_to_binary_classes/"
 # Python script to convert XML report to CSV
 PYTHON_SCRIPT="jacoco_xml_to_csv_only_covered_lines.py"
 
+# Convert the XML reports in parallel batch runs of BATCH_SIZE benchmarks, instead of
+# starting one Python interpreter per benchmark (set to "false" to convert after each
+# benchmark). Each batch removes its XML reports, so at most BATCH_SIZE of them, each up
+# to hundreds of MB, are on disk at any time.
+BATCH_CONVERT="true"
+BATCH_SIZE=20
+
+# JSON Lines trace of the per-benchmark stage timings (see ../instrumentation.py), empty to
+# disable. The Python conversions append their own records to the same file.
+TRACE_FILE="${PIPELINE_TRACE:-}"
+
+# Prints the current time in seconds with a fraction, when tracing. EPOCHREALTIME needs
+# bash 5 (the macOS system bash is 3.2), and "date +%s.%N" is GNU only.
+trace_time() {
+    if [[ -z "$TRACE_FILE" ]]; then
+        return
+    elif [[ -n "${EPOCHREALTIME:-}" ]]; then
+        echo "${EPOCHREALTIME/,/.}"
+    else
+        python3 -c 'import time; print(time.time())'
+    fi
+}
+
+# Escapes a string for a JSON string literal
+json_escape() {
+    local value=${1//\\/\\\\}
+    echo "${value//\"/\\\"}"
+}
+
+# Appends a span record to the trace: trace_span <stage> <item> <start> <status>
+trace_span() {
+    if [[ -n "$TRACE_FILE" ]]; then
+        local end
+        end=$(trace_time)
+        LC_ALL=C printf '{"script": "measure_coverage.sh", "pid": %d, "time": %.3f, "type": "span", "stage": "%s", "item": "%s", "start": %.3f, "seconds": %.6f, "status": "%s"}\n' \
+            $$ "$end" "$(json_escape "$1")" "$(json_escape "$2")" "$3" \
+            "$(LC_ALL=C awk -v start="$3" -v end="$end" 'BEGIN { printf "%.6f", end - start }')" \
+            "$(json_escape "$4")" >> "$TRACE_FILE"
+    fi
+}
+
 # Ensure the required files and directories exist
 if [[ ! -f "$JMH_JAR_FILE" ]]; then
     echo "Error: JAR file not found at $JMH_JAR_FILE"
@@ -63,6 +104,24 @@ mkdir -p "$OUTPUT_DIR"
 # JMH configurations to capture coverage data (no warmup, 1 iteration, single shot mode)
 JMH_CONFIG="-f 1 -wi 0 -i 1 -r 1 -w 1 -bm ss -foe true"
 
+# Converts the XML reports generated so far, removing each after a successful conversion
+convert_batch() {
+    if [[ -f "$PYTHON_SCRIPT" ]]; then
+        python3 "$PYTHON_SCRIPT" --batch "$OUTPUT_DIR" --delete-xml
+    else
+        echo "Warning: Python script $PYTHON_SCRIPT not found. Skipping XML to CSV conversion."
+    fi
+}
+unconverted=0
+
+# Number of benchmarks to process, for the progress and ETA
+total=$(grep -c -v -e '^[[:space:]]*$' -e '^#' "$BENCHMARK_LIST")
+index=0
+loop_start=$SECONDS
+if [[ -n "$TRACE_FILE" ]]; then
+    export PIPELINE_TRACE="$TRACE_FILE"
+fi
+
 # Iterate over each benchmark in the list
 while IFS= read -r benchmark || [[ -n "$benchmark" ]]; do
     # Skip empty lines or comments
@@ -70,29 +129,48 @@ while IFS= read -r benchmark || [[ -n "$benchmark" ]]; do
         continue
     fi
 
-    echo "Processing benchmark: $benchmark"
+    # ETA extrapolated from the benchmarks processed so far
+    eta=""
+    if [[ $index -gt 0 ]]; then
+        eta=", ETA $(( (SECONDS - loop_start) * (total - index) / index ))s"
+    fi
+    index=$((index + 1))
+    echo "Processing benchmark $index/$total$eta: $benchmark"
 
     # Create directory for the benchmark
     benchmark_dir="$OUTPUT_DIR/$benchmark"
     mkdir -p "$benchmark_dir"
 
     # Run JMH benchmark with JaCoCo agent and generate coverage report
+    start=$(trace_time)
     java -javaagent:"$JACOCO_AGENT_JAR"=output=file,destfile="$benchmark_dir/coverage.exec" \
          -jar "$JMH_JAR_FILE" "$benchmark\$" $JMH_CONFIG
 
     # Check if the coverage execution file was generated
     if [[ ! -f "$benchmark_dir/coverage.exec" ]]; then
         echo "Error: Coverage file not generated for $benchmark"
+        trace_span "jmh run" "$benchmark" "$start" "Coverage file not generated"
         continue
     fi
+    trace_span "jmh run" "$benchmark" "$start" "ok"
 
     # Generate code coverage report in XML format
+    start=$(trace_time)
     java -jar "$JACOCO_CLI_JAR" report "$benchmark_dir/coverage.exec" \
          --classfiles "$CLASS_FILES_MAIN=" \
          --xml "$benchmark_dir/report.xml"
+    trace_span "jacoco report" "$benchmark" "$start" "$([[ -f "$benchmark_dir/report.xml" ]] && echo ok || echo "Report not generated")"
 
     # Convert XML report to CSV using the Python script
-    if [[ -f "$PYTHON_SCRIPT" ]]; then
+    if [[ "$BATCH_CONVERT" == "true" ]]; then
+        # The XML report is converted by the next batch run
+        rm -f "$benchmark_dir/coverage.exec"
+        unconverted=$((unconverted + 1))
+        if [[ $unconverted -ge $BATCH_SIZE ]]; then
+            convert_batch
+            unconverted=0
+        fi
+    elif [[ -f "$PYTHON_SCRIPT" ]]; then
         python3 "$PYTHON_SCRIPT" "$benchmark_dir/report.xml" "$benchmark_dir/report.csv"
         # Remove the XML report after successful conversion
         rm -f "$benchmark_dir/report.xml" "$benchmark_dir/coverage.exec"
@@ -100,3 +178,8 @@ while IFS= read -r benchmark || [[ -n "$benchmark" ]]; do
         echo "Warning: Python script $PYTHON_SCRIPT not found. Skipping XML to CSV conversion."
     fi
 done < "$BENCHMARK_LIST"
+
+# Convert the XML reports of the last batch
+if [[ "$BATCH_CONVERT" == "true" && $unconverted -gt 0 ]]; then
+    convert_batch
+fi
@@ -0,0 +1,105 @@
+#!/bin/bash
+
+# Same inputs as measure_coverage.sh, but benchmarks run in sequence inside a small
+# fixed pool of long-lived JVMs (see CoverageLauncher.java) instead of one JVM each.
+
+# Path to the JAR file containing JMH benchmarks
+JMH_JAR_FILE="path_to_jmh.jar"
+
+# Path to the text file containing the list of JMH benchmarks
+BENCHMARK_LIST="benchmark_list.txt"
+
+# Output directory for individual coverage reports
+OUTPUT_DIR="output_directory"
+
+# Path to JaCoCo agent JAR
+JACOCO_AGENT_JAR="/path_to_jacoco_agent_jar/org.jacoco.agent.jar"
+
+# Path to JaCoCo CLI JAR
+JACOCO_CLI_JAR="/path_to_jacoco_cli_jar/org.jacoco.cli.jar"
+
+# Path to binary classes
+CLASS_FILES_MAIN="/path_to_binary_classes/"
+
+# Python script to convert XML report to CSV
+PYTHON_SCRIPT="jacoco_xml_to_csv_only_covered_lines.py"
+
+# Java launcher running the benchmarks of one JVM (requires Java 11+ to run a source file)
+LAUNCHER="CoverageLauncher.java"
+
+# Number of JVMs running benchmarks concurrently
+POOL_SIZE=4
+
+# Ensure the required files and directories exist
+for required_file in "$JMH_JAR_FILE" "$BENCHMARK_LIST" "$JACOCO_AGENT_JAR" "$JACOCO_CLI_JAR" "$LAUNCHER"; do
+    if [[ ! -f "$required_file" ]]; then
+        echo "Error: Required file not found at $required_file"
+        exit 1
+    fi
+done
+
+if [[ ! -d "$CLASS_FILES_MAIN" ]]; then
+    echo "Error: Binary classes directory not found at $CLASS_FILES_MAIN"
+    exit 1
+fi
+
+# Create output directory if it doesn't exist
+mkdir -p "$OUTPUT_DIR"
+
+# JMH configurations to capture coverage data (in-process, no warmup, 1 iteration, single shot mode).
+# Concurrent JVMs must not wait for each other on the JMH lock file.
+JMH_CONFIG="-f 0 -wi 0 -i 1 -r 1 -w 1 -bm ss -foe true"
+JVM_OPTIONS="-Djmh.ignoreLock=true"
+
+# Distribute the benchmarks round-robin over POOL_SIZE lists, skipping empty lines and comments
+shopt -s nullglob
+chunk_dir=$(mktemp -d)
+trap 'rm -rf "$chunk_dir"' EXIT
+grep -v -e '^[[:space:]]*$' -e '^#' "$BENCHMARK_LIST" \
+    | awk -v n="$POOL_SIZE" -v dir="$chunk_dir" '{ print > (dir "/chunk_" (NR - 1) % n ".txt") }'
+
+# Run one JVM per list. The agent writes nothing by itself (output=none): the launcher
+# resets and dumps its execution data around every benchmark.
+pids=()
+for chunk in "$chunk_dir"/chunk_*.txt; do
+    java -javaagent:"$JACOCO_AGENT_JAR"=output=none $JVM_OPTIONS -cp "$JMH_JAR_FILE" \
+         "$LAUNCHER" "$chunk" "$OUTPUT_DIR" $JMH_CONFIG > "$chunk.log" 2>&1 &
+    pids+=($!)
+done
+
+status=0
+for pid in "${pids[@]}"; do
+    wait "$pid" || status=1
+done
+if [[ $status -ne 0 ]]; then
+    echo "Warning: Some benchmarks failed, see the errors below."
+    grep -h "^Error:" "$chunk_dir"/*.log
+fi
+
+# Generates the XML report of one benchmark: report_benchmark <benchmark>
+report_benchmark() {
+    local benchmark_dir="$OUTPUT_DIR/$1"
+    # Check if the coverage execution file was generated
+    if [[ ! -f "$benchmark_dir/coverage.exec" ]]; then
+        echo "Error: Coverage file not generated for $1"
+        return
+    fi
+
+    java -jar "$JACOCO_CLI_JAR" report "$benchmark_dir/coverage.exec" \
+         --classfiles "$CLASS_FILES_MAIN" \
+         --xml "$benchmark_dir/report.xml"
+    rm -f "$benchmark_dir/coverage.exec"
+}
+export -f report_benchmark
+export OUTPUT_DIR JACOCO_CLI_JAR CLASS_FILES_MAIN
+
+# Generate code coverage reports in XML format, POOL_SIZE JaCoCo CLI JVMs at a time
+grep -v -e '^[[:space:]]*$' -e '^#' "$BENCHMARK_LIST" | tr '\n' '\0' \
+    | xargs -0 -n 1 -P "$POOL_SIZE" bash -c 'report_benchmark "$1"' report_benchmark
+
+# Convert all XML reports at once, removing each XML report after successful conversion
+if [[ -f "$PYTHON_SCRIPT" ]]; then
+    python3 "$PYTHON_SCRIPT" --batch "$OUTPUT_DIR" --delete-xml
+else
+    echo "Warning: Python script $PYTHON_SCRIPT not found. Skipping XML to CSV conversion."
+fi
@@ -0,0 +1,26 @@
+package org.openjdk.jmh.runner;
+
+import java.lang.reflect.Method;
+
+import org.openjdk.jmh.runner.options.CommandLineOptions;
+
+/**
+ * Stand-in for the JMH runner, used by check_single_jvm_coverage.sh. Instead of running
+ * a JMH benchmark, it calls the static method named by the benchmark once, in the
+ * current JVM, as a benchmark run with "-f 0" would.
+ */
+public class Runner {
+
+    private final CommandLineOptions options;
+
+    public Runner(CommandLineOptions options) {
+        this.options = options;
+    }
+
+    public void run() throws Exception {
+        String benchmark = options.getBenchmark();
+        int separator = benchmark.lastIndexOf('.');
+        Method method = Class.forName(benchmark.substring(0, separator)).getMethod(benchmark.substring(separator + 1));
+        method.invoke(null);
+    }
+}
@@ -0,0 +1,19 @@
+package org.openjdk.jmh.runner.options;
+
+/**
+ * Stand-in for the JMH command line options, used by check_single_jvm_coverage.sh. Only
+ * the benchmark is kept: CoverageLauncher passes it last, as "<benchmark>$".
+ */
+public class CommandLineOptions {
+
+    private final String benchmark;
+
+    public CommandLineOptions(String... args) {
+        String pattern = args[args.length - 1];
+        benchmark = pattern.endsWith("$") ? pattern.substring(0, pattern.length() - 1) : pattern;
+    }
+
+    public String getBenchmark() {
+        return benchmark;
+    }
+}
@@ -0,0 +1,27 @@
+package standin;
+
+/**
+ * Code covered by the stand-in benchmarks. Each benchmark covers the lines of its own
+ * method only, so any line shared by their coverage reports leaked from the other run.
+ */
+final class CoveredCode {
+
+    private CoveredCode() {
+    }
+
+    static int first() {
+        int sum = 0;
+        for (int i = 0; i < 10; i++) {
+            sum += i;
+        }
+        return sum;
+    }
+
+    static int second() {
+        int product = 1;
+        for (int i = 1; i < 10; i++) {
+            product *= i;
+        }
+        return product;
+    }
+}
@@ -0,0 +1,15 @@
+package standin;
+
+/**
+ * Stand-in benchmarks of check_single_jvm_coverage.sh, run by the stand-in JMH runner.
+ */
+public class StandInBenchmarks {
+
+    public static void first() {
+        CoveredCode.first();
+    }
+
+    public static void second() {
+        CoveredCode.second();
+    }
+}
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import atexit
+import argparse
+import statistics
+import contextlib
+from typing import Dict, Iterator, List, Optional
+
+# JSON Lines trace file. Set by --trace, or in the environment for the shell scripts;
+# child processes inherit it and append their own records.
+TRACE_ENV = "PIPELINE_TRACE"
+
+# Minimum time between two progress lines of a stage
+PROGRESS_INTERVAL = 10.0
+
+class _State:
+    script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python"
+    trace_path: Optional[str] = os.environ.get(TRACE_ENV) or None
+    trace_fd: Optional[int] = None
+    trace_pid: Optional[int] = None  # Process that opened trace_fd, forked children reopen the file
+    progress = False
+    trace_memory = False
+    profiler = None
+    profile_path: Optional[str] = None
+    owner_pid: Optional[int] = None  # Process that configured the instrumentation and writes the summary
+    counters: Dict[str, int] = {}
+    totals: Dict[str, List[float]] = {}  # Per stage: number of spans, total and maximum seconds
+
+_state = _State()
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the instrumentation options shared by all scripts.
+    """
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--trace", default=None,
+                       help=f"append per-item timings and counters to this JSON Lines file (or set {TRACE_ENV})")
+    group.add_argument("--progress", action="store_true", help="print the progress and ETA of long stages")
+    group.add_argument("--profile", default=None, help="write cProfile statistics of the run to this file")
+    group.add_argument("--trace-memory", action="store_true",
+                       help="record the peak traced memory (tracemalloc) of every span, slowing the run down")
+
+def configure(
+    script: str,
+    trace_path: Optional[str] = None,
+    progress: bool = False,
+    profile_path: Optional[str] = None,
+    trace_memory: bool = False,
+) -> None:
+    """
+    Enables the instrumentation of a script run. Without a trace path, the one of the
+    environment is used; the path is exported so that child processes trace too.
+
+    Args:
+        script: Name of the script, recorded in every trace record.
+        trace_path: JSON Lines trace file to append to.
+        progress: Whether to print the progress and ETA of long stages.
+        profile_path: File for the cProfile statistics of the whole run.
+        trace_memory: Whether to record the peak tracemalloc memory of every span.
+    """
+    _state.script = script
+    _state.trace_path = trace_path or _state.trace_path
+    if _state.trace_path:
+        os.environ[TRACE_ENV] = _state.trace_path
+    _state.progress = progress
+    _state.trace_memory = trace_memory
+    _state.owner_pid = os.getpid()
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+    if profile_path:
+        import cProfile
+        _state.profile_path = profile_path
+        _state.profiler = cProfile.Profile()
+        _state.profiler.enable()
+    _write({'type': 'start', 'argv': sys.argv[1:]})
+    atexit.register(finish)
+
+def configure_from_args(script: str, args: argparse.Namespace) -> None:
+    configure(script, args.trace, args.progress, args.profile, args.trace_memory)
+
+def enabled() -> bool:
+    return _state.trace_path is not None
+
+def _write(record: dict) -> None:
+    """
+    Appends a record to the trace. Each record is one write to a file opened in append
+    mode, so records of concurrent processes do not interleave.
+    """
+    if _state.trace_path is None:
+        return
+    if _state.trace_pid != os.getpid():
+        _state.trace_fd = os.open(_state.trace_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        _state.trace_pid = os.getpid()
+    record = {'script': _state.script, 'pid': os.getpid(), 'time': round(time.time(), 3), **record}
+    os.write(_state.trace_fd, (json.dumps(record) + "\n").encode('utf-8'))
+
+def record(stage: str, item: Optional[str], start: float, seconds: float, status: str = 'ok', **fields) -> None:
+    """
+    Records a span timed by the caller, e.g. a stage run in a thread or another process.
+
+    Args:
+        stage: Stage of the pipeline, e.g. "jmh run".
+        item: The benchmark, report or pass the span worked on.
+        start: Wall clock start time (time.time()).
+        seconds: Duration of the span.
+        status: "ok", or the error of a failed item.
+        fields: Further values to record.
+    """
+    totals = _state.totals.setdefault(stage, [0, 0.0, 0.0])
+    totals[0] += 1
+    totals[1] += seconds
+    totals[2] = max(totals[2], seconds)
+    _write({
+        'type': 'span', 'stage': stage, 'item': item, 'start': round(start, 3), 'seconds': round(seconds, 6),
+        'status': status, **fields,
+    })
+
+@contextlib.contextmanager
+def span(stage: str, item: Optional[str] = None, **fields) -> Iterator[None]:
+    """
+    Times the enclosed block as one item of a stage. A block raising an exception is
+    recorded with the exception as status. Does nothing unless tracing is enabled.
+    """
+    if _state.trace_path is None:
+        yield
+        return
+    if _state.trace_memory:
+        import tracemalloc
+        tracemalloc.reset_peak()
+    status = 'ok'
+    start, start_counter = time.time(), time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        status = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if _state.trace_memory:
+            import tracemalloc
+            fields['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+        record(stage, item, start, time.perf_counter() - start_counter, status, **fields)
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Adds to a counter, written to the trace when the run finishes.
+    """
+    _state.counters[name] = _state.counters.get(name, 0) + amount
+
+class Progress:
+    """
+    Prints the progress of a stage with an ETA extrapolated from the items done so
+    far, at most every PROGRESS_INTERVAL seconds and when the last item is done.
+    """
+
+    def __init__(self, stage: str, total: int):
+        self.stage = stage
+        self.total = total
+        self.done = 0
+        self.start = time.perf_counter()
+        self.last_print = self.start
+
+    def advance(self, amount: int = 1) -> None:
+        self.done += amount
+        if not _state.progress:
+            return
+        now = time.perf_counter()
+        if now - self.last_print < PROGRESS_INTERVAL and self.done < self.total:
+            return
+        self.last_print = now
+        elapsed = now - self.start
+        remaining = elapsed / self.done * (self.total - self.done) if self.done else 0.0
+        print(
+            f"[{self.stage}] {self.done}/{self.total} ({self.done / self.total * 100 if self.total else 100:.1f}%), "
+            f"elapsed {format_duration(elapsed)}, ETA {format_duration(remaining)}",
+            file=sys.stderr,
+        )
+
+def progress(stage: str, total: int) -> Progress:
+    return Progress(stage, total)
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+def finish() -> None:
+    """
+    Writes the counters and per-stage totals of the run to the trace, and the cProfile
+    statistics to their file. Runs at exit of the configuring process only.
+    """
+    if _state.owner_pid != os.getpid():
+        return
+    _state.owner_pid = None
+    if _state.profiler is not None:
+        _state.profiler.disable()
+        _state.profiler.dump_stats(_state.profile_path)
+        print(f"Profile written to {_state.profile_path} (python3 -m pstats {_state.profile_path})", file=sys.stderr)
+    stages = {
+        stage: {'count': int(n), 'seconds': round(total, 3), 'max_seconds': round(longest, 3)}
+        for stage, (n, total, longest) in _state.totals.items()
+    }
+    _write({'type': 'finish', 'counters': _state.counters, 'stages': stages})
+
+def summarize(trace_path: str, slowest: int = 5) -> None:
+    """
+    Prints, per script and stage, the number of items, total, mean, 95th percentile and
+    maximum time, the slowest items, and the counters of the runs in a trace file.
+    """
+    durations: Dict[tuple, List[float]] = {}
+    items: Dict[tuple, List[tuple]] = {}
+    failures: Dict[tuple, int] = {}
+    counters: Dict[str, int] = {}
+    with open(trace_path, encoding='utf-8') as trace_file:
+        for line in trace_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('type') == 'span':
+                key = (entry.get('script'), entry.get('stage'))
+                durations.setdefault(key, []).append(entry['seconds'])
+                items.setdefault(key, []).append((entry['seconds'], entry.get('item')))
+                if entry.get('status', 'ok') != 'ok':
+                    failures[key] = failures.get(key, 0) + 1
+            elif entry.get('type') == 'finish':
+                for name, value in entry.get('counters', {}).items():
+                    counters[name] = counters.get(name, 0) + value
+
+    grand_total = sum(map(sum, durations.values())) or 1.0
+    print(f"{'script / stage':<50} {'items':>8} {'total s':>10} {'share':>6} {'mean s':>9} {'p95 s':>9} {'max s':>9} {'failed':>6}")
+    for key, values in sorted(durations.items(), key=lambda x: -sum(x[1])):
+        values.sort()
+        p95 = values[min(len(values) - 1, int(0.95 * len(values)))]
+        print(
+            f"{f'{key[0]} / {key[1]}':<50} {len(values):>8} {sum(values):10.1f} "
+            f"{sum(values) / grand_total * 100:5.1f}% {statistics.fmean(values):9.3f} {p95:9.3f} {values[-1]:9.3f} "
+            f"{failures.get(key, 0):>6}"
+        )
+        for seconds, item in sorted(items[key], reverse=True)[:slowest]:
+            print(f"    {seconds:10.3f}s  {item}")
+    for name, value in sorted(counters.items()):
+        print(f"{name}: {value}")
+
+def main() -> None:
+    """
+    Summarizes a trace file written by the instrumented scripts.
+    """
+    parser = argparse.ArgumentParser(description="Summarize a pipeline trace file.")
+    parser.add_argument("trace_path", help="JSON Lines trace written with --trace or PIPELINE_TRACE")
+    parser.add_argument("--slowest", type=int, default=5, help="number of the slowest items listed per stage (default: 5)")
+    args = parser.parse_args()
+
+    summarize(args.trace_path, args.slowest)
+
+if __name__ == "__main__":
+    main()
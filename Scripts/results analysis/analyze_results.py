@@ -0,0 +1,265 @@
+import os
+import csv
+import math
+import random
+import argparse
+import statistics
+import multiprocessing
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Type aliases for better readability
+Throughputs = Dict[str, List[float]]  # Maps benchmark names to their throughput in every measured iteration
+
+# Result files of a project folder in Data/
+RESULT_FILES = {'individuals': 'results_individuals.csv', 'clusters': 'results_clusters.csv'}
+
+# Default precision target: half-width of the confidence interval of the mean, in percent of the mean
+TARGET_PRECISION = 1.0
+CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 1000
+
+# Assumed JMH configuration of one execution (a cluster or an individual benchmark), used to estimate
+# the measurement time here and in the other results and clustering scripts. The analysis of a result
+# file takes the number of measurement iterations from the file instead.
+JMH_FORKS = 1
+JMH_FORK_STARTUP_SECONDS = 2.0  # JVM startup and benchmark class loading
+JMH_WARMUP_ITERATIONS = 5
+JMH_MEASUREMENT_ITERATIONS = 30
+JMH_ITERATION_SECONDS = 1.0
+
+class BenchmarkStats(NamedTuple):
+    name: str
+    iterations: int
+    mean: float
+    rsd: float  # Relative standard deviation in percent
+    ci_low: float  # Bootstrap confidence interval of the mean
+    ci_high: float
+    required_iterations: int  # Iterations needed for the target precision
+
+def main() -> None:
+    """
+    Analyses the result files of one or more project folders of Data/: the stability of
+    every benchmark and cluster, the iterations needed to reach a target precision, and
+    the measurement time of individual versus batched execution.
+    """
+    parser = argparse.ArgumentParser(description="Analyse the throughput results of individual and clustered benchmarks.")
+    parser.add_argument("project_dirs", nargs='+', help="project folders with results_individuals.csv and/or results_clusters.csv")
+    parser.add_argument("--clustered-benchmarks", default=None,
+                        help="clustered_ju2jmh_benchmarks.txt of the project, to count the benchmarks still run individually")
+    parser.add_argument("--target-precision", type=float, default=TARGET_PRECISION,
+                        help=f"CI half-width target in percent of the mean (default: {TARGET_PRECISION})")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE, help=f"confidence level (default: {CONFIDENCE})")
+    parser.add_argument("--resamples", type=int, default=BOOTSTRAP_RESAMPLES,
+                        help=f"bootstrap resamples per benchmark (default: {BOOTSTRAP_RESAMPLES})")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes analysing benchmarks (default: 1)")
+    parser.add_argument("--output-dir", default=None,
+                        help="write the statistics of every result file to <output-dir>/<project>_<kind>_analysis.csv")
+    args = parser.parse_args()
+
+    for project_dir in args.project_dirs:
+        project = os.path.basename(os.path.normpath(project_dir))
+        print(f"=== {project}")
+        analyses: Dict[str, List[BenchmarkStats]] = {}
+        for kind, file_name in RESULT_FILES.items():
+            results_file = os.path.join(project_dir, file_name)
+            if not os.path.isfile(results_file):
+                continue
+            stats = analyze_results(
+                load_results(results_file), args.target_precision, args.confidence, args.resamples, args.workers
+            )
+            analyses[kind] = stats
+            print_summary(kind, stats, args.target_precision)
+            if args.output_dir:
+                os.makedirs(args.output_dir, exist_ok=True)
+                save_analysis(stats, os.path.join(args.output_dir, f"{project}_{kind}_analysis.csv"))
+
+        if 'individuals' in analyses and 'clusters' in analyses:
+            clustered = None
+            if args.clustered_benchmarks:
+                with open(args.clustered_benchmarks, encoding='utf-8') as file:
+                    clustered = {line.strip() for line in file if line.strip()}
+            print_time_comparison(analyses['individuals'], analyses['clusters'], clustered)
+
+def load_results(file_path: str) -> Throughputs:
+    """
+    Loads a results CSV: a "Benchmark Name" column, one column per iteration and an
+    optional "RSD" column. A recorded RSD that differs from the one computed from the
+    iterations is reported.
+
+    Args:
+        file_path: Path to the results CSV.
+
+    Returns:
+        A dictionary mapping benchmark names to their throughput in every iteration.
+    """
+    results: Throughputs = {}
+    with open(file_path, newline='', encoding='utf-8') as csv_file:
+        csv_reader = csv.reader(csv_file)
+        header = next(csv_reader)
+        iteration_columns = [i for i, column in enumerate(header) if column.startswith("Iteration")]
+        rsd_column = header.index("RSD") if "RSD" in header else None
+        for row in csv_reader:
+            if not row:
+                continue
+            try:
+                values = [float(row[i]) for i in iteration_columns]
+            except (ValueError, IndexError):
+                print(f"Warning: Skipping invalid row of {file_path}: {row[0]}")
+                continue
+            results[row[0]] = values
+            if rsd_column is not None and rsd_column < len(row) and row[rsd_column]:
+                recorded, computed = float(row[rsd_column]), relative_standard_deviation(values)
+                if not math.isclose(recorded, computed, rel_tol=1e-6, abs_tol=1e-9):
+                    print(f"Warning: Recorded RSD {recorded} of {row[0]} differs from the computed {computed:.9f}")
+    return results
+
+def relative_standard_deviation(values: List[float]) -> float:
+    """
+    Returns the sample standard deviation in percent of the mean, as in the RSD column.
+    """
+    mean = statistics.fmean(values)
+    return statistics.stdev(values) / mean * 100 if len(values) > 1 and mean else 0.0
+
+def bootstrap_mean_ci(
+    values: List[float], confidence: float, resamples: int, rng: random.Random
+) -> Tuple[float, float]:
+    """
+    Computes a percentile bootstrap confidence interval of the mean.
+
+    Args:
+        values: The measured iterations.
+        confidence: Confidence level, e.g. 0.95.
+        resamples: Number of bootstrap resamples.
+        rng: Random number generator.
+
+    Returns:
+        The lower and upper bounds of the interval.
+    """
+    n = len(values)
+    # Draw all resamples at once, then take the mean of every consecutive n draws
+    draws = iter(rng.choices(values, k=n * resamples))
+    means = sorted(total / n for total in map(sum, zip(*[draws] * n)))
+    tail = (1 - confidence) / 2
+    return means[int(tail * (resamples - 1))], means[math.ceil((1 - tail) * (resamples - 1))]
+
+def required_iterations(values: List[float], target_precision: float, confidence: float) -> int:
+    """
+    Estimates the number of iterations for which the half-width of the confidence
+    interval of the mean, z * s / sqrt(n), is at most target_precision percent of the mean.
+    """
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    rsd = relative_standard_deviation(values)
+    return max(2, math.ceil((z * rsd / target_precision) ** 2))
+
+def analyze_benchmark(item: Tuple[str, List[float], float, float, int]) -> BenchmarkStats:
+    """
+    Computes the statistics of one benchmark. The bootstrap is seeded with the
+    benchmark name, so results do not depend on the order or the number of workers.
+    """
+    name, values, target_precision, confidence, resamples = item
+    ci_low, ci_high = bootstrap_mean_ci(values, confidence, resamples, random.Random(name))
+    return BenchmarkStats(
+        name=name,
+        iterations=len(values),
+        mean=statistics.fmean(values),
+        rsd=relative_standard_deviation(values),
+        ci_low=ci_low,
+        ci_high=ci_high,
+        required_iterations=required_iterations(values, target_precision, confidence),
+    )
+
+def analyze_results(
+    results: Throughputs,
+    target_precision: float = TARGET_PRECISION,
+    confidence: float = CONFIDENCE,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    workers: int = 1,
+) -> List[BenchmarkStats]:
+    """
+    Computes the statistics of every benchmark of a results file.
+
+    Args:
+        results: Throughput of every benchmark in every iteration.
+        target_precision: CI half-width target in percent of the mean.
+        confidence: Confidence level.
+        resamples: Bootstrap resamples per benchmark.
+        workers: Number of processes sharing the benchmarks.
+
+    Returns:
+        The statistics of every benchmark, in file order.
+    """
+    items = [(name, values, target_precision, confidence, resamples) for name, values in results.items()]
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            return pool.map(analyze_benchmark, items, chunksize=16)
+    return [analyze_benchmark(item) for item in items]
+
+def execution_seconds(
+    warmup_iterations: int, iterations: int, forks: int, iteration_seconds: float = JMH_ITERATION_SECONDS
+) -> float:
+    """
+    Estimates the time of one JMH execution with the given configuration and wall time per iteration.
+    """
+    return forks * (JMH_FORK_STARTUP_SECONDS + (warmup_iterations + iterations) * iteration_seconds)
+
+def estimate_measurement_seconds(executions: int, measurement_iterations: int = JMH_MEASUREMENT_ITERATIONS) -> float:
+    """
+    Estimates the time of running a number of JMH executions with the assumed configuration,
+    each paying fork startup, warmup and measurement.
+    """
+    return executions * execution_seconds(JMH_WARMUP_ITERATIONS, measurement_iterations, JMH_FORKS)
+
+def print_summary(kind: str, stats: List[BenchmarkStats], target_precision: float) -> None:
+    """
+    Prints the stability summary of the benchmarks of one results file.
+    """
+    if not stats:
+        print(f"{kind}: no benchmarks")
+        return
+    rsds = [s.rsd for s in stats]
+    measured = sum(s.iterations for s in stats)
+    required = sum(s.required_iterations for s in stats)
+    print(
+        f"{kind}: {len(stats)} benchmarks, median RSD {statistics.median(rsds):.3f}%, max RSD {max(rsds):.3f}%, "
+        f"{sum(r > target_precision for r in rsds)} above {target_precision}%"
+    )
+    print(
+        f"  iterations for a +/-{target_precision}% CI: {required} in total "
+        f"({required / measured * 100:.1f}% of the {measured} measured), "
+        f"{sum(s.required_iterations > s.iterations for s in stats)} benchmarks need more than measured"
+    )
+
+def print_time_comparison(
+    individuals: List[BenchmarkStats], clusters: List[BenchmarkStats], clustered: Optional[set] = None
+) -> None:
+    """
+    Compares the estimated measurement time of running every benchmark individually with
+    running the clusters plus the benchmarks that are not in any cluster. Without the
+    clustered benchmarks, only the clusters are counted for the batched execution.
+    """
+    iterations = max(s.iterations for s in individuals + clusters)
+    individual_seconds = estimate_measurement_seconds(len(individuals), iterations)
+    remaining = 0 if clustered is None else sum(s.name not in clustered for s in individuals)
+    batched_seconds = estimate_measurement_seconds(len(clusters) + remaining, iterations)
+    label = "clusters only" if clustered is None else f"clusters + {remaining} individual benchmarks"
+    print(
+        f"Measurement time: individual {individual_seconds / 3600:.1f} h ({len(individuals)} executions), "
+        f"batched {batched_seconds / 3600:.1f} h ({label}), "
+        f"saving {(1 - batched_seconds / individual_seconds) * 100:.1f}%"
+    )
+
+def save_analysis(stats: List[BenchmarkStats], output_file_path: str) -> None:
+    """
+    Saves the statistics of every benchmark to a CSV file.
+    """
+    with open(output_file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(["Benchmark Name", "Iterations", "Mean", "RSD", "CI Low", "CI High", "Required Iterations"])
+        for s in stats:
+            csv_writer.writerow([
+                s.name, s.iterations, f"{s.mean:.3f}", f"{s.rsd:.9f}", f"{s.ci_low:.3f}", f"{s.ci_high:.3f}",
+                s.required_iterations,
+            ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+import os
+import re
+import csv
+import sys
+import math
+import argparse
+import statistics
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from analyze_results import load_results
+
+# The coverage loaders live with the overlap measurement
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'clustering microbenchmarks'))
+from jmh_ju2jmh_overlap_measurement import (  # noqa: E402
+    ClassKey,
+    CoverageIndex,
+    ThroughputData,
+    load_coverage_index,
+    load_throughput_data,
+)
+from coverage_store import load_coverage_store  # noqa: E402
+
+# Type aliases for better readability
+ClusterMembers = Dict[str, List[str]]  # Maps cluster names (Cluster_N) to their ju2jmh benchmarks
+CodeLine = Tuple[ClassKey, int]  # A line of a class
+
+# Default significance: false discovery rate of the cluster tests, and the smallest slowdown reported
+ALPHA = 0.05
+MIN_SLOWDOWN = 1.0  # Percent of the baseline median throughput
+
+# Number of the most suspicious lines the re-run list has to cover
+TOP_LINES = 20
+
+CLUSTER_NAME_PATTERN = re.compile(r'(Cluster_\d+)\._Benchmark\.')
+
+class ClusterChange(NamedTuple):
+    cluster: str
+    baseline_median: float
+    current_median: float
+    change: float  # Median throughput change in percent, negative when slower
+    p_value: float  # Two-sided Mann-Whitney U test
+    q_value: float  # Benjamini-Hochberg adjusted p-value
+    regressed: bool
+
+class MemberSuspicion(NamedTuple):
+    cluster: str
+    benchmark: str
+    suspiciousness: float  # Highest suspiciousness of the lines the benchmark covers
+    runtime_share: Optional[float]  # Share of the cluster runtime, if the throughput is known
+    suspect_lines: int  # Most suspicious lines covered by the benchmark
+
+def main() -> None:
+    """
+    Compares two runs of the clusters and attributes the significant slowdowns to the
+    ju2jmh benchmarks of the slower clusters, using their coverage to rank the likely
+    culprit benchmarks and code lines. The result is a short list of individual
+    benchmarks to re-run instead of the whole individual suite.
+    """
+    parser = argparse.ArgumentParser(description="Attribute cluster slowdowns between two runs to their member benchmarks.")
+    parser.add_argument("baseline_file", help="results_clusters.csv of the baseline run")
+    parser.add_argument("current_file", help="results_clusters.csv of the run to check")
+    parser.add_argument("cluster_file", help="clusters_ready_to_generate_file.txt of the clusters that were run")
+    parser.add_argument("coverage_path", help="directory containing one coverage report folder per benchmark")
+    parser.add_argument("--store", default=None,
+                        help="coverage store built by coverage_store.py, used instead of the per-benchmark reports")
+    parser.add_argument("--throughput-file", default=None,
+                        help="CSV file with the throughput of every ju2jmh benchmark, to weigh members by their runtime")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help=f"false discovery rate (default: {ALPHA})")
+    parser.add_argument("--min-slowdown", type=float, default=MIN_SLOWDOWN,
+                        help=f"smallest median throughput drop in percent that is reported (default: {MIN_SLOWDOWN})")
+    parser.add_argument("--top-lines", type=int, default=TOP_LINES,
+                        help=f"number of the most suspicious lines to print and cover by the re-run list (default: {TOP_LINES})")
+    parser.add_argument("--output", default=None, help="CSV file with the ranked members of every slower cluster")
+    parser.add_argument("--rerun-file", default=None, help="file with the benchmarks to re-run, one per line")
+    args = parser.parse_args()
+
+    changes = compare_runs(load_results(args.baseline_file), load_results(args.current_file), args.alpha, args.min_slowdown)
+    print_changes(changes, args.alpha)
+    regressed = [c.cluster for c in changes if c.regressed]
+    if not regressed:
+        return
+
+    cluster_members = load_cluster_members(args.cluster_file)
+    stable = [c.cluster for c in changes if c.q_value > args.alpha]
+    benchmarks = sorted({member for cluster in regressed + stable for member in cluster_members.get(cluster, [])})
+    if args.store:
+        coverage_index = load_coverage_store(args.store)
+    else:
+        folders = [b for b in benchmarks if os.path.isdir(os.path.join(args.coverage_path, b))]
+        coverage_index = load_coverage_index(args.coverage_path, folders)
+    missing = sum(b not in coverage_index for b in benchmarks)
+    if missing:
+        print(f"Warning: No coverage for {missing} of {len(benchmarks)} clustered benchmarks, they are ranked by runtime only.")
+    throughput_data = load_throughput_data(args.throughput_file) if args.throughput_file else {}
+
+    line_scores = line_suspiciousness(regressed, stable, cluster_members, coverage_index)
+    ranking = rank_members(regressed, cluster_members, coverage_index, line_scores, throughput_data, args.top_lines)
+    rerun = select_rerun_benchmarks(ranking, coverage_index, line_scores, args.top_lines)
+    print_attribution(ranking, line_scores, rerun, args.top_lines)
+
+    if args.output:
+        save_ranking(ranking, args.output)
+    if args.rerun_file:
+        with open(args.rerun_file, 'w', encoding='utf-8') as file:
+            file.writelines(f"{benchmark}\n" for benchmark in rerun)
+
+def mann_whitney_u(baseline: List[float], current: List[float]) -> float:
+    """
+    Two-sided Mann-Whitney U test with the normal approximation, corrected for ties
+    and continuity. It makes no normality assumption, so outlier iterations do not
+    dominate the result.
+
+    Returns:
+        The p-value.
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 < 2 or n2 < 2:
+        return 1.0
+    ordered = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    baseline_rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < len(ordered):
+        j = i
+        while j + 1 < len(ordered) and ordered[j + 1][0] == ordered[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        baseline_rank_sum += average_rank * sum(sample == 0 for _, sample in ordered[i:j + 1])
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    n = n1 + n2
+    u = baseline_rank_sum - n1 * (n1 + 1) / 2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = max(0.0, abs(u - n1 * n2 / 2) - 0.5) / sigma
+    return min(1.0, 2 * (1 - statistics.NormalDist().cdf(z)))
+
+def benjamini_hochberg(p_values: List[float]) -> List[float]:
+    """
+    Adjusts p-values for testing many clusters at once, controlling the false discovery rate.
+    """
+    order = sorted(range(len(p_values)), key=lambda i: p_values[i])
+    q_values = [1.0] * len(p_values)
+    running_min = 1.0
+    for rank in range(len(order), 0, -1):
+        i = order[rank - 1]
+        running_min = min(running_min, p_values[i] * len(p_values) / rank)
+        q_values[i] = running_min
+    return q_values
+
+def compare_runs(
+    baseline: Dict[str, List[float]], current: Dict[str, List[float]], alpha: float = ALPHA, min_slowdown: float = MIN_SLOWDOWN
+) -> List[ClusterChange]:
+    """
+    Tests every cluster present in both runs for a change of its throughput.
+
+    Args:
+        baseline: Throughput of every cluster in every iteration of the baseline run.
+        current: Same for the run to check.
+        alpha: False discovery rate.
+        min_slowdown: Smallest median throughput drop, in percent, counted as a regression.
+
+    Returns:
+        The change of every cluster, by cluster name (Cluster_N), slowest first.
+    """
+    names = [name for name in baseline if name in current]
+    skipped = len(baseline) + len(current) - 2 * len(names)
+    if skipped:
+        print(f"Warning: {skipped} clusters are only in one of the runs and are not compared.")
+    p_values = [mann_whitney_u(baseline[name], current[name]) for name in names]
+    changes = []
+    for name, p_value, q_value in zip(names, p_values, benjamini_hochberg(p_values)):
+        baseline_median, current_median = statistics.median(baseline[name]), statistics.median(current[name])
+        change = (current_median / baseline_median - 1) * 100 if baseline_median else 0.0
+        match = CLUSTER_NAME_PATTERN.search(name)
+        changes.append(ClusterChange(
+            cluster=match.group(1) if match else name,
+            baseline_median=baseline_median,
+            current_median=current_median,
+            change=change,
+            p_value=p_value,
+            q_value=q_value,
+            regressed=q_value <= alpha and change <= -min_slowdown,
+        ))
+    return sorted(changes, key=lambda c: c.change)
+
+def load_cluster_members(cluster_file: str) -> ClusterMembers:
+    """
+    Reads the ju2jmh benchmarks of every cluster from a "Cluster_N:benchmark,benchmark," file.
+    """
+    cluster_members: ClusterMembers = {}
+    with open(cluster_file, encoding='utf-8') as file:
+        for line in file:
+            if ':' in line:
+                cluster, members = line.split(':', 1)
+                cluster_members[cluster.strip()] = [m.strip() for m in members.split(',') if m.strip()]
+    return cluster_members
+
+def cluster_lines(members: List[str], coverage_index: CoverageIndex) -> Set[CodeLine]:
+    """
+    Returns the lines covered by any member of a cluster.
+    """
+    lines: Set[CodeLine] = set()
+    for member in members:
+        for class_key, covered in coverage_index.get(member, {}).items():
+            lines.update((class_key, line) for line in covered)
+    return lines
+
+def line_suspiciousness(
+    regressed: List[str], stable: List[str], cluster_members: ClusterMembers, coverage_index: CoverageIndex
+) -> Dict[CodeLine, float]:
+    """
+    Scores the lines covered by the slower clusters with the Ochiai coefficient of
+    spectrum-based fault localization: lines covered by many slower clusters and few
+    unchanged ones score highest, up to 1.0.
+
+    Args:
+        regressed: The clusters that became slower.
+        stable: The clusters without a significant change.
+        cluster_members: The ju2jmh benchmarks of every cluster.
+        coverage_index: Indexed coverage of the clustered benchmarks.
+
+    Returns:
+        The suspiciousness of every line covered by a slower cluster.
+    """
+    slower_counts: Dict[CodeLine, int] = {}
+    for cluster in regressed:
+        for line in cluster_lines(cluster_members.get(cluster, []), coverage_index):
+            slower_counts[line] = slower_counts.get(line, 0) + 1
+    stable_counts: Dict[CodeLine, int] = {}
+    for cluster in stable:
+        for line in cluster_lines(cluster_members.get(cluster, []), coverage_index) & slower_counts.keys():
+            stable_counts[line] = stable_counts.get(line, 0) + 1
+    return {
+        line: count / math.sqrt(len(regressed) * (count + stable_counts.get(line, 0)))
+        for line, count in slower_counts.items()
+    }
+
+def top_lines(line_scores: Dict[CodeLine, float], count: int) -> List[CodeLine]:
+    """
+    Returns the most suspicious lines, in a deterministic order for equal scores.
+    """
+    return sorted(line_scores, key=lambda line: (-line_scores[line], line))[:count]
+
+def rank_members(
+    regressed: List[str],
+    cluster_members: ClusterMembers,
+    coverage_index: CoverageIndex,
+    line_scores: Dict[CodeLine, float],
+    throughput_data: ThroughputData,
+    top_line_count: int = TOP_LINES,
+) -> List[MemberSuspicion]:
+    """
+    Ranks the members of every slower cluster by the suspiciousness of the lines they
+    cover, then by their share of the cluster runtime: a member taking most of the
+    cluster's time can explain a slowdown with a smaller change of its own.
+
+    Returns:
+        The members of the slower clusters, most suspicious first within each cluster.
+    """
+    suspect = set(top_lines(line_scores, top_line_count))
+    ranking = []
+    for cluster in regressed:
+        members = cluster_members.get(cluster, [])
+        runtimes = {m: 1 / throughput_data[m] for m in members if throughput_data.get(m)}
+        total_runtime = sum(runtimes.values())
+        suspicions = []
+        for member in members:
+            lines = [(class_key, line) for class_key, covered in coverage_index.get(member, {}).items() for line in covered]
+            suspicions.append(MemberSuspicion(
+                cluster=cluster,
+                benchmark=member,
+                suspiciousness=max((line_scores.get(line, 0.0) for line in lines), default=0.0),
+                runtime_share=runtimes[member] / total_runtime if member in runtimes else None,
+                suspect_lines=sum(line in suspect for line in lines),
+            ))
+        suspicions.sort(key=lambda s: (-s.suspiciousness, -s.suspect_lines, -(s.runtime_share or 0.0), s.benchmark))
+        ranking.extend(suspicions)
+    return ranking
+
+def select_rerun_benchmarks(
+    ranking: List[MemberSuspicion],
+    coverage_index: CoverageIndex,
+    line_scores: Dict[CodeLine, float],
+    top_line_count: int = TOP_LINES,
+) -> List[str]:
+    """
+    Selects a small set of individual benchmarks to re-run: greedily, the members
+    covering the most still uncovered suspicious lines, until all of the most
+    suspicious lines are covered, plus the top-ranked member of every slower cluster
+    not represented yet.
+    """
+    uncovered = set(top_lines(line_scores, top_line_count))
+    member_lines: Dict[str, FrozenSet[CodeLine]] = {
+        s.benchmark: frozenset(
+            (class_key, line) for class_key, covered in coverage_index.get(s.benchmark, {}).items()
+            for line in covered if (class_key, line) in uncovered
+        )
+        for s in ranking
+    }
+    selected: List[str] = []
+    while uncovered:
+        best = max(ranking, key=lambda s: len(member_lines[s.benchmark] & uncovered))
+        if not member_lines[best.benchmark] & uncovered:
+            break
+        selected.append(best.benchmark)
+        uncovered -= member_lines[best.benchmark]
+
+    represented = {s.cluster for s in ranking if s.benchmark in selected}
+    for s in ranking:
+        if s.cluster not in represented:
+            selected.append(s.benchmark)
+            represented.add(s.cluster)
+    return selected
+
+def format_line(line: CodeLine) -> str:
+    (package_name, class_name), number = line
+    return f"{package_name}.{class_name}:{number}"
+
+def print_changes(changes: List[ClusterChange], alpha: float = ALPHA) -> None:
+    """
+    Prints the slower clusters and how many clusters changed.
+    """
+    regressed = [c for c in changes if c.regressed]
+    faster = sum(c.change > 0 and c.q_value <= alpha for c in changes)
+    print(f"Compared {len(changes)} clusters: {len(regressed)} significantly slower, {faster} faster")
+    for c in regressed:
+        print(f"  {c.cluster}: {c.change:+.2f}% (median {c.baseline_median:.3f} -> {c.current_median:.3f}, q = {c.q_value:.2g})")
+
+def print_attribution(
+    ranking: List[MemberSuspicion], line_scores: Dict[CodeLine, float], rerun: List[str], top_line_count: int
+) -> None:
+    """
+    Prints the most suspicious lines, the likely culprit of every slower cluster and the re-run list.
+    """
+    print(f"Most suspicious lines of {len(line_scores)} covered by the slower clusters:")
+    for line in top_lines(line_scores, top_line_count):
+        print(f"  {format_line(line)}: {line_scores[line]:.3f}")
+    print("Likely culprits:")
+    seen: Set[str] = set()
+    for s in ranking:
+        if s.cluster in seen:
+            continue
+        seen.add(s.cluster)
+        share = "unknown" if s.runtime_share is None else f"{s.runtime_share * 100:.1f}%"
+        print(f"  {s.cluster}: {s.benchmark} (suspiciousness {s.suspiciousness:.3f}, runtime share {share})")
+    print(f"Re-run {len(rerun)} of the {len(ranking)} benchmarks of the slower clusters:")
+    for benchmark in rerun:
+        print(f"  {benchmark}")
+
+def save_ranking(ranking: List[MemberSuspicion], output_file_path: str) -> None:
+    """
+    Saves the ranked members of every slower cluster to a CSV file.
+    """
+    output_dir = os.path.dirname(output_file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(["Cluster", "Benchmark Name", "Suspiciousness", "Runtime Share", "Suspect Lines"])
+        for s in ranking:
+            share = "" if s.runtime_share is None else f"{s.runtime_share:.6f}"
+            csv_writer.writerow([s.cluster, s.benchmark, f"{s.suspiciousness:.6f}", share, s.suspect_lines])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import os
+import csv
+import math
+import argparse
+import statistics
+from typing import List, NamedTuple
+
+from analyze_results import (
+    CONFIDENCE,
+    JMH_WARMUP_ITERATIONS,
+    TARGET_PRECISION,
+    Throughputs,
+    execution_seconds,
+    load_results,
+    relative_standard_deviation,
+    required_iterations,
+)
+
+# Bounds of the recommended configuration
+MIN_ITERATIONS = 5
+MAX_ITERATIONS_PER_FORK = 30  # More iterations are spread over additional forks
+MAX_FORKS = 5
+
+# Benchmarks above this RSD are flagged: more iterations alone are unlikely to make them reliable
+UNSTABLE_RSD = 5.0
+
+class IterationRecommendation(NamedTuple):
+    name: str
+    measured_iterations: int
+    rsd: float
+    required_iterations: int
+    warmup_iterations: int  # -wi
+    iterations: int  # -i
+    forks: int  # -f
+    unstable: bool
+
+    def jmh_args(self) -> str:
+        return f"-wi {self.warmup_iterations} -i {self.iterations} -f {self.forks}"
+
+def main() -> None:
+    """
+    Recommends, for every benchmark or cluster of a results file, the JMH warmup
+    iterations, measurement iterations and forks needed to reach a confidence interval
+    width target, and estimates the execution time saved compared to the fixed configuration.
+    """
+    parser = argparse.ArgumentParser(description="Recommend per-benchmark JMH iteration counts from observed stability.")
+    parser.add_argument("results_file", help="results_individuals.csv or results_clusters.csv")
+    parser.add_argument("--target-precision", type=float, default=TARGET_PRECISION,
+                        help=f"CI half-width target in percent of the mean (default: {TARGET_PRECISION})")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE, help=f"confidence level (default: {CONFIDENCE})")
+    parser.add_argument("--output", default=None, help="CSV file with the recommendation of every benchmark")
+    parser.add_argument("--jmh-args-file", default=None,
+                        help="file with one '<benchmark>$ -wi W -i I -f F' line per benchmark, to pass to the JMH jar")
+    args = parser.parse_args()
+
+    results = load_results(args.results_file)
+    recommendations = recommend_iterations(results, args.target_precision, args.confidence)
+    print_recommendation_summary(recommendations)
+
+    if args.output:
+        save_recommendations(recommendations, args.output)
+    if args.jmh_args_file:
+        with open(args.jmh_args_file, 'w', encoding='utf-8') as file:
+            for recommendation in recommendations:
+                file.write(f"{recommendation.name}$ {recommendation.jmh_args()}\n")
+
+def transient_iterations(values: List[float], confidence: float = CONFIDENCE) -> int:
+    """
+    Counts the leading iterations that are not yet in steady state: those outside the
+    confidence band (mean +/- z * standard deviation) of the second half of the iterations.
+    Such iterations should have been warmup iterations.
+    """
+    steady = values[len(values) // 2:]
+    if len(steady) < 2:
+        return 0
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    mean, deviation = statistics.fmean(steady), statistics.stdev(steady)
+    count = 0
+    for value in values[:len(values) // 2]:
+        if abs(value - mean) <= z * deviation:
+            break
+        count += 1
+    return count
+
+def recommend_benchmark(name: str, values: List[float], target_precision: float, confidence: float) -> IterationRecommendation:
+    """
+    Recommends the JMH configuration of one benchmark. The measurement iterations are the
+    iterations required for the target precision, at least MIN_ITERATIONS, spread over
+    as many forks as needed to keep at most MAX_ITERATIONS_PER_FORK per fork. The warmup
+    is extended by the iterations that were still transient in the measurement, and the
+    RSD and required iterations are computed over the remaining steady-state iterations
+    only, so a slow start does not inflate them.
+
+    Args:
+        name: Name of the benchmark.
+        values: Throughput measured in every iteration.
+        target_precision: CI half-width target in percent of the mean.
+        confidence: Confidence level.
+
+    Returns:
+        The recommended configuration.
+    """
+    transient = transient_iterations(values, confidence)
+    steady = values[transient:]
+    required = required_iterations(steady, target_precision, confidence)
+    total = max(MIN_ITERATIONS, required)
+    forks = min(MAX_FORKS, math.ceil(total / MAX_ITERATIONS_PER_FORK))
+    iterations = min(MAX_ITERATIONS_PER_FORK, math.ceil(total / forks))
+    rsd = relative_standard_deviation(steady)
+    return IterationRecommendation(
+        name=name,
+        measured_iterations=len(values),
+        rsd=rsd,
+        required_iterations=required,
+        warmup_iterations=JMH_WARMUP_ITERATIONS + transient,
+        iterations=iterations,
+        forks=forks,
+        unstable=rsd > UNSTABLE_RSD or forks * iterations < required,
+    )
+
+def recommend_iterations(
+    results: Throughputs, target_precision: float = TARGET_PRECISION, confidence: float = CONFIDENCE
+) -> List[IterationRecommendation]:
+    """
+    Recommends the JMH configuration of every benchmark of a results file, in file order.
+    """
+    return [recommend_benchmark(name, values, target_precision, confidence) for name, values in results.items()]
+
+def print_recommendation_summary(recommendations: List[IterationRecommendation]) -> None:
+    """
+    Prints how the recommended configurations compare to the fixed one that was measured.
+    """
+    if not recommendations:
+        print("No benchmarks")
+        return
+    fixed_seconds = sum(execution_seconds(JMH_WARMUP_ITERATIONS, r.measured_iterations, 1) for r in recommendations)
+    recommended_seconds = sum(execution_seconds(r.warmup_iterations, r.iterations, r.forks) for r in recommendations)
+    fewer = sum(r.iterations * r.forks < r.measured_iterations for r in recommendations)
+    more = sum(r.iterations * r.forks > r.measured_iterations for r in recommendations)
+    print(
+        f"{len(recommendations)} benchmarks: {fewer} need fewer iterations than measured, {more} need more, "
+        f"{sum(r.warmup_iterations > JMH_WARMUP_ITERATIONS for r in recommendations)} need a longer warmup"
+    )
+    print(
+        f"Estimated execution time: {fixed_seconds / 3600:.1f} h with the fixed configuration, "
+        f"{recommended_seconds / 3600:.1f} h recommended ({(1 - recommended_seconds / fixed_seconds) * 100:.1f}% saved)"
+    )
+    for r in recommendations:
+        if r.unstable:
+            print(f"Warning: {r.name} is unstable (RSD {r.rsd:.2f}%, {r.required_iterations} iterations required), "
+                  f"consider a different setup")
+
+def save_recommendations(recommendations: List[IterationRecommendation], output_file_path: str) -> None:
+    """
+    Saves the recommendation of every benchmark to a CSV file.
+    """
+    output_dir = os.path.dirname(output_file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow([
+            "Benchmark Name", "RSD", "Required Iterations", "Warmup Iterations", "Iterations", "Forks", "JMH Args", "Unstable",
+        ])
+        for r in recommendations:
+            csv_writer.writerow([
+                r.name, f"{r.rsd:.9f}", r.required_iterations, r.warmup_iterations, r.iterations, r.forks,
+                r.jmh_args(), r.unstable,
+            ])
+
+if __name__ == "__main__":
+    main()
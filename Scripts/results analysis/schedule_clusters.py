@@ -0,0 +1,233 @@
+import os
+import json
+import heapq
+import random
+import shutil
+import argparse
+import subprocess
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from analyze_results import (
+    CONFIDENCE,
+    JMH_FORKS,
+    JMH_ITERATION_SECONDS,
+    JMH_MEASUREMENT_ITERATIONS,
+    JMH_WARMUP_ITERATIONS,
+    TARGET_PRECISION,
+    execution_seconds,
+    load_results,
+    relative_standard_deviation,
+)
+from recommend_iterations import recommend_benchmark
+
+# Path to the JAR file containing the generated cluster benchmarks
+JMH_JAR_FILE = "path_to_jmh.jar"
+
+# Relative throughput difference between a parallel and an isolated run that is reported as interference
+INTERFERENCE_TOLERANCE = 2.0
+
+class ClusterJob(NamedTuple):
+    cluster: str  # Cluster class name, e.g. Cluster_12
+    benchmark: str  # Fully qualified JMH benchmark name
+    jmh_args: List[str]  # Iterations, forks and iteration time of this cluster
+    estimated_seconds: float
+
+def main() -> None:
+    """
+    Runs the generated clusters on a many-core machine: the clusters are assigned to CPU
+    pinned worker slots, balancing their estimated wall time with longest-processing-
+    time-first, and a sample of clusters can be re-run in isolation to measure the
+    interference between slots.
+    """
+    parser = argparse.ArgumentParser(description="Schedule the generated clusters over CPU-pinned JMH worker slots.")
+    parser.add_argument("cluster_file", help="clusters_ready_to_generate_file.txt")
+    parser.add_argument("--package", required=True, help="package of the generated clusters, e.g. zipkin2.clusters")
+    parser.add_argument("--history", default=None, help="results_clusters.csv of a previous run, to estimate wall time")
+    parser.add_argument("--adaptive-iterations", action="store_true",
+                        help="run each cluster with the iterations recommended from its history (see recommend_iterations.py)")
+    parser.add_argument("--slots", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="number of clusters running at the same time (default: half of the CPUs)")
+    parser.add_argument("--cores-per-slot", type=int, default=1, help="CPUs pinned to every slot (default: 1)")
+    parser.add_argument("--output-dir", default="cluster_results", help="directory of the JMH results and logs")
+    parser.add_argument("--interference-sample", type=int, default=0,
+                        help="number of clusters re-run in isolation after the schedule (default: 0)")
+    parser.add_argument("--dry-run", action="store_true", help="only print the schedule")
+    args = parser.parse_args()
+    if args.slots < 1:
+        parser.error("--slots must be at least 1")
+    if args.cores_per_slot < 1:
+        parser.error("--cores-per-slot must be at least 1")
+
+    history = load_results(args.history) if args.history else {}
+    jobs = plan_jobs(read_cluster_names(args.cluster_file), args.package, history, args.adaptive_iterations)
+    slots = schedule_lpt(jobs, args.slots)
+    print_schedule(slots)
+    if args.dry_run:
+        return
+
+    if not os.path.isfile(JMH_JAR_FILE):
+        parser.error(f"Required file not found at {JMH_JAR_FILE}")
+    cpu_sets = assign_cpus(args.slots, args.cores_per_slot)
+    os.makedirs(args.output_dir, exist_ok=True)
+    start = time.time()
+    with ThreadPoolExecutor(len(slots)) as executor:
+        failures = sum(executor.map(
+            lambda slot: run_slot(slot[1], cpu_sets[slot[0]], args.output_dir, 'parallel'), enumerate(slots)
+        ), [])
+    print(f"Ran {len(jobs)} clusters on {len(slots)} slots in {(time.time() - start) / 3600:.2f} h, {len(failures)} failed")
+    for cluster in failures:
+        print(f"  Failed: {cluster}")
+
+    if args.interference_sample:
+        sample = random.Random(0).sample(jobs, min(args.interference_sample, len(jobs)))
+        run_slot(sample, cpu_sets[0], args.output_dir, 'isolated')
+        report_interference(sample, args.output_dir)
+
+def read_cluster_names(cluster_file: str) -> List[str]:
+    """
+    Reads the cluster names of a "Cluster_N:benchmark,benchmark," cluster file.
+    """
+    with open(cluster_file, encoding='utf-8') as file:
+        return [line.split(':', 1)[0].strip() for line in file if ':' in line]
+
+def plan_jobs(clusters: List[str], package: str, history: Dict[str, List[float]], adaptive: bool) -> List[ClusterJob]:
+    """
+    Builds the JMH execution of every cluster and estimates its wall time, from the
+    cluster's throughput whenever it has a history. With adaptive iterations, clusters
+    that have a history run with their recommended configuration; the others use the
+    fixed configuration.
+    """
+    iteration_time = ["-w", f"{JMH_ITERATION_SECONDS:g}s", "-r", f"{JMH_ITERATION_SECONDS:g}s"]
+    fixed_args = ["-wi", str(JMH_WARMUP_ITERATIONS), "-i", str(JMH_MEASUREMENT_ITERATIONS), "-f", str(JMH_FORKS)]
+    jobs = []
+    for cluster in clusters:
+        benchmark = f"{package}.{cluster}._Benchmark.benchmark_{cluster}"
+        per_iteration = iteration_seconds(history.get(benchmark))
+        if adaptive and benchmark in history:
+            r = recommend_benchmark(benchmark, history[benchmark], TARGET_PRECISION, CONFIDENCE)
+            jmh_args = ["-wi", str(r.warmup_iterations), "-i", str(r.iterations), "-f", str(r.forks)]
+            seconds = execution_seconds(r.warmup_iterations, r.iterations, r.forks, per_iteration)
+        else:
+            jmh_args = fixed_args
+            seconds = execution_seconds(JMH_WARMUP_ITERATIONS, JMH_MEASUREMENT_ITERATIONS, JMH_FORKS, per_iteration)
+        jobs.append(ClusterJob(cluster, benchmark, jmh_args + iteration_time, seconds))
+    return jobs
+
+def iteration_seconds(throughputs: Optional[List[float]]) -> float:
+    """
+    Estimates the wall time of one iteration of a cluster from its measured throughput
+    (ops/s). JMH ends an iteration only once the invocation in progress returns, so an
+    iteration overruns the iteration time by up to one invocation, which dominates for
+    slow clusters. Without a history, the iteration time is used.
+    """
+    valid = [value for value in throughputs or [] if value > 0]
+    if not valid:
+        return JMH_ITERATION_SECONDS
+    return JMH_ITERATION_SECONDS + 1 / statistics.median(valid)
+
+def schedule_lpt(jobs: List[ClusterJob], slot_count: int) -> List[List[ClusterJob]]:
+    """
+    Assigns the jobs to slots with longest-processing-time-first: the longest remaining
+    job goes to the slot that is free first. The makespan is at most 4/3 of the optimum.
+
+    Args:
+        jobs: The cluster executions with their estimated wall time.
+        slot_count: Number of slots running at the same time.
+
+    Returns:
+        The jobs of every slot, in execution order.
+    """
+    slots: List[List[ClusterJob]] = [[] for _ in range(max(1, slot_count))]
+    loads: List[Tuple[float, int]] = [(0.0, slot) for slot in range(len(slots))]
+    for job in sorted(jobs, key=lambda job: job.estimated_seconds, reverse=True):
+        load, slot = heapq.heappop(loads)
+        slots[slot].append(job)
+        heapq.heappush(loads, (load + job.estimated_seconds, slot))
+    return slots
+
+def print_schedule(slots: List[List[ClusterJob]]) -> None:
+    """
+    Prints the estimated wall time of every slot, of the whole schedule, and of running
+    the clusters one after another.
+    """
+    sequential = sum(job.estimated_seconds for slot in slots for job in slot)
+    makespan = max(sum(job.estimated_seconds for job in slot) for slot in slots)
+    for i, slot in enumerate(slots):
+        print(f"Slot {i}: {len(slot)} clusters, estimated {sum(job.estimated_seconds for job in slot) / 3600:.2f} h")
+    print(f"Estimated wall time: {makespan / 3600:.2f} h on {len(slots)} slots, "
+          f"{sequential / 3600:.2f} h sequentially")
+
+def assign_cpus(slot_count: int, cores_per_slot: int) -> List[Optional[str]]:
+    """
+    Returns the CPU list (in taskset format) of every slot, or None for every slot if
+    CPUs cannot be pinned on this machine.
+    """
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    if not shutil.which("taskset") or len(available) < slot_count * cores_per_slot:
+        print("Warning: Cannot pin every slot to its own CPUs (taskset missing or too few CPUs), running unpinned.")
+        return [None] * slot_count
+    return [
+        ",".join(map(str, available[slot * cores_per_slot:(slot + 1) * cores_per_slot])) for slot in range(slot_count)
+    ]
+
+def run_slot(jobs: List[ClusterJob], cpus: Optional[str], output_dir: str, mode: str) -> List[str]:
+    """
+    Runs the jobs of one slot one after another, pinned to its CPUs, writing the JMH
+    results of every cluster to <output_dir>/<mode>/<cluster>.json. The slots run at the
+    same time, so JMH must not wait for the other slots on its global lock file.
+
+    Returns:
+        The clusters whose run failed.
+    """
+    failures = []
+    result_dir = os.path.join(output_dir, mode)
+    os.makedirs(result_dir, exist_ok=True)
+    for job in jobs:
+        result_file = os.path.join(result_dir, f"{job.cluster}.json")
+        command = ["java", "-Djmh.ignoreLock=true", "-jar", JMH_JAR_FILE, f"{job.benchmark}$", *job.jmh_args, "-rf", "json", "-rff", result_file]
+        if cpus is not None:
+            command = ["taskset", "-c", cpus] + command
+        with open(os.path.join(result_dir, f"{job.cluster}.log"), 'w', encoding='utf-8') as log_file:
+            result = subprocess.run(command, stdout=log_file, stderr=subprocess.STDOUT)
+        if result.returncode != 0 or not os.path.isfile(result_file):
+            print(f"Error: Cluster {job.cluster} failed in {mode} mode")
+            failures.append(job.cluster)
+    return failures
+
+def read_jmh_iterations(result_file: str) -> List[float]:
+    """
+    Reads the measured iterations of all forks from a JMH JSON result file.
+    """
+    with open(result_file, encoding='utf-8') as file:
+        results = json.load(file)
+    return [value for result in results for fork in result["primaryMetric"]["rawData"] for value in fork]
+
+def report_interference(sample: List[ClusterJob], output_dir: str) -> None:
+    """
+    Compares the throughput and RSD of the sampled clusters between the parallel and the
+    isolated runs, and reports the clusters slowed down by the other slots.
+    """
+    differences = []
+    for job in sample:
+        try:
+            parallel = read_jmh_iterations(os.path.join(output_dir, 'parallel', f"{job.cluster}.json"))
+            isolated = read_jmh_iterations(os.path.join(output_dir, 'isolated', f"{job.cluster}.json"))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: No results to compare for {job.cluster}: {e}")
+            continue
+        difference = (statistics.fmean(parallel) / statistics.fmean(isolated) - 1) * 100
+        differences.append(difference)
+        print(
+            f"{job.cluster}: parallel {difference:+.2f}% vs isolated, RSD {relative_standard_deviation(parallel):.2f}% "
+            f"parallel, {relative_standard_deviation(isolated):.2f}% isolated"
+        )
+        if abs(difference) > INTERFERENCE_TOLERANCE:
+            print(f"Warning: {job.cluster} differs by more than {INTERFERENCE_TOLERANCE}% when run in parallel")
+    if differences:
+        print(f"Interference: median difference {statistics.median(differences):+.2f}% over {len(differences)} clusters")
+
+if __name__ == "__main__":
+    main()
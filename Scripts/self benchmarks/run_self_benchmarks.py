@@ -0,0 +1,199 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+import contextlib
+from typing import Callable, Dict, List, Optional
+
+from synthetic_corpus import Corpus, generate_corpus
+
+# The measured scripts live in the sibling folders
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'clustering microbenchmarks'))
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'code coverage - jacoco'))
+from clsuters_in_a_text import clusters_highest_overlap, parse_benchmark_data_from_file  # noqa: E402
+from jacoco_xml_to_csv_only_covered_lines import extract_data  # noqa: E402
+from jmh_ju2jmh_overlap_measurement import (  # noqa: E402
+    calculate_intersection_coverage,
+    compute_overlap_matrix,
+    get_coverage_data,
+    load_coverage_index,
+)
+
+# Default scale of the synthetic corpus and of the measurement
+BENCHMARKS = 1000
+LINES = 10000
+REPEATS = 3
+INTERSECTION_PAIRS = 10000  # JMH x ju2jmh pairs intersected with calculate_intersection_coverage
+CLUSTER_THRESHOLD = 0.000005  # Default runtime threshold of clsuters_in_a_text.py
+
+# Measured stages, in pipeline order
+STAGES = [
+    'extract_data',
+    'get_coverage_data',
+    'calculate_intersection_coverage',
+    'compute_overlap_matrix',
+    'parse_benchmark_data_from_file',
+    'clusters_highest_overlap',
+]
+
+# A stage slower than the previous comparable run by more than this percentage is reported
+REGRESSION_TOLERANCE = 10.0
+
+HISTORY_FILE = "self_benchmark_history.json"
+
+def main() -> None:
+    """
+    Times the expensive stages of the pipeline on a synthetic corpus, records their
+    peak memory, and appends the results to a JSON history, compared to the previous
+    run of the same scale.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline's own hot paths on a synthetic corpus.")
+    parser.add_argument("--benchmarks", type=int, default=BENCHMARKS, help=f"number of benchmarks (default: {BENCHMARKS})")
+    parser.add_argument("--lines", type=int, default=LINES, help=f"lines of the synthetic code base (default: {LINES})")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the corpus (default: 0)")
+    parser.add_argument("--xml-reports", type=int, default=None,
+                        help="benchmarks converted by extract_data (default: XML_REPORT_FRACTION of them)")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help=f"timed runs per stage (default: {REPEATS})")
+    parser.add_argument("--stages", nargs='+', choices=STAGES, default=STAGES, help="stages to run (default: all)")
+    parser.add_argument("--corpus-dir", default=None, help="keep the corpus in this directory instead of a temporary one")
+    parser.add_argument("--history", default=HISTORY_FILE, help=f"JSON history file (default: {HISTORY_FILE})")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        corpus_dir = args.corpus_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        start_time = time.perf_counter()
+        corpus = generate_corpus(corpus_dir, args.benchmarks, args.lines, args.seed, args.xml_reports)
+        print(f"Generated corpus of {args.benchmarks} benchmarks and {args.lines} lines in {time.perf_counter() - start_time:.1f}s")
+
+        stages = build_stages(corpus)
+        results = {name: measure_stage(stages[name], args.repeats) for name in STAGES if name in args.stages}
+
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'scale': {
+            'benchmarks': args.benchmarks, 'lines': args.lines, 'seed': args.seed, 'xml_reports': len(corpus.xml_reports),
+        },
+        'stages': results,
+    }
+    history = load_history(args.history)
+    print_results(run, previous_run(history, run))
+    history.append(run)
+    with open(args.history, 'w', encoding='utf-8') as history_file:
+        json.dump(history, history_file, indent=2)
+
+def build_stages(corpus: Corpus) -> Dict[str, Callable[[], object]]:
+    """
+    Returns the function of every stage of STAGES. Each stage works on the corpus
+    files or on data prepared here, outside of the measurement.
+    """
+    output_dir = os.path.join(os.path.dirname(corpus.coverage_dir), 'extracted')
+    os.makedirs(output_dir, exist_ok=True)
+    folders = corpus.jmh_benchmarks + corpus.ju2jmh_benchmarks
+    with contextlib.redirect_stdout(io.StringIO()):
+        coverage = {name: get_coverage_data(os.path.join(corpus.coverage_dir, name)) for name in folders}
+        benchmark_data = parse_benchmark_data_from_file(corpus.overlap_report)
+    pairs_per_jmh = max(1, INTERSECTION_PAIRS // len(corpus.jmh_benchmarks))
+    pairs = [(jmh, ju2jmh) for jmh in corpus.jmh_benchmarks for ju2jmh in corpus.ju2jmh_benchmarks[:pairs_per_jmh]]
+
+    def overlap_matrix():
+        coverage_index = load_coverage_index(corpus.coverage_dir, folders)
+        return compute_overlap_matrix(coverage_index, corpus.jmh_benchmarks, corpus.ju2jmh_benchmarks)
+
+    return {
+        'extract_data': lambda: [
+            extract_data(xml_report, os.path.join(output_dir, f"report_{i}.csv"))
+            for i, xml_report in enumerate(corpus.xml_reports)
+        ],
+        'get_coverage_data': lambda: [get_coverage_data(os.path.join(corpus.coverage_dir, name)) for name in folders],
+        'calculate_intersection_coverage': lambda: [
+            calculate_intersection_coverage(coverage[jmh], coverage[ju2jmh]) for jmh, ju2jmh in pairs
+        ],
+        'compute_overlap_matrix': overlap_matrix,
+        'parse_benchmark_data_from_file': lambda: parse_benchmark_data_from_file(corpus.overlap_report),
+        'clusters_highest_overlap': lambda: clusters_highest_overlap(benchmark_data, CLUSTER_THRESHOLD),
+    }
+
+def measure_stage(stage: Callable[[], object], repeats: int) -> Dict[str, float]:
+    """
+    Times a stage over several runs, then runs it once more under tracemalloc for its
+    peak memory, so that tracing does not slow down the timed runs. The output of the
+    stage is discarded.
+
+    Returns:
+        The median and minimum time in seconds and the peak traced memory in megabytes.
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(max(1, repeats)):
+            start_time = time.perf_counter()
+            stage()
+            times.append(time.perf_counter() - start_time)
+        tracemalloc.start()
+        try:
+            stage()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        'median_seconds': statistics.median(times),
+        'min_seconds': min(times),
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+def current_commit() -> Optional[str]:
+    """
+    Returns the git commit of the scripts, if they are in a git repository.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def load_history(history_file: str) -> List[dict]:
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, encoding='utf-8') as file:
+        return json.load(file)
+
+def previous_run(history: List[dict], run: dict) -> Optional[dict]:
+    """
+    Returns the latest run of the history with the same corpus scale and machine,
+    the only ones the timings can be compared to.
+    """
+    for earlier in reversed(history):
+        if earlier.get('scale') == run['scale'] and earlier.get('machine') == run['machine']:
+            return earlier
+    return None
+
+def print_results(run: dict, previous: Optional[dict]) -> None:
+    """
+    Prints the time and memory of every stage, and the change since the previous comparable run.
+    """
+    if previous:
+        print(f"Compared to {previous.get('commit') or 'unknown commit'} of {previous['timestamp']}:")
+    for name, result in run['stages'].items():
+        line = f"{name:<34} {result['median_seconds']:10.4f}s  (min {result['min_seconds']:.4f}s)  peak {result['peak_mb']:8.1f} MB"
+        earlier = previous['stages'].get(name) if previous else None
+        if earlier and earlier['median_seconds']:
+            change = (result['median_seconds'] / earlier['median_seconds'] - 1) * 100
+            line += f"  {change:+6.1f}%"
+            if change > REGRESSION_TOLERANCE:
+                line += "  <- slower"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import csv
+import random
+import argparse
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+# Shape of the synthetic code base
+LINES_PER_CLASS = 50
+CLASSES_PER_PACKAGE = 10
+MAX_CLASSES_PER_BENCHMARK = 30
+
+# Share of the benchmarks that are JMH benchmarks, the others are ju2jmh benchmarks
+JMH_FRACTION = 0.1
+
+# Share of the benchmarks that also get a JaCoCo XML report (converting XML is the slowest step per benchmark)
+XML_REPORT_FRACTION = 0.05
+
+# Number of ju2jmh benchmarks listed per JMH benchmark in the overlap report
+REPORT_ENTRIES = 100
+
+class Corpus(NamedTuple):
+    coverage_dir: str  # One folder per benchmark with report.csv, and jacoco.xml for the first xml_reports
+    throughput_file: str
+    overlap_report: str
+    jmh_benchmarks: List[str]
+    ju2jmh_benchmarks: List[str]
+    xml_reports: List[str]
+
+def main() -> None:
+    """
+    Writes a synthetic corpus of coverage reports and an overlap report, at a given
+    scale, to run the pipeline or its self-benchmarks on.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic coverage and overlap corpus.")
+    parser.add_argument("output_dir", help="directory of the corpus")
+    parser.add_argument("--benchmarks", type=int, default=1000, help="number of benchmarks (default: 1000)")
+    parser.add_argument("--lines", type=int, default=10000, help="lines of the synthetic code base (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--xml-reports", type=int, default=None,
+                        help=f"benchmarks that also get a JaCoCo XML report (default: {XML_REPORT_FRACTION:.0%} of them)")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.output_dir, args.benchmarks, args.lines, args.seed, args.xml_reports)
+    print(f"Wrote {len(corpus.jmh_benchmarks)} JMH and {len(corpus.ju2jmh_benchmarks)} ju2jmh benchmarks to {args.output_dir}")
+
+def generate_classes(lines: int) -> List[Tuple[str, str]]:
+    """
+    Returns the (package, source file) of every class of a code base of the given size,
+    with JaCoCo's slash-separated package names.
+    """
+    class_count = max(1, lines // LINES_PER_CLASS)
+    return [(f"org/example/p{i // CLASSES_PER_PACKAGE}", f"C{i}.java") for i in range(class_count)]
+
+def generate_coverage(
+    classes: List[Tuple[str, str]], rng: random.Random
+) -> Dict[Tuple[str, str], List[int]]:
+    """
+    Draws the coverage of one benchmark: a few classes, popular classes more often
+    (Zipf-like), and in each a contiguous run of lines, as a test exercising a few methods.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(classes))]
+    chosen = set(rng.choices(range(len(classes)), weights, k=rng.randint(1, min(len(classes), MAX_CLASSES_PER_BENCHMARK))))
+    coverage = {}
+    for i in sorted(chosen):
+        first = rng.randint(1, LINES_PER_CLASS)
+        last = min(LINES_PER_CLASS, first + rng.randint(0, LINES_PER_CLASS // 2))
+        coverage[classes[i]] = list(range(first, last + 1))
+    return coverage
+
+def write_report_csv(file_path: str, coverage: Dict[Tuple[str, str], List[int]]) -> None:
+    """
+    Writes coverage in the report.csv format of jacoco_xml_to_csv_only_covered_lines.py.
+    """
+    with open(file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['Package Name', 'Class Name', 'Covered Lines'])
+        for (package_name, class_name), lines in coverage.items():
+            writer.writerow([package_name, class_name, ';'.join(map(str, lines))])
+
+def write_jacoco_xml(
+    file_path: str, name: str, classes: List[Tuple[str, str]], coverage: Dict[Tuple[str, str], List[int]]
+) -> None:
+    """
+    Writes coverage as a JaCoCo XML report. Like a real report, it lists every line of
+    every class of the code base, covered lines with covered instructions (ci) and the
+    others with missed ones (mi), so its size grows with the code base.
+    """
+    packages: Dict[str, List[Tuple[str, List[int]]]] = {}
+    for class_key in classes:
+        packages.setdefault(class_key[0], []).append((class_key[1], coverage.get(class_key, [])))
+    with open(file_path, 'w', encoding='utf-8') as xml_file:
+        xml_file.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><report name={quoteattr(name)}>')
+        for package_name, sourcefiles in packages.items():
+            xml_file.write(f'<package name={quoteattr(package_name)}>')
+            for class_name, lines in sourcefiles:
+                covered = set(lines)
+                xml_file.write(f'<sourcefile name={quoteattr(class_name)}>')
+                for nr in range(1, LINES_PER_CLASS + 1):
+                    ci, mi = (3, 0) if nr in covered else (0, 3)
+                    xml_file.write(f'<line nr="{nr}" mi="{mi}" ci="{ci}" mb="0" cb="0"/>')
+                xml_file.write('</sourcefile>')
+            xml_file.write('</package>')
+        xml_file.write('</report>')
+
+def generate_corpus(
+    output_dir: str, benchmarks: int, lines: int, seed: int = 0, xml_reports: Optional[int] = None
+) -> Corpus:
+    """
+    Writes a reproducible synthetic corpus: the same arguments give the same files.
+
+    Args:
+        output_dir: Directory of the corpus.
+        benchmarks: Number of benchmarks, JMH_FRACTION of them JMH benchmarks.
+        lines: Lines of the synthetic code base.
+        seed: Random seed.
+        xml_reports: Number of benchmarks that also get a JaCoCo XML report
+            (default: XML_REPORT_FRACTION of the benchmarks).
+
+    Returns:
+        The paths and benchmark names of the corpus.
+    """
+    rng = random.Random(seed)
+    classes = generate_classes(lines)
+    jmh_count = max(1, round(benchmarks * JMH_FRACTION))
+    jmh_benchmarks = [f"org.example.jmh.Bench{i // 5}.method{i % 5}" for i in range(jmh_count)]
+    ju2jmh_benchmarks = [
+        f"org.example.T{i // 5}Test._Benchmark.benchmark_test{i % 5}" for i in range(max(1, benchmarks - jmh_count))
+    ]
+
+    if xml_reports is None:
+        xml_reports = max(1, round(benchmarks * XML_REPORT_FRACTION))
+    coverage_dir = os.path.join(output_dir, 'coverage')
+    xml_report_files = []
+    for i, name in enumerate(jmh_benchmarks + ju2jmh_benchmarks):
+        directory = os.path.join(coverage_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        coverage = generate_coverage(classes, rng)
+        write_report_csv(os.path.join(directory, 'report.csv'), coverage)
+        if i < xml_reports:
+            xml_report_files.append(os.path.join(directory, 'jacoco.xml'))
+            write_jacoco_xml(xml_report_files[-1], name, classes, coverage)
+
+    throughput_file = os.path.join(output_dir, 'ju2jmh_throughput.csv')
+    throughputs = {name: rng.lognormvariate(13, 1.5) for name in ju2jmh_benchmarks}
+    with open(throughput_file, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['Benchmark', 'Throughput'])
+        writer.writerows(throughputs.items())
+
+    # Overlap report in the format of generate_summary_report, highest overlap first
+    overlap_report = os.path.join(output_dir, 'jmh_ju2jmh_overlap.txt')
+    with open(overlap_report, 'w', encoding='utf-8') as report_file:
+        for jmh_benchmark in jmh_benchmarks:
+            entries = rng.sample(ju2jmh_benchmarks, min(REPORT_ENTRIES, len(ju2jmh_benchmarks)))
+            overlaps = sorted((rng.betavariate(0.5, 2) * 100 for _ in entries), reverse=True)
+            report_file.write(f"> JMH Benchmark: {jmh_benchmark}\n")
+            for ju2jmh_benchmark, overlap in zip(entries, overlaps):
+                report_file.write(
+                    f" >> JU2JMH Benchmark: {ju2jmh_benchmark}, Overlap: {overlap:.2f}%, "
+                    f"Throughput: {throughputs[ju2jmh_benchmark]}\n"
+                )
+            report_file.write("\n")
+
+    return Corpus(coverage_dir, throughput_file, overlap_report, jmh_benchmarks, ju2jmh_benchmarks, xml_report_files)
+
+if __name__ == "__main__":
+    main()